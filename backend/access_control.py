@@ -0,0 +1,156 @@
+"""
+Idea tab access control.
+
+Comments, external links and activity on an idea are visible to admins, the
+submitter, its claimers and the managers of the submitter's or a claimer's
+team. Team membership (team -> member emails) and the manager -> managed team
+map are built from one query over user_profiles and kept in memory, so each
+check is a few set lookups. The snapshot is dropped when a commit changes a
+profile's team, managed team or role (or inserts, deletes or bulk-updates
+profiles), and is rebuilt at least every ACCESS_CACHE_TTL seconds so changes
+made by other worker processes are picked up. idea_tab_access_filter
+expresses the same rule as a SQL clause, for queries over many ideas.
+"""
+
+import threading
+import time
+from flask import session
+from sqlalchemy import event, inspect, or_, select
+from config import Config
+from database import SessionLocal, get_session
+from models import Claim, Idea, UserProfile
+
+MEMBERSHIP_FIELDS = ('team_uuid', 'managed_team_uuid', 'role')
+
+class TeamMembership:
+    """In-memory team membership and managed-team index."""
+    
+    def __init__(self, ttl=None):
+        self.ttl = Config.ACCESS_CACHE_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0
+    
+    def _load(self):
+        db = get_session()
+        try:
+            rows = db.query(
+                UserProfile.email, UserProfile.team_uuid, UserProfile.role, UserProfile.managed_team_uuid
+            ).all()
+        finally:
+            db.close()
+        
+        members = {}
+        managed_teams = {}
+        for email, team_uuid, role, managed_team_uuid in rows:
+            if team_uuid:
+                members.setdefault(team_uuid, set()).add(email)
+            if role == 'manager' and managed_team_uuid:
+                managed_teams[email] = managed_team_uuid
+        return {team_uuid: frozenset(emails) for team_uuid, emails in members.items()}, managed_teams
+    
+    def _current(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or time.monotonic() >= self._expires_at:
+                self._snapshot = self._load()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._snapshot
+    
+    def members(self, team_uuid):
+        """Emails of the users on a team."""
+        return self._current()[0].get(team_uuid, frozenset())
+    
+    def managed_team(self, email):
+        """UUID of the team a manager manages, or None."""
+        return self._current()[1].get(email)
+    
+    def invalidate(self):
+        """Rebuild the index on next use."""
+        with self._lock:
+            self._snapshot = None
+
+team_membership = TeamMembership()
+
+def check_idea_tab_access(idea, user_email):
+    """Check if user has access to sensitive idea tabs (comments, links, activity)."""
+    if not user_email:
+        return False
+    
+    # Admin always has access
+    if session.get('is_admin'):
+        return True
+    
+    # Idea submitter has access
+    if idea.email == user_email:
+        return True
+    
+    # Direct claimer has access
+    claimer_emails = [claim.claimer_email for claim in idea.claims]
+    if user_email in claimer_emails:
+        return True
+    
+    # Manager of submitter or claimer has access
+    managed_team_uuid = team_membership.managed_team(user_email)
+    if managed_team_uuid:
+        team_emails = team_membership.members(managed_team_uuid)
+        if idea.email in team_emails:
+            return True
+        if any(email in team_emails for email in claimer_emails):
+            return True
+    
+    return False
+
+def idea_tab_access_filter(user_email):
+    """SQL form of check_idea_tab_access for queries over many ideas.
+    
+    Returns None when the user can see no idea's tabs, True when they can see
+    every idea's (admins), and otherwise a clause over Idea.
+    """
+    if not user_email:
+        return None
+    if session.get('is_admin'):
+        return True
+    
+    emails = {user_email}
+    managed_team_uuid = team_membership.managed_team(user_email)
+    if managed_team_uuid:
+        emails |= team_membership.members(managed_team_uuid)
+    return or_(
+        Idea.email.in_(emails),
+        Idea.uuid.in_(select(Claim.idea_uuid).where(Claim.claimer_email.in_(emails)))
+    )
+
+def _membership_changed(instance):
+    state = inspect(instance)
+    return any(state.attrs[field].history.has_changes() for field in MEMBERSHIP_FIELDS)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _collect_membership_changes(db, flush_context):
+    if db.info.get('team_membership_changed'):
+        return
+    profiles_added_or_removed = any(isinstance(instance, UserProfile) for instance in list(db.new) + list(db.deleted))
+    if profiles_added_or_removed or any(
+        isinstance(instance, UserProfile) and _membership_changed(instance) for instance in db.dirty
+    ):
+        db.info['team_membership_changed'] = True
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def _collect_bulk_membership_changes(orm_execute_state):
+    # Core and bulk statements (e.g. CSV user imports) bypass the flush
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if getattr(table, 'name', None) == UserProfile.__tablename__:
+        orm_execute_state.session.info['team_membership_changed'] = True
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _invalidate_team_membership(db):
+    if db.info.pop('team_membership_changed', False):
+        team_membership.invalidate()
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _discard_membership_changes(db):
+    db.info.pop('team_membership_changed', None)
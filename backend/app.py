@@ -1,9 +1,11 @@
 from flask import Flask, render_template, redirect, url_for, session, request
-from flask_session import Session
 from dotenv import load_dotenv
 import os
-import subprocess
 from config import Config
+from build_info import load_build_info
+from session_store import init_sessions
+from perf import init_perf
+from metrics import init_metrics
 
 # Load environment variables
 load_dotenv()
@@ -14,19 +16,6 @@ from blueprints.admin import admin_bp
 from blueprints.api import api_bp
 from blueprints.auth import auth
 
-def get_git_revision_short_hash():
-    """Get the short git commit hash for version tracking"""
-    # First check if we have it as an environment variable (from Docker build)
-    git_commit = os.getenv('GIT_COMMIT')
-    if git_commit and git_commit != 'unknown':
-        return git_commit
-    
-    # Otherwise try to get it from git command
-    try:
-        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).decode('ascii').strip()
-    except:
-        return 'unknown'
-
 def create_app():
     app = Flask(__name__)
     
@@ -34,11 +23,39 @@ def create_app():
     app.config.from_object(Config)
     
     # Initialize extensions
-    Session(app)
+    init_sessions(app)
+    init_perf(app)
+    init_metrics(app)
     
     # Ensure database tables exist and teams are initialized
-    from database import init_db
+    from database import init_db, ensure_columns, ensure_indexes
     init_db()
+    ensure_columns()
+    ensure_indexes()
+    
+    # Build the spending rollup on first run
+    from spending_rollup import ensure_spending_rollup
+    ensure_spending_rollup()
+    
+    # Populate unread notification counters on first run
+    from notification_counters import ensure_unread_counters
+    ensure_unread_counters()
+    
+    # Build the full-text search index on first run
+    from search_index import ensure_search_index
+    ensure_search_index()
+    
+    # Deliver any mail left queued by a previous run
+    from email_outbox import email_sender
+    email_sender.start()
+    
+    # Wake /api/changes long-polls when the change journal grows
+    from change_journal import change_broker
+    change_broker.start()
+    
+    # Run or resume queued bulk imports
+    from import_jobs import import_runner
+    import_runner.start()
     
     # Ensure predefined teams exist
     from initialize_teams import ensure_teams_exist
@@ -64,10 +81,12 @@ def create_app():
         except ImportError:
             pass
     
-    # Make git commit hash available to all templates
+    # Resolve build metadata once and make the git commit hash available to all templates
+    build_info = load_build_info()
+    
     @app.context_processor
     def inject_git_commit():
-        return {'git_commit': get_git_revision_short_hash()}
+        return {'git_commit': build_info['git_commit']}
     
     # Add cache control headers for admin pages
     @app.after_request
@@ -52,7 +52,7 @@ def create_verification_code(db: Session, email: str):
     db.commit()
     
     # Send email
-    email_sent = send_verification_code(email, code)
+    email_sent = send_verification_code(email, code, verification.expires_at)
     
     return {
         'success': True,
@@ -1,199 +1,36 @@
-from flask import Blueprint, jsonify, request, session
-from database import get_session
-from models import Idea, Skill, Team, Claim, IdeaStatus, PriorityLevel, IdeaSize, EmailSettings, UserProfile, Notification, user_skills, ClaimApproval, ManagerRequest, idea_skills, SubStatus, StatusHistory, IdeaStageData, IdeaActivity, ActivityType, IdeaComment, IdeaExternalLink, ExternalLinkType, Bounty
+from flask import Blueprint, jsonify, request, session, Response, stream_with_context
+from database import get_session, get_read_session
+from models import Idea, Skill, Team, Claim, IdeaStatus, PriorityLevel, IdeaSize, EmailSettings, UserProfile, Notification, user_skills, ClaimApproval, ManagerRequest, idea_skills, SubStatus, StatusHistory, IdeaStageData, IdeaActivity, ActivityType, IdeaComment, IdeaExternalLink, ExternalLinkType, Bounty, ImportJob
 from sqlalchemy import desc, asc, func, or_
 from datetime import datetime
 from decorators import require_verified_email
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import csv
-import io
+from user_context import get_user_context
+from access_control import check_idea_tab_access, idea_tab_access_filter
+from idea_tabs import (serialize_comments, serialize_external_links, serialize_activities, serialize_status_history,
+                       serialize_stage_data, build_idea_bundle, BUNDLE_SECTIONS)
 from werkzeug.datastructures import FileStorage
 from uuid_utils import get_by_identifier, get_identifier_for_url, is_valid_uuid
+from idea_listing import with_listing_relations, get_claimer_names, serialize_bounty_details, serialize_claims, serialize_ideas, parse_fields, apply_sort, apply_cursor, encode_cursor
+from config import Config
+from team_analytics import build_team_stats, build_teams_overview
+from spending_rollup import spending_snapshot, record_spending_change
+from build_info import get_build_info
+from notification_events import notification_broker
+from notification_counters import get_unread_count
+from email_outbox import send_immediately
+from csv_import import CsvImportError
+from import_jobs import create_import_job, serialize_import_job
+from search_index import index_available, search_ideas, match_terms, render_snippet
+from data_versions import versioned
+from change_journal import TOPIC_TABLES, change_broker, current_change_id
+from stats_cache import stats_cache
+from perf import perf_recorder
+import json
+import queue
+import time
 
 api_bp = Blueprint('api', __name__)
 
-def check_idea_tab_access(idea, user_email, db):
-    """Check if user has access to sensitive idea tabs (comments, links, activity)."""
-    if not user_email:
-        return False
-    
-    # Admin always has access
-    if session.get('is_admin'):
-        return True
-    
-    # Idea submitter has access
-    if idea.email == user_email:
-        return True
-    
-    # Direct claimer has access
-    if any(claim.claimer_email == user_email for claim in idea.claims):
-        return True
-    
-    # Manager of submitter or claimer has access
-    user_profile = db.query(UserProfile).filter_by(
-        email=user_email,
-        role='manager'
-    ).first()
-    
-    if user_profile and user_profile.managed_team_uuid:
-        # Get all team members' emails
-        team_members = db.query(UserProfile).filter_by(
-            team_uuid=user_profile.managed_team_uuid
-        ).all()
-        team_emails = [member.email for member in team_members]
-        
-        # Check if submitter is in the team
-        if idea.email in team_emails:
-            return True
-        # Check if any claimer is in the team
-        if any(claim.claimer_email in team_emails for claim in idea.claims):
-            return True
-    
-    return False
-
-def calculate_team_spending_analytics(team, team_member_emails, db):
-    """Calculate spending analytics for a team."""
-    from models import Bounty
-    from datetime import datetime, timedelta
-    
-    # Total approved spend (all approved monetary bounties for team's ideas)
-    total_approved_spend = db.query(func.sum(Bounty.amount)).join(
-        Idea, Bounty.idea_uuid == Idea.uuid
-    ).filter(
-        Idea.benefactor_team == team.name,
-        Bounty.is_monetary == True,
-        Bounty.is_approved == True
-    ).scalar() or 0.0
-    
-    # Total expensed (approved monetary bounties marked as expensed)
-    total_expensed = db.query(func.sum(Bounty.amount)).join(
-        Idea, Bounty.idea_uuid == Idea.uuid
-    ).filter(
-        Idea.benefactor_team == team.name,
-        Bounty.is_monetary == True,
-        Bounty.is_approved == True,
-        Bounty.is_expensed == True
-    ).scalar() or 0.0
-    
-    # Pending approval spend (monetary bounties awaiting approval)
-    pending_approval_spend = db.query(func.sum(Bounty.amount)).join(
-        Idea, Bounty.idea_uuid == Idea.uuid
-    ).filter(
-        Idea.benefactor_team == team.name,
-        Bounty.is_monetary == True,
-        Bounty.requires_approval == True,
-        or_(Bounty.is_approved == None, Bounty.is_approved == False)
-    ).scalar() or 0.0
-    
-    # Actual spend (bounties for completed ideas)
-    actual_spend = db.query(func.sum(Bounty.amount)).join(
-        Idea, Bounty.idea_uuid == Idea.uuid
-    ).filter(
-        Idea.benefactor_team == team.name,
-        Idea.status == IdeaStatus.complete,
-        Bounty.is_monetary == True,
-        Bounty.is_approved == True
-    ).scalar() or 0.0
-    
-    # Committed spend (bounties for claimed but not complete ideas)
-    committed_spend = db.query(func.sum(Bounty.amount)).join(
-        Idea, Bounty.idea_uuid == Idea.uuid
-    ).filter(
-        Idea.benefactor_team == team.name,
-        Idea.status == IdeaStatus.claimed,
-        Bounty.is_monetary == True,
-        Bounty.is_approved == True
-    ).scalar() or 0.0
-    
-    # Spending by priority
-    spending_by_priority = {}
-    priority_spend_query = db.query(Idea.priority, func.sum(Bounty.amount)).join(
-        Bounty, Idea.uuid == Bounty.idea_uuid
-    ).filter(
-        Idea.benefactor_team == team.name,
-        Bounty.is_monetary == True,
-        Bounty.is_approved == True
-    ).group_by(Idea.priority).all()
-    
-    for priority, amount in priority_spend_query:
-        spending_by_priority[priority.value] = float(amount or 0)
-    
-    # Spending by size
-    spending_by_size = {}
-    size_spend_query = db.query(Idea.size, func.sum(Bounty.amount)).join(
-        Bounty, Idea.uuid == Bounty.idea_uuid
-    ).filter(
-        Idea.benefactor_team == team.name,
-        Bounty.is_monetary == True,
-        Bounty.is_approved == True
-    ).group_by(Idea.size).all()
-    
-    for size, amount in size_spend_query:
-        spending_by_size[size.value] = float(amount or 0)
-    
-    # Top spenders (team members with highest bounty claims)
-    top_spenders = []
-    if team_member_emails:
-        spender_query = db.query(
-            Claim.claimer_email,
-            UserProfile.name,
-            func.sum(Bounty.amount).label('total_claimed')
-        ).join(
-            Idea, Claim.idea_uuid == Idea.uuid
-        ).join(
-            Bounty, Idea.uuid == Bounty.idea_uuid
-        ).join(
-            UserProfile, Claim.claimer_email == UserProfile.email
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Bounty.is_monetary == True,
-            Bounty.is_approved == True
-        ).group_by(Claim.claimer_email, UserProfile.name).order_by(
-            func.sum(Bounty.amount).desc()
-        ).limit(10).all()
-        
-        for email, name, total in spender_query:
-            top_spenders.append({
-                'email': email,
-                'name': name,
-                'total_claimed': float(total or 0)
-            })
-    
-    # Monthly spending trend (last 6 months)
-    monthly_spending = []
-    for i in range(5, -1, -1):
-        start_date = datetime.utcnow().replace(day=1) - timedelta(days=i * 30)
-        end_date = (start_date + timedelta(days=32)).replace(day=1)
-        
-        month_spend = db.query(func.sum(Bounty.amount)).join(
-            Idea, Bounty.idea_uuid == Idea.uuid
-        ).filter(
-            Idea.benefactor_team == team.name,
-            Idea.date_submitted >= start_date,
-            Idea.date_submitted < end_date,
-            Bounty.is_monetary == True,
-            Bounty.is_approved == True
-        ).scalar() or 0.0
-        
-        monthly_spending.append({
-            'month': start_date.strftime('%B %Y'),
-            'amount': float(month_spend)
-        })
-    
-    return {
-        'total_approved_spend': float(total_approved_spend),
-        'total_expensed': float(total_expensed),
-        'pending_approval_spend': float(pending_approval_spend),
-        'actual_spend': float(actual_spend),
-        'committed_spend': float(committed_spend),
-        'spending_by_priority': spending_by_priority,
-        'spending_by_size': spending_by_size,
-        'top_spenders': top_spenders,
-        'monthly_spending': monthly_spending
-    }
-
 @api_bp.route('/health')
 def health_check():
     """Health check endpoint for monitoring."""
@@ -207,7 +44,8 @@ def health_check():
         
         return jsonify({
             'status': 'healthy',
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow().isoformat(),
+            'build': get_build_info()
         }), 200
     except Exception as e:
         return jsonify({
@@ -217,34 +55,58 @@ def health_check():
         }), 503
 
 @api_bp.route('/ideas')
+@versioned('ideas', 'idea_skills', 'skills', 'claims', 'bounties', 'user_profiles')
 def get_ideas():
-    """Get filtered and sorted ideas."""
-    db = get_session()
+    """Get filtered and sorted ideas.
+    
+    Passing limit or cursor switches to keyset pagination and returns
+    {'ideas', 'next_cursor', 'has_more'}; fields= limits the returned keys.
+    """
+    fields, invalid_fields = parse_fields(request.args.get('fields'))
+    if invalid_fields:
+        return jsonify({'error': f"Unknown fields: {', '.join(invalid_fields)}"}), 400
+    
+    paginate = 'limit' in request.args or 'cursor' in request.args
+    if paginate:
+        try:
+            limit = int(request.args.get('limit', Config.IDEAS_PER_PAGE))
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+        limit = max(1, min(limit, Config.IDEAS_MAX_PER_PAGE))
+    
+    db = get_read_session()
     try:
         query = db.query(Idea)
         
         # Apply filters
         skill_filter = request.args.get('skill')
-        if skill_filter:
-            if is_valid_uuid(skill_filter):
-                query = query.join(Idea.skills).filter(Skill.uuid == skill_filter)
-            else:
-                return jsonify({'error': 'Invalid skill identifier'}), 400
-        
-        priority_filter = request.args.get('priority')
-        if priority_filter:
-            query = query.filter(Idea.priority == PriorityLevel(priority_filter))
+        if skill_filter and not is_valid_uuid(skill_filter):
+            return jsonify({'error': 'Invalid skill identifier'}), 400
+        query = apply_idea_filters(query)
         
-        status_filter = request.args.get('status')
-        if status_filter:
-            query = query.filter(Idea.status == IdeaStatus(status_filter))
+        sort_by = request.args.get('sort', 'date_desc')
         
-        team_filter = request.args.get('benefactor_team')
-        if team_filter:
-            query = query.filter(Idea.benefactor_team == team_filter)
+        if paginate:
+            # Keyset pagination: stable order with uuid as tie-breaker
+            query = apply_sort(query, sort_by)
+            cursor = request.args.get('cursor')
+            if cursor:
+                try:
+                    query = apply_cursor(query, cursor, sort_by)
+                except (ValueError, TypeError, AttributeError):
+                    return jsonify({'error': 'Invalid cursor'}), 400
+            
+            ideas = with_listing_relations(query, fields).limit(limit + 1).all()
+            has_more = len(ideas) > limit
+            ideas = ideas[:limit]
+            
+            return jsonify({
+                'ideas': serialize_ideas(ideas, db, fields),
+                'next_cursor': encode_cursor(ideas[-1], sort_by) if has_more else None,
+                'has_more': has_more
+            })
         
         # Apply sorting
-        sort_by = request.args.get('sort', 'date_desc')
         if sort_by == 'date_desc':
             query = query.order_by(desc(Idea.date_submitted))
         elif sort_by == 'date_asc':
@@ -254,54 +116,94 @@ def get_ideas():
         elif sort_by == 'size':
             query = query.order_by(asc(Idea.size))
         
-        ideas = query.all()
-        
-        # Serialize ideas
-        ideas_data = []
-        for idea in ideas:
-            idea_dict = {
-                'uuid': idea.uuid,
-                'title': idea.title,
-                'description': idea.description,
-                'email': idea.email,
-                'submitter_name': idea.submitter.name if idea.submitter else None,
-                'benefactor_team': idea.benefactor_team,
-                'priority': idea.priority.value,
-                'size': idea.size.value,
-                'status': idea.status.value,
-                'bounty': idea.bounty,
-                'bounty_details': {
-                    'is_monetary': idea.bounty_details[0].is_monetary,
-                    'is_expensed': idea.bounty_details[0].is_expensed,
-                    'amount': idea.bounty_details[0].amount,
-                    'requires_approval': idea.bounty_details[0].requires_approval,
-                    'is_approved': idea.bounty_details[0].is_approved
-                } if idea.bounty_details and len(idea.bounty_details) > 0 else None,
-                'sub_status': idea.sub_status.value if idea.sub_status else None,
-                'sub_status_updated_at': idea.sub_status_updated_at.strftime('%Y-%m-%d %H:%M') if idea.sub_status_updated_at else None,
-                'sub_status_updated_by': idea.sub_status_updated_by,
-                'progress_percentage': idea.progress_percentage or 0,
-                'blocked_reason': idea.blocked_reason,
-                'expected_completion': idea.expected_completion.strftime('%Y-%m-%d') if idea.expected_completion else None,
-                'needed_by': idea.needed_by.strftime('%Y-%m-%d') if idea.needed_by else None,
-                'date_submitted': idea.date_submitted.strftime('%Y-%m-%d'),
-                'skills': [{'uuid': s.uuid, 'name': s.name} for s in idea.skills],
-                'claims': [{
-                    'name': db.query(UserProfile).filter_by(email=c.claimer_email).first().name if db.query(UserProfile).filter_by(email=c.claimer_email).first() else c.claimer_email,
-                    'email': c.claimer_email,
-                    'date': c.claim_date.strftime('%Y-%m-%d')
-                } for c in idea.claims]
-            }
-            ideas_data.append(idea_dict)
+        ideas = with_listing_relations(query, fields).all()
+        ideas_data = serialize_ideas(ideas, db, fields)
         
         return jsonify(ideas_data)
     finally:
         db.close()
 
+def apply_idea_filters(query):
+    """Apply the skill, priority, status and benefactor_team filters from the query string."""
+    skill_filter = request.args.get('skill')
+    if skill_filter:
+        query = query.join(Idea.skills).filter(Skill.uuid == skill_filter)
+    
+    priority_filter = request.args.get('priority')
+    if priority_filter:
+        query = query.filter(Idea.priority == PriorityLevel(priority_filter))
+    
+    status_filter = request.args.get('status')
+    if status_filter:
+        query = query.filter(Idea.status == IdeaStatus(status_filter))
+    
+    team_filter = request.args.get('benefactor_team')
+    if team_filter:
+        query = query.filter(Idea.benefactor_team == team_filter)
+    return query
+
+@api_bp.route('/ideas/search')
+def search_ideas_endpoint():
+    """Full-text search over idea titles, descriptions, comments and skills.
+    
+    Takes q plus the same filters as /api/ideas and returns
+    {'ideas', 'total', 'offset', 'has_more'} ordered by relevance, each idea
+    carrying a highlighted 'snippet'. Comments are only searched on ideas
+    whose tabs the caller can see.
+    """
+    terms = match_terms(request.args.get('q', ''))
+    if not terms:
+        return jsonify({'error': 'Search text is required'}), 400
+    
+    fields, invalid_fields = parse_fields(request.args.get('fields'))
+    if invalid_fields:
+        return jsonify({'error': f"Unknown fields: {', '.join(invalid_fields)}"}), 400
+    
+    try:
+        limit = max(1, min(int(request.args.get('limit', Config.IDEAS_PER_PAGE)), Config.IDEAS_MAX_PER_PAGE))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or offset'}), 400
+    
+    skill_filter = request.args.get('skill')
+    if skill_filter and not is_valid_uuid(skill_filter):
+        return jsonify({'error': 'Invalid skill identifier'}), 400
+    
+    db = get_read_session()
+    try:
+        dialect_name = db.get_bind().dialect.name
+        if not index_available(db.connection()):
+            return jsonify({'error': 'Search is not available on this database'}), 501
+        
+        query, rank, snippet = search_ideas(apply_idea_filters(db.query(Idea.uuid)), dialect_name, terms,
+                                            idea_tab_access_filter(session.get('user_email')))
+        total = query.with_entities(func.count(Idea.uuid)).scalar()
+        matches = query.add_columns(rank, snippet).order_by(rank, Idea.uuid).limit(limit).offset(offset).all()
+        
+        # Load the page of ideas with the listing relations, then restore relevance order
+        ideas_by_uuid = {idea.uuid: idea for idea in with_listing_relations(
+            db.query(Idea).filter(Idea.uuid.in_([match[0] for match in matches])), fields
+        ).all()}
+        ideas = [ideas_by_uuid[match[0]] for match in matches if match[0] in ideas_by_uuid]
+        ideas_data = serialize_ideas(ideas, db, fields)
+        snippets = {match[0]: render_snippet(match[2]) for match in matches}
+        for idea, idea_data in zip(ideas, ideas_data):
+            idea_data['snippet'] = snippets[idea.uuid]
+        
+        return jsonify({
+            'ideas': ideas_data,
+            'total': total,
+            'offset': offset,
+            'has_more': offset + len(matches) < total
+        })
+    finally:
+        db.close()
+
 @api_bp.route('/skills')
+@versioned('skills')
 def get_skills():
     """Get all skills."""
-    db = get_session()
+    db = get_read_session()
     try:
         skills = db.query(Skill).order_by(Skill.name).all()
         return jsonify([{'uuid': s.uuid, 'name': s.name} for s in skills])
@@ -434,9 +336,10 @@ def get_team_members(identifier):
         db.close()
 
 @api_bp.route('/teams')
+@versioned('teams')
 def get_teams():
     """Get teams - all for admin, approved only for others."""
-    db = get_session()
+    db = get_read_session()
     try:
         if session.get('is_admin'):
             # Admin sees all teams with approval status
@@ -656,16 +559,22 @@ def approve_bounty(identifier):
             return jsonify({'success': False, 'message': 'Bounty has already been processed'}), 400
         
         # Approve the bounty
+        spending_before = spending_snapshot(db, idea)
         bounty.is_approved = True
         bounty.approved_by = session.get('user_email', 'admin')
         bounty.approved_at = datetime.utcnow()
+        record_spending_change(db, spending_before, idea)
         
-        # Remove any pending approval notifications
-        db.query(Notification).filter_by(
+        # Remove any pending approval notifications (per row, so the change is
+        # recorded for notification streams)
+        pending_notifications = db.query(Notification).filter_by(
             idea_uuid=idea.uuid,
             type='bounty_approval',
             is_read=False
-        ).update({'is_read': True, 'read_at': datetime.utcnow()})
+        ).all()
+        for pending_notification in pending_notifications:
+            pending_notification.is_read = True
+            pending_notification.read_at = datetime.utcnow()
         
         # Notify the submitter
         notification = Notification(
@@ -701,6 +610,7 @@ def update_idea(identifier):
         
         data = request.json
         old_status = idea.status
+        spending_before = spending_snapshot(db, idea)
         
         if 'title' in data:
             idea.title = data['title']
@@ -793,6 +703,8 @@ def update_idea(identifier):
                 skills = db.query(Skill).filter(Skill.uuid.in_(skill_uuids)).all()
                 idea.skills = skills
         
+        record_spending_change(db, spending_before, idea)
+        
         db.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -815,7 +727,11 @@ def delete_idea(identifier):
         if not idea:
             return jsonify({'success': False, 'message': 'Idea not found'}), 404
         
+        spending_before = spending_snapshot(db, idea)
+        # The bounty backref has no delete cascade
+        db.query(Bounty).filter_by(idea_uuid=idea.uuid).delete(synchronize_session=False)
         db.delete(idea)
+        record_spending_change(db, spending_before)
         db.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -843,7 +759,9 @@ def unclaim_idea(identifier):
         claims_deleted = db.query(Claim).filter(Claim.idea_uuid == idea.uuid).delete()
         
         # Reset idea status to open
+        spending_before = spending_snapshot(db, idea)
         idea.status = IdeaStatus.open
+        record_spending_change(db, spending_before, idea)
         
         db.commit()
         return jsonify({
@@ -858,101 +776,30 @@ def unclaim_idea(identifier):
 
 @api_bp.route('/stats')
 def get_stats():
-    """Get dashboard statistics."""
-    db = get_session()
+    """Get dashboard statistics (cached; see stats_cache.py)."""
+    db = get_read_session()
     try:
-        from models import Bounty
-        
-        # Basic stats
-        stats = {
-            'total_ideas': db.query(Idea).count(),
-            'open_ideas': db.query(Idea).filter(Idea.status == IdeaStatus.open).count(),
-            'claimed_ideas': db.query(Idea).filter(Idea.status == IdeaStatus.claimed).count(),
-            'complete_ideas': db.query(Idea).filter(Idea.status == IdeaStatus.complete).count(),
-            'total_skills': db.query(Skill).count()
-        }
-        
-        # Organization-wide spending analytics
-        # Total approved spend across all teams
-        total_approved_spend = db.query(func.sum(Bounty.amount)).filter(
-            Bounty.is_monetary == True,
-            Bounty.is_approved == True
-        ).scalar() or 0.0
-        
-        # Total expensed across all teams
-        total_expensed = db.query(func.sum(Bounty.amount)).filter(
-            Bounty.is_monetary == True,
-            Bounty.is_approved == True,
-            Bounty.is_expensed == True
-        ).scalar() or 0.0
-        
-        # Pending approval spend
-        pending_approval_spend = db.query(func.sum(Bounty.amount)).filter(
-            Bounty.is_monetary == True,
-            Bounty.requires_approval == True,
-            or_(Bounty.is_approved == None, Bounty.is_approved == False)
-        ).scalar() or 0.0
-        
-        # Actual spend (completed ideas)
-        actual_spend = db.query(func.sum(Bounty.amount)).join(
-            Idea, Bounty.idea_uuid == Idea.uuid
-        ).filter(
-            Idea.status == IdeaStatus.complete,
-            Bounty.is_monetary == True,
-            Bounty.is_approved == True
-        ).scalar() or 0.0
-        
-        # Committed spend (claimed ideas)
-        committed_spend = db.query(func.sum(Bounty.amount)).join(
-            Idea, Bounty.idea_uuid == Idea.uuid
-        ).filter(
-            Idea.status == IdeaStatus.claimed,
-            Bounty.is_monetary == True,
-            Bounty.is_approved == True
-        ).scalar() or 0.0
-        
-        # Top spending teams
-        top_teams_query = db.query(
-            Idea.benefactor_team,
-            func.sum(Bounty.amount).label('total_spend')
-        ).join(
-            Bounty, Idea.uuid == Bounty.idea_uuid
-        ).filter(
-            Bounty.is_monetary == True,
-            Bounty.is_approved == True
-        ).group_by(Idea.benefactor_team).order_by(
-            func.sum(Bounty.amount).desc()
-        ).limit(10).all()
-        
-        top_spending_teams = []
-        for team_name, total in top_teams_query:
-            top_spending_teams.append({
-                'team': team_name,
-                'total_spend': float(total or 0)
-            })
-        
-        stats['spending'] = {
-            'total_approved_spend': float(total_approved_spend),
-            'total_expensed': float(total_expensed),
-            'pending_approval_spend': float(pending_approval_spend),
-            'actual_spend': float(actual_spend),
-            'committed_spend': float(committed_spend),
-            'top_spending_teams': top_spending_teams
-        }
-        
-        # Add spending_analytics to stats
-        stats['spending_analytics'] = {
-            'total_approved_spend': float(total_approved_spend),
-            'total_expensed': float(total_expensed),
-            'pending_approval_spend': float(pending_approval_spend),
-            'actual_spend': float(actual_spend),
-            'committed_spend': float(committed_spend),
-            'top_spending_teams': top_spending_teams
-        }
-        
-        return jsonify(stats)
+        cached = stats_cache.get(db)
     finally:
         db.close()
+    
+    response = Response(cached.payload, mimetype='application/json')
+    response.set_etag(cached.etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@api_bp.route('/admin/perf', methods=['GET', 'DELETE'])
+def admin_perf_report():
+    """Per-endpoint query counts, DB time and latency for this worker (DELETE resets)."""
+    if not session.get('is_admin'):
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    if not Config.PERF_INSTRUMENTATION:
+        return jsonify({'error': 'Set PERF_INSTRUMENTATION=1 to collect performance data'}), 404
+    
+    if request.method == 'DELETE':
+        perf_recorder.reset()
+        return jsonify({'success': True})
+    return jsonify(perf_recorder.report())
 
 @api_bp.route('/admin/notifications')
 def get_admin_notifications():
@@ -1123,6 +970,108 @@ def _get_time_ago(timestamp):
     else:
         return "just now"
 
+@api_bp.route('/user/notifications/count')
+def get_user_notification_count():
+    """Get the current user's unread notification count without loading rows."""
+    if not session.get('user_verified'):
+        return jsonify({'success': False, 'message': 'Authentication required'}), 401
+    
+    user_email = session.get('user_email')
+    if not user_email:
+        return jsonify({'success': False, 'message': 'User email not found'}), 400
+    
+    emails = [user_email]
+    if session.get('is_admin'):
+        # Admins also see system notifications
+        emails.append('admin@system.local')
+    
+    db = get_session()
+    try:
+        return jsonify({'success': True, 'unread_count': get_unread_count(db, emails)})
+    finally:
+        db.close()
+
+@api_bp.route('/user/notifications/stream')
+def stream_user_notifications():
+    """Stream notification changes for the current user as Server-Sent Events."""
+    if not session.get('user_verified'):
+        return jsonify({'success': False, 'message': 'Authentication required'}), 401
+    
+    user_email = session.get('user_email')
+    if not user_email:
+        return jsonify({'success': False, 'message': 'User email not found'}), 400
+    
+    emails = [user_email]
+    if session.get('is_admin'):
+        # Admins also see system notifications
+        emails.append('admin@system.local')
+    
+    subscription = notification_broker.subscribe(emails)
+    if subscription is None:
+        # 204 tells EventSource not to reconnect; the client polls /count instead
+        return Response(status=204, headers={'Cache-Control': 'no-store'})
+    
+    def generate():
+        started = time.monotonic()
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield 'retry: 5000\n\n'
+            while time.monotonic() - started < Config.NOTIFICATION_STREAM_MAX_DURATION:
+                try:
+                    event_data = subscription.get(timeout=Config.NOTIFICATION_STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: notification\ndata: {json.dumps(event_data)}\n\n"
+        finally:
+            notification_broker.unsubscribe(subscription)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@api_bp.route('/changes')
+def wait_for_changes():
+    """Long-poll the change journal.
+    
+    Without since= returns the current journal id at once. With since=<id>
+    waits up to CHANGE_LONG_POLL_TIMEOUT seconds for a change to one of the
+    topics= (skills, teams, ideas, users) and returns {'version', 'changes'};
+    'changes' is empty when the wait timed out.
+    """
+    if not session.get('is_admin'):
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    topics = [topic for topic in request.args.get('topics', '').split(',') if topic]
+    unknown = [topic for topic in topics if topic not in TOPIC_TABLES]
+    if not topics or unknown:
+        return jsonify({'error': f"topics must be a comma-separated list of: {', '.join(TOPIC_TABLES)}"}), 400
+    
+    since = request.args.get('since')
+    if since is None:
+        db = get_session()
+        try:
+            version, changes = current_change_id(db), []
+        finally:
+            db.close()
+    else:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'error': 'Invalid since'}), 400
+        version, changes = change_broker.wait(since, topics, Config.CHANGE_LONG_POLL_TIMEOUT)
+        if changes is None:
+            # Too many long-polls waiting in this worker; ask the client to come back later
+            response = jsonify({'version': version, 'changes': [], 'retry_after': Config.CHANGE_LONG_POLL_BUSY_RETRY})
+            response.headers['Retry-After'] = str(Config.CHANGE_LONG_POLL_BUSY_RETRY)
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+    
+    response = jsonify({'version': version, 'changes': changes})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @api_bp.route('/user/notifications/<identifier>/read', methods=['POST'])
 def mark_notification_read(identifier):
     """Mark a notification as read."""
@@ -1332,271 +1281,7 @@ def get_team_stats():
             UserProfile.email != user_email  # Exclude the manager
         ).all()
         
-        team_member_emails = [member.email for member in team_members]
-        
-        # Basic counts
-        team_submitted = db.query(Idea).filter(
-            Idea.email.in_(team_member_emails)
-        ).count()
-        
-        # Get claimed ideas by team members with proper join
-        from models import ClaimApproval
-        team_claimed = db.query(func.count(func.distinct(Claim.idea_uuid))).join(
-            Idea, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).scalar() or 0
-        
-        # Status breakdown of team's claimed ideas
-        status_breakdown = {}
-        claimed_status_query = db.query(Idea.status, func.count(Idea.uuid)).join(
-            Claim, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).group_by(Idea.status).all()
-        
-        for status, count in claimed_status_query:
-            status_breakdown[status.value] = count
-        
-        # Submitted ideas by status
-        submitted_status_breakdown = {}
-        submitted_status_query = db.query(Idea.status, func.count(Idea.uuid)).filter(
-            Idea.email.in_(team_member_emails)
-        ).group_by(Idea.status).all()
-        
-        for status, count in submitted_status_query:
-            submitted_status_breakdown[status.value] = count
-        
-        # Priority breakdown - split by submitted vs claimed
-        priority_submitted = {}
-        priority_submitted_query = db.query(Idea.priority, func.count(Idea.uuid)).filter(
-            Idea.email.in_(team_member_emails)
-        ).group_by(Idea.priority).all()
-        
-        for priority, count in priority_submitted_query:
-            priority_submitted[priority.value] = count
-            
-        priority_claimed = {}
-        priority_claimed_query = db.query(Idea.priority, func.count(Idea.uuid)).join(
-            Claim, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).group_by(Idea.priority).all()
-        
-        for priority, count in priority_claimed_query:
-            priority_claimed[priority.value] = count
-        
-        # Size breakdown - split by submitted vs claimed
-        size_submitted = {}
-        size_submitted_query = db.query(Idea.size, func.count(Idea.uuid)).filter(
-            Idea.email.in_(team_member_emails)
-        ).group_by(Idea.size).all()
-        
-        for size, count in size_submitted_query:
-            size_submitted[size.value] = count
-            
-        size_claimed = {}
-        size_claimed_query = db.query(Idea.size, func.count(Idea.uuid)).join(
-            Claim, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).group_by(Idea.size).all()
-        
-        for size, count in size_claimed_query:
-            size_claimed[size.value] = count
-        
-        # Team member skills - get all skills of team members
-        team_skills = {}
-        for member in team_members:
-            member_skills = db.query(Skill.name).join(
-                user_skills, Skill.uuid == user_skills.c.skill_uuid
-            ).filter(
-                user_skills.c.user_email == member.email
-            ).all()
-            
-            for (skill_name,) in member_skills:
-                team_skills[skill_name] = team_skills.get(skill_name, 0) + 1
-        
-        # Sort team skills by count
-        team_skills_list = [{'skill': skill, 'count': count} 
-                           for skill, count in sorted(team_skills.items(), 
-                                                    key=lambda x: x[1], 
-                                                    reverse=True)][:10]
-        
-        # Skills needed for ideas submitted by this team
-        skills_needed = {}
-        team_submitted_ideas = db.query(Idea).filter(
-            Idea.email.in_(team_member_emails)
-        ).all()
-        
-        for idea in team_submitted_ideas:
-            idea_skill_list = db.query(Skill.name).join(
-                idea_skills, Skill.uuid == idea_skills.c.skill_uuid
-            ).filter(
-                idea_skills.c.idea_uuid == idea.uuid
-            ).all()
-            
-            for (skill_name,) in idea_skill_list:
-                skills_needed[skill_name] = skills_needed.get(skill_name, 0) + 1
-        
-        # Sort skills needed by count
-        skills_needed_list = [{'skill': skill, 'count': count} 
-                             for skill, count in sorted(skills_needed.items(), 
-                                                      key=lambda x: x[1], 
-                                                      reverse=True)][:10]
-        
-        # Team member activity
-        member_activity = []
-        for member in team_members:
-            submitted_count = db.query(Idea).filter(Idea.email == member.email).count()
-            claimed_count = db.query(Claim).filter(Claim.claimer_email == member.email).count()
-            completed_count = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.status == IdeaStatus.complete
-            ).count()
-            
-            # Claims for own team vs other teams
-            own_team_claims = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team == team.name
-            ).count()
-            
-            other_team_claims = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team != team.name
-            ).count()
-            
-            # Completed for own team vs other teams
-            own_team_completed = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team == team.name,
-                Idea.status == IdeaStatus.complete
-            ).count()
-            
-            other_team_completed = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team != team.name,
-                Idea.status == IdeaStatus.complete
-            ).count()
-            
-            # Get member skills
-            member_skills = [skill.name for skill in member.skills] if member.skills else []
-            
-            member_activity.append({
-                'name': member.name,
-                'email': member.email,
-                'role': member.role,
-                'skills': member_skills,
-                'submitted': submitted_count,
-                'claimed': claimed_count,
-                'completed': completed_count,
-                'own_team_claims': own_team_claims,
-                'other_team_claims': other_team_claims,
-                'own_team_completed': own_team_completed,
-                'other_team_completed': other_team_completed
-            })
-        
-        # Sort by total activity
-        member_activity.sort(key=lambda x: x['submitted'] + x['claimed'], reverse=True)
-        
-        # Pending approvals for team
-        pending_approvals = db.query(ClaimApproval).join(
-            Idea, ClaimApproval.idea_uuid == Idea.uuid
-        ).filter(
-            ClaimApproval.claimer_email.in_(team_member_emails),
-            ClaimApproval.status == 'pending',
-            ClaimApproval.manager_approved == None
-        ).count()
-        
-        # Calculate completion rate
-        total_claimed = db.query(Claim).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).count()
-        
-        completed_ideas = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.status == IdeaStatus.complete
-        ).count()
-        
-        completion_rate = round((completed_ideas / total_claimed * 100) if total_claimed > 0 else 0, 1)
-        
-        # Recent activity (last 30 days)
-        from datetime import datetime, timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        recent_submissions = db.query(Idea).filter(
-            Idea.email.in_(team_member_emails),
-            Idea.date_submitted >= thirty_days_ago
-        ).count()
-        
-        recent_claims = db.query(Claim).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Claim.claim_date >= thirty_days_ago
-        ).count()
-        
-        # Team claims breakdown (own team vs other teams)
-        own_team_claims = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team == team.name
-        ).count()
-        
-        other_team_claims = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team != team.name
-        ).count()
-        
-        own_team_completed = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team == team.name,
-            Idea.status == IdeaStatus.complete
-        ).count()
-        
-        other_team_completed = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team != team.name,
-            Idea.status == IdeaStatus.complete
-        ).count()
-        
-        # Calculate spending analytics
-        spending_analytics = calculate_team_spending_analytics(team, team_member_emails, db)
-        
-        stats = {
-            'teamId': team.uuid,
-            'teamName': team.name,
-            'overview': {
-                'total_members': len(team_members),
-                'ideas_submitted': team_submitted,
-                'ideas_claimed': team_claimed,
-                'completion_rate': completion_rate,
-                'pending_approvals': pending_approvals
-            },
-            'breakdowns': {
-                'status': status_breakdown,
-                'submitted_status': submitted_status_breakdown,
-                'priority': {
-                    'submitted': priority_submitted,
-                    'claimed': priority_claimed
-                },
-                'size': {
-                    'submitted': size_submitted,
-                    'claimed': size_claimed
-                },
-                'team_skills': team_skills_list,
-                'skills_needed': skills_needed_list,
-                'team_claims': {
-                    'own_team': own_team_claims,
-                    'other_teams': other_team_claims,
-                    'own_team_completed': own_team_completed,
-                    'other_teams_completed': other_team_completed
-                }
-            },
-            'member_activity': member_activity[:10],  # Top 10 members
-            'recent_activity': {
-                'submissions_30d': recent_submissions,
-                'claims_30d': recent_claims
-            },
-            'spending': spending_analytics
-        }
+        stats = build_team_stats(team, team_members, db)
         
         return jsonify(stats)
     finally:
@@ -1616,61 +1301,7 @@ def get_admin_team_stats():
         
         # If no team_id, return stats for all teams
         if not team_identifier:
-            # Get all teams
-            teams = db.query(Team).order_by(Team.name).all()
-            all_teams_stats = []
-            
-            for team in teams:
-                # Get team members
-                team_members = db.query(UserProfile).filter(
-                    UserProfile.team_uuid == team.uuid
-                ).all()
-                
-                team_member_emails = [member.email for member in team_members]
-                
-                if not team_member_emails:
-                    # Skip teams with no members
-                    continue
-                
-                # Basic counts
-                team_submitted = db.query(Idea).filter(
-                    Idea.email.in_(team_member_emails)
-                ).count()
-                
-                team_claimed = db.query(func.count(func.distinct(Claim.idea_uuid))).join(
-                    Idea, Claim.idea_uuid == Idea.uuid
-                ).filter(
-                    Claim.claimer_email.in_(team_member_emails)
-                ).scalar() or 0
-                
-                # Completion rate
-                completed_ideas = db.query(Claim).join(Idea).filter(
-                    Claim.claimer_email.in_(team_member_emails),
-                    Idea.status == IdeaStatus.complete
-                ).count()
-                
-                completion_rate = round((completed_ideas / team_claimed * 100) if team_claimed > 0 else 0, 1)
-                
-                # Get team's total approved spend
-                from models import Bounty
-                total_approved_spend = db.query(func.sum(Bounty.amount)).join(
-                    Idea, Bounty.idea_uuid == Idea.uuid
-                ).filter(
-                    Idea.benefactor_team == team.name,
-                    Bounty.is_monetary == True,
-                    Bounty.is_approved == True
-                ).scalar() or 0.0
-                
-                all_teams_stats.append({
-                    'uuid': team.uuid,
-                    'name': team.name,
-                    'is_approved': team.is_approved,
-                    'member_count': len(team_members),
-                    'submitted_count': team_submitted,
-                    'claimed_count': team_claimed,
-                    'completion_rate': completion_rate,
-                    'total_approved_spend': float(total_approved_spend)
-                })
+            all_teams_stats = build_teams_overview(db)
             
             return jsonify({'teams_overview': all_teams_stats})
         
@@ -1686,271 +1317,7 @@ def get_admin_team_stats():
             UserProfile.team_uuid == team.uuid
         ).all()
         
-        team_member_emails = [member.email for member in team_members]
-        
-        # Basic counts
-        team_submitted = db.query(Idea).filter(
-            Idea.email.in_(team_member_emails)
-        ).count()
-        
-        # Get claimed ideas by team members with proper join
-        from models import ClaimApproval
-        team_claimed = db.query(func.count(func.distinct(Claim.idea_uuid))).join(
-            Idea, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).scalar() or 0
-        
-        # Status breakdown of team's claimed ideas
-        status_breakdown = {}
-        claimed_status_query = db.query(Idea.status, func.count(Idea.uuid)).join(
-            Claim, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).group_by(Idea.status).all()
-        
-        for status, count in claimed_status_query:
-            status_breakdown[status.value] = count
-        
-        # Submitted ideas by status
-        submitted_status_breakdown = {}
-        submitted_status_query = db.query(Idea.status, func.count(Idea.uuid)).filter(
-            Idea.email.in_(team_member_emails)
-        ).group_by(Idea.status).all()
-        
-        for status, count in submitted_status_query:
-            submitted_status_breakdown[status.value] = count
-        
-        # Priority breakdown - split by submitted vs claimed
-        priority_submitted = {}
-        priority_submitted_query = db.query(Idea.priority, func.count(Idea.uuid)).filter(
-            Idea.email.in_(team_member_emails)
-        ).group_by(Idea.priority).all()
-        
-        for priority, count in priority_submitted_query:
-            priority_submitted[priority.value] = count
-            
-        priority_claimed = {}
-        priority_claimed_query = db.query(Idea.priority, func.count(Idea.uuid)).join(
-            Claim, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).group_by(Idea.priority).all()
-        
-        for priority, count in priority_claimed_query:
-            priority_claimed[priority.value] = count
-        
-        # Size breakdown - split by submitted vs claimed
-        size_submitted = {}
-        size_submitted_query = db.query(Idea.size, func.count(Idea.uuid)).filter(
-            Idea.email.in_(team_member_emails)
-        ).group_by(Idea.size).all()
-        
-        for size, count in size_submitted_query:
-            size_submitted[size.value] = count
-            
-        size_claimed = {}
-        size_claimed_query = db.query(Idea.size, func.count(Idea.uuid)).join(
-            Claim, Claim.idea_uuid == Idea.uuid
-        ).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).group_by(Idea.size).all()
-        
-        for size, count in size_claimed_query:
-            size_claimed[size.value] = count
-        
-        # Team member skills - get all skills of team members
-        team_skills = {}
-        for member in team_members:
-            member_skills = db.query(Skill.name).join(
-                user_skills, Skill.uuid == user_skills.c.skill_uuid
-            ).filter(
-                user_skills.c.user_email == member.email
-            ).all()
-            
-            for (skill_name,) in member_skills:
-                team_skills[skill_name] = team_skills.get(skill_name, 0) + 1
-        
-        # Sort team skills by count
-        team_skills_list = [{'skill': skill, 'count': count} 
-                           for skill, count in sorted(team_skills.items(), 
-                                                    key=lambda x: x[1], 
-                                                    reverse=True)][:10]
-        
-        # Skills needed for ideas submitted by this team
-        skills_needed = {}
-        team_submitted_ideas = db.query(Idea).filter(
-            Idea.email.in_(team_member_emails)
-        ).all()
-        
-        for idea in team_submitted_ideas:
-            idea_skill_list = db.query(Skill.name).join(
-                idea_skills, Skill.uuid == idea_skills.c.skill_uuid
-            ).filter(
-                idea_skills.c.idea_uuid == idea.uuid
-            ).all()
-            
-            for (skill_name,) in idea_skill_list:
-                skills_needed[skill_name] = skills_needed.get(skill_name, 0) + 1
-        
-        # Sort skills needed by count
-        skills_needed_list = [{'skill': skill, 'count': count} 
-                             for skill, count in sorted(skills_needed.items(), 
-                                                      key=lambda x: x[1], 
-                                                      reverse=True)][:10]
-        
-        # Team member activity
-        member_activity = []
-        for member in team_members:
-            submitted_count = db.query(Idea).filter(Idea.email == member.email).count()
-            claimed_count = db.query(Claim).filter(Claim.claimer_email == member.email).count()
-            completed_count = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.status == IdeaStatus.complete
-            ).count()
-            
-            # Claims for own team vs other teams
-            own_team_claims = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team == team.name
-            ).count()
-            
-            other_team_claims = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team != team.name
-            ).count()
-            
-            # Completed for own team vs other teams
-            own_team_completed = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team == team.name,
-                Idea.status == IdeaStatus.complete
-            ).count()
-            
-            other_team_completed = db.query(Claim).join(Idea).filter(
-                Claim.claimer_email == member.email,
-                Idea.benefactor_team != team.name,
-                Idea.status == IdeaStatus.complete
-            ).count()
-            
-            # Get member skills
-            member_skills = [skill.name for skill in member.skills] if member.skills else []
-            
-            member_activity.append({
-                'name': member.name,
-                'email': member.email,
-                'role': member.role,
-                'skills': member_skills,
-                'submitted': submitted_count,
-                'claimed': claimed_count,
-                'completed': completed_count,
-                'own_team_claims': own_team_claims,
-                'other_team_claims': other_team_claims,
-                'own_team_completed': own_team_completed,
-                'other_team_completed': other_team_completed
-            })
-        
-        # Sort by total activity
-        member_activity.sort(key=lambda x: x['submitted'] + x['claimed'], reverse=True)
-        
-        # Pending approvals for team
-        pending_approvals = db.query(ClaimApproval).join(
-            Idea, ClaimApproval.idea_uuid == Idea.uuid
-        ).filter(
-            ClaimApproval.claimer_email.in_(team_member_emails),
-            ClaimApproval.status == 'pending',
-            ClaimApproval.manager_approved == None
-        ).count()
-        
-        # Calculate completion rate
-        total_claimed = db.query(Claim).filter(
-            Claim.claimer_email.in_(team_member_emails)
-        ).count()
-        
-        completed_ideas = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.status == IdeaStatus.complete
-        ).count()
-        
-        completion_rate = round((completed_ideas / total_claimed * 100) if total_claimed > 0 else 0, 1)
-        
-        # Recent activity (last 30 days)
-        from datetime import datetime, timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        recent_submissions = db.query(Idea).filter(
-            Idea.email.in_(team_member_emails),
-            Idea.date_submitted >= thirty_days_ago
-        ).count()
-        
-        recent_claims = db.query(Claim).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Claim.claim_date >= thirty_days_ago
-        ).count()
-        
-        # Team claims breakdown (own team vs other teams)
-        own_team_claims = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team == team.name
-        ).count()
-        
-        other_team_claims = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team != team.name
-        ).count()
-        
-        own_team_completed = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team == team.name,
-            Idea.status == IdeaStatus.complete
-        ).count()
-        
-        other_team_completed = db.query(Claim).join(Idea).filter(
-            Claim.claimer_email.in_(team_member_emails),
-            Idea.benefactor_team != team.name,
-            Idea.status == IdeaStatus.complete
-        ).count()
-        
-        # Calculate spending analytics
-        spending_analytics = calculate_team_spending_analytics(team, team_member_emails, db)
-        
-        stats = {
-            'teamId': team.uuid,
-            'teamName': team.name,
-            'overview': {
-                'total_members': len(team_members),
-                'ideas_submitted': team_submitted,
-                'ideas_claimed': team_claimed,
-                'completion_rate': completion_rate,
-                'pending_approvals': pending_approvals
-            },
-            'breakdowns': {
-                'status': status_breakdown,
-                'submitted_status': submitted_status_breakdown,
-                'priority': {
-                    'submitted': priority_submitted,
-                    'claimed': priority_claimed
-                },
-                'size': {
-                    'submitted': size_submitted,
-                    'claimed': size_claimed
-                },
-                'team_skills': team_skills_list,
-                'skills_needed': skills_needed_list,
-                'team_claims': {
-                    'own_team': own_team_claims,
-                    'other_teams': other_team_claims,
-                    'own_team_completed': own_team_completed,
-                    'other_teams_completed': other_team_completed
-                }
-            },
-            'member_activity': member_activity[:10],  # Top 10 members
-            'recent_activity': {
-                'submissions_30d': recent_submissions,
-                'claims_30d': recent_claims
-            },
-            'spending': spending_analytics
-        }
+        stats = build_team_stats(team, team_members, db)
         
         return jsonify(stats)
     finally:
@@ -1958,6 +1325,7 @@ def get_admin_team_stats():
 
 @api_bp.route('/my-ideas')
 @require_verified_email
+@versioned('ideas', 'idea_skills', 'skills', 'claims', 'bounties', 'user_profiles', 'claim_approvals')
 def get_my_ideas():
     """Get ideas submitted or claimed by the current user."""
     db = get_session()
@@ -1971,7 +1339,7 @@ def get_my_ideas():
         ideas_dict = {}
         
         # Get submitted ideas for the authenticated user
-        submitted_ideas = db.query(Idea).filter(
+        submitted_ideas = with_listing_relations(db.query(Idea)).filter(
             Idea.email == user_email
         ).all()
         
@@ -1982,7 +1350,7 @@ def get_my_ideas():
                 }
             
         # Get claimed ideas
-        claimed_ideas = db.query(Idea).join(Claim).filter(
+        claimed_ideas = with_listing_relations(db.query(Idea)).join(Claim).filter(
             Claim.claimer_email == user_email
         ).all()
         
@@ -2006,6 +1374,7 @@ def get_my_ideas():
         
         
         # Serialize ideas
+        claimer_names = get_claimer_names([item['idea'] for item in sorted_items], db)
         ideas_data = []
         for item in sorted_items:
             idea = item['idea']
@@ -2013,14 +1382,12 @@ def get_my_ideas():
             # Get claim info if this is a claimed idea
             claim_info = None
             if item['relationship'] in ['claimed', 'both']:
-                claim = db.query(Claim).filter(
-                    Claim.idea_uuid == idea.uuid,
-                    Claim.claimer_email == user_email
-                ).first()
+                claim = next((c for c in idea.claims if c.claimer_email == user_email), None)
                 if claim:
                     claim_info = {
-                        'claim_date': claim.claim_date.strftime('%Y-%m-%d'),
-                        'claimer_team': claim.claimer_team
+                        'name': claimer_names.get(claim.claimer_email, claim.claimer_email),
+                        'email': claim.claimer_email,
+                        'date': claim.claim_date.strftime('%Y-%m-%d')
                     }
             
             idea_dict = {
@@ -2033,21 +1400,11 @@ def get_my_ideas():
                 'size': idea.size.value,
                 'status': idea.status.value,
                 'bounty': idea.bounty,
-                'bounty_details': {
-                    'is_monetary': idea.bounty_details[0].is_monetary,
-                    'is_expensed': idea.bounty_details[0].is_expensed,
-                    'amount': idea.bounty_details[0].amount,
-                    'requires_approval': idea.bounty_details[0].requires_approval,
-                    'is_approved': idea.bounty_details[0].is_approved
-                } if idea.bounty_details and len(idea.bounty_details) > 0 else None,
+                'bounty_details': serialize_bounty_details(idea),
                 'benefactor_team': idea.benefactor_team,
                 'date_submitted': idea.date_submitted.strftime('%Y-%m-%d'),
                 'skills': [{'uuid': s.uuid, 'name': s.name} for s in idea.skills],
-                'claims': [{
-                    'name': db.query(UserProfile).filter_by(email=c.claimer_email).first().name if db.query(UserProfile).filter_by(email=c.claimer_email).first() else c.claimer_email,
-                    'email': c.claimer_email,
-                    'date': c.claim_date.strftime('%Y-%m-%d')
-                } for c in idea.claims],
+                'claims': serialize_claims(idea, claimer_names),
                 'relationship': item['relationship'],
                 'claim_info': claim_info
             }
@@ -2510,7 +1867,9 @@ def approve_claim(identifier):
             )
             
             # Update idea status
+            spending_before = spending_snapshot(db, idea)
             idea.status = IdeaStatus.claimed
+            record_spending_change(db, spending_before, idea)
             
             # Update approval status
             approval.status = 'approved'
@@ -2720,8 +2079,8 @@ def update_idea_sub_status(identifier):
             can_update = True
         elif user_role == 'manager' and session.get('user_managed_team_uuid'):
             # Manager can update if idea is for their team
-            user_profile = db.query(UserProfile).filter_by(email=user_email).first()
-            if user_profile and user_profile.managed_team and idea.benefactor_team == user_profile.managed_team.name:
+            user = get_user_context(user_email)
+            if user and user.managed_team_name and idea.benefactor_team == user.managed_team_name:
                 can_update = True
         
         if not can_update:
@@ -2813,7 +2172,9 @@ def update_idea_sub_status(identifier):
         
         # Update main status if needed
         if sub_status_enum in [SubStatus.verified, SubStatus.cancelled]:
+            spending_before = spending_snapshot(db, idea)
             idea.status = IdeaStatus.complete
+            record_spending_change(db, spending_before, idea)
         
         # Create notifications
         notification_messages = {
@@ -2910,22 +2271,7 @@ def get_idea_status_history(identifier):
             return jsonify({'error': 'Idea not found'}), 404
         
         # Get status history
-        history = db.query(StatusHistory).filter_by(idea_uuid=idea.uuid).order_by(StatusHistory.changed_at.desc()).all()
-        
-        history_data = []
-        for entry in history:
-            history_data.append({
-                'from_status': entry.from_status.value if entry.from_status else None,
-                'to_status': entry.to_status.value if entry.to_status else None,
-                'from_sub_status': entry.from_sub_status.value if entry.from_sub_status else None,
-                'to_sub_status': entry.to_sub_status.value if entry.to_sub_status else None,
-                'changed_by': entry.changed_by,
-                'changed_at': entry.changed_at.strftime('%Y-%m-%d %H:%M'),
-                'comment': entry.comment,
-                'duration_minutes': entry.duration_minutes
-            })
-        
-        return jsonify(history_data)
+        return jsonify(serialize_status_history(db, idea.uuid))
     finally:
         db.close()
 
@@ -2953,23 +2299,13 @@ def get_idea_stage_data(identifier):
             return jsonify({'error': 'Invalid status'}), 400
         
         # Get stage data for this status
-        stage_data = db.query(IdeaStageData).filter(
-            IdeaStageData.idea_uuid == idea.uuid,
-            IdeaStageData.sub_status == sub_status_enum
-        ).all()
-        
-        # Convert to dictionary
-        data_dict = {}
-        for record in stage_data:
-            data_dict[record.field_name] = record.field_value
-        
-        return jsonify(data_dict)
+        return jsonify(serialize_stage_data(db, idea.uuid, sub_status_enum))
     finally:
         db.close()
 
 @api_bp.route("/admin/test-email", methods=["POST"])
 def test_email():
-    """Send a test email (admin only)."""
+    """Send a test email right away, bypassing the outbox (admin only)."""
     if not session.get("is_admin"):
         return jsonify({"success": False, "message": "Unauthorized"}), 401
     
@@ -2984,13 +2320,8 @@ def test_email():
         if not settings or not settings.smtp_server:
             return jsonify({"success": False, "error": "Email settings not configured"}), 400
         
-        # Send test email
+        # Send synchronously so connection, TLS and login errors are reported
         try:
-            msg = MIMEMultipart()
-            msg["From"] = f"{settings.from_name} <{settings.from_email}>"
-            msg["To"] = test_email_address
-            msg["Subject"] = "Test Email from Posting Board"
-            
             body = """This is a test email from your Posting Board application.
             
 If you received this email, your email settings are configured correctly\!
@@ -2998,16 +2329,7 @@ If you received this email, your email settings are configured correctly\!
 Best regards,
 Posting Board Admin"""
             
-            msg.attach(MIMEText(body, "plain"))
-            
-            server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
-            if settings.smtp_use_tls:
-                server.starttls()
-            if settings.smtp_username and settings.smtp_password:
-                server.login(settings.smtp_username, settings.smtp_password)
-            
-            server.send_message(msg)
-            server.quit()
+            send_immediately(settings, test_email_address, "Test Email from Posting Board", body, subtype="plain")
             
             return jsonify({"success": True})
         except Exception as e:
@@ -3017,7 +2339,10 @@ Posting Board Admin"""
 
 @api_bp.route('/admin/bulk-upload/ideas', methods=['POST'])
 def bulk_upload_ideas():
-    """Bulk upload ideas from CSV file (admin only)."""
+    """Bulk upload ideas from CSV file (admin only).
+    
+    The import runs as a background job; poll /admin/bulk-upload/jobs/<uuid>.
+    """
     if not session.get('is_admin'):
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
@@ -3031,153 +2356,14 @@ def bulk_upload_ideas():
     if not file.filename.endswith('.csv'):
         return jsonify({'success': False, 'message': 'File must be a CSV'}), 400
     
-    db = get_session()
-    errors = []
-    imported_count = 0
-    
-    try:
-        # Read CSV file
-        stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-        csv_reader = csv.DictReader(stream)
-        
-        required_fields = ['title', 'description', 'email', 'benefactor_team', 'size', 'priority', 'needed_by']
-        
-        # Validate headers
-        if not all(field in csv_reader.fieldnames for field in required_fields):
-            missing = [f for f in required_fields if f not in csv_reader.fieldnames]
-            return jsonify({
-                'success': False, 
-                'message': f'Missing required columns: {", ".join(missing)}'
-            }), 400
-        
-        for row_num, row in enumerate(csv_reader, start=2):
-            try:
-                # Skip empty rows
-                if not any(row.values()):
-                    continue
-                
-                # Validate required fields
-                for field in required_fields:
-                    if not row.get(field, '').strip():
-                        errors.append(f"Row {row_num}: Missing required field '{field}'")
-                        continue
-                
-                # Parse enums
-                try:
-                    size = IdeaSize(row['size'].strip().lower().replace(' ', '_'))
-                except ValueError:
-                    errors.append(f"Row {row_num}: Invalid size '{row['size']}'. Must be: small, medium, large, or extra_large")
-                    continue
-                
-                try:
-                    priority = PriorityLevel(row['priority'].strip().lower())
-                except ValueError:
-                    errors.append(f"Row {row_num}: Invalid priority '{row['priority']}'. Must be: low, medium, or high")
-                    continue
-                
-                # Parse date
-                try:
-                    needed_by = datetime.strptime(row['needed_by'].strip(), '%Y-%m-%d')
-                except ValueError:
-                    errors.append(f"Row {row_num}: Invalid date format '{row['needed_by']}'. Use YYYY-MM-DD")
-                    continue
-                
-                # Check if team exists
-                team_name = row['benefactor_team'].strip()
-                team = db.query(Team).filter_by(name=team_name).first()
-                if not team:
-                    errors.append(f"Row {row_num}: Team '{team_name}' does not exist")
-                    continue
-                
-                # Parse status if provided
-                status = IdeaStatus.open  # default
-                if row.get('status', '').strip():
-                    try:
-                        status = IdeaStatus(row['status'].strip().lower())
-                    except ValueError:
-                        errors.append(f"Row {row_num}: Invalid status '{row['status']}'. Must be: open, claimed, or complete")
-                        continue
-                
-                # Create idea
-                idea = Idea(
-                    title=row['title'].strip(),
-                    description=row['description'].strip(),
-                    email=row['email'].strip().lower(),
-                    benefactor_team=team_name,
-                    size=size,
-                    priority=priority,
-                    needed_by=needed_by,
-                    status=status,
-                    bounty=row.get('bounty', '').strip() or None
-                )
-                
-                # Handle skills
-                if row.get('skills', '').strip():
-                    skill_names = [s.strip() for s in row['skills'].split(',') if s.strip()]
-                    for skill_name in skill_names:
-                        # Get or create skill
-                        skill = db.query(Skill).filter_by(name=skill_name).first()
-                        if not skill:
-                            skill = Skill(name=skill_name)
-                            db.add(skill)
-                            db.flush()  # Get skill ID
-                        idea.skills.append(skill)
-                
-                db.add(idea)
-                db.flush()  # Get idea UUID for bounty
-                
-                # Handle monetary bounty fields if present
-                is_monetary = row.get('is_monetary', '').strip().lower() == 'true'
-                is_expensed = row.get('is_expensed', '').strip().lower() == 'true'
-                amount_str = row.get('amount', '').strip()
-                
-                if is_monetary:
-                    try:
-                        amount = float(amount_str) if amount_str else 0.0
-                    except ValueError:
-                        amount = 0.0
-                        errors.append(f"Row {row_num}: Invalid amount '{amount_str}', defaulting to 0")
-                    
-                    # Create bounty record
-                    from models import Bounty
-                    bounty = Bounty(
-                        idea_uuid=idea.uuid,
-                        is_monetary=is_monetary,
-                        is_expensed=is_expensed,
-                        amount=amount,
-                        requires_approval=amount > 50,
-                        is_approved=True if amount <= 50 else None  # Auto-approve amounts <= $50
-                    )
-                    db.add(bounty)
-                
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {row_num}: Error processing row - {str(e)}")
-                continue
-        
-        db.commit()
-        
-        return jsonify({
-            'success': True,
-            'imported': imported_count,
-            'errors': errors,
-            'message': f'Successfully imported {imported_count} ideas'
-        })
-        
-    except Exception as e:
-        db.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error processing file: {str(e)}',
-            'errors': errors
-        }), 500
-    finally:
-        db.close()
+    return queue_bulk_upload('ideas')
 
 @api_bp.route('/admin/bulk-upload/users', methods=['POST'])
 def bulk_upload_users():
-    """Bulk upload users from CSV file (admin only)."""
+    """Bulk upload users from CSV file (admin only). ?dry_run=1 validates without writing.
+    
+    The import runs as a background job; poll /admin/bulk-upload/jobs/<uuid>.
+    """
     if not session.get('is_admin'):
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     
@@ -3191,107 +2377,51 @@ def bulk_upload_users():
     if not file.filename.endswith('.csv'):
         return jsonify({'success': False, 'message': 'File must be a CSV'}), 400
     
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    return queue_bulk_upload('users', dry_run=dry_run)
+
+def queue_bulk_upload(kind, dry_run=False):
+    """Spool the uploaded file and queue a background import job for it."""
     db = get_session()
-    errors = []
-    imported_count = 0
-    
     try:
-        # Read CSV file
-        stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-        csv_reader = csv.DictReader(stream)
-        
-        required_fields = ['email', 'name', 'role', 'team']
-        
-        # Validate headers
-        if not all(field in csv_reader.fieldnames for field in required_fields):
-            missing = [f for f in required_fields if f not in csv_reader.fieldnames]
-            return jsonify({
-                'success': False, 
-                'message': f'Missing required columns: {", ".join(missing)}'
-            }), 400
-        
-        valid_roles = ['manager', 'idea_submitter', 'citizen_developer', 'developer']
-        
-        for row_num, row in enumerate(csv_reader, start=2):
-            try:
-                # Skip empty rows
-                if not any(row.values()):
-                    continue
-                
-                # Validate required fields
-                for field in required_fields:
-                    if not row.get(field, '').strip():
-                        errors.append(f"Row {row_num}: Missing required field '{field}'")
-                        continue
-                
-                email = row['email'].strip().lower()
-                
-                # Check if user already exists
-                existing_user = db.query(UserProfile).filter_by(email=email).first()
-                if existing_user:
-                    errors.append(f"Row {row_num}: User with email '{email}' already exists")
-                    continue
-                
-                # Validate role
-                role = row['role'].strip().lower()
-                if role not in valid_roles:
-                    errors.append(f"Row {row_num}: Invalid role '{role}'. Must be one of: {', '.join(valid_roles)}")
-                    continue
-                
-                # Check if team exists
-                team_name = row['team'].strip()
-                team = db.query(Team).filter_by(name=team_name).first()
-                if not team:
-                    errors.append(f"Row {row_num}: Team '{team_name}' does not exist")
-                    continue
-                
-                # Create user profile
-                user = UserProfile(
-                    email=email,
-                    name=row['name'].strip(),
-                    role=role,
-                    team_uuid=team.uuid,
-                    is_verified=row.get('is_verified', 'true').lower() == 'true'
-                )
-                
-                # Handle skills for developers and citizen developers
-                if role in ['developer', 'citizen_developer'] and row.get('skills', '').strip():
-                    skill_names = [s.strip() for s in row['skills'].split(',') if s.strip()]
-                    for skill_name in skill_names:
-                        # Get or create skill
-                        skill = db.query(Skill).filter_by(name=skill_name).first()
-                        if not skill:
-                            skill = Skill(name=skill_name)
-                            db.add(skill)
-                            db.flush()  # Get skill ID
-                        user.skills.append(skill)
-                
-                db.add(user)
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {row_num}: Error processing row - {str(e)}")
-                continue
-        
-        db.commit()
+        try:
+            job = create_import_job(db, kind, request.files['file'],
+                                    created_by=session.get('user_email'), dry_run=dry_run)
+        except CsvImportError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'imported': imported_count,
-            'errors': errors,
-            'message': f'Successfully imported {imported_count} users'
-        })
-        
+            'job_id': job.uuid,
+            'status': job.status,
+            'status_url': f'/api/admin/bulk-upload/jobs/{job.uuid}',
+            'message': 'Upload received; import queued'
+        }), 202
     except Exception as e:
         db.rollback()
         return jsonify({
             'success': False,
             'message': f'Error processing file: {str(e)}',
-            'errors': errors
+            'errors': []
         }), 500
     finally:
         db.close()
 
+@api_bp.route('/admin/bulk-upload/jobs/<job_uuid>', methods=['GET'])
+def get_bulk_upload_job(job_uuid):
+    """Get progress and results of a bulk upload job (admin only)."""
+    if not session.get('is_admin'):
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    db = get_session()
+    try:
+        job = db.get(ImportJob, job_uuid)
+        if not job:
+            return jsonify({'success': False, 'message': 'Import job not found'}), 404
+        return jsonify({'success': True, 'job': serialize_import_job(job)})
+    finally:
+        db.close()
+
 @api_bp.route('/admin/users', methods=['GET'])
 def get_admin_users():
     """Get all users for admin management."""
@@ -3503,26 +2633,12 @@ def handle_idea_comments(identifier):
         
         # Check access
         user_email = session.get("user_email")
-        if not check_idea_tab_access(idea, user_email, db):
+        if not check_idea_tab_access(idea, user_email):
             return jsonify({"error": "Access denied"}), 403
         
         if request.method == "GET":
             # Get all comments for the idea
-            comments = db.query(IdeaComment).filter_by(idea_uuid=idea.uuid).order_by(IdeaComment.created_at.desc()).all()
-            
-            comments_data = []
-            for comment in comments:
-                comments_data.append({
-                    "id": comment.uuid,
-                    "author_name": comment.author_name or comment.author_email,
-                    "author_email": comment.author_email,
-                    "content": comment.content,
-                    "created_at": comment.created_at.strftime("%B %d, %Y at %I:%M %p"),
-                    "is_internal": comment.is_internal,
-                    "sub_status": comment.sub_status.value if comment.sub_status else None
-                })
-            
-            return jsonify(comments_data)
+            return jsonify(serialize_comments(db, idea.uuid))
         
         else:  # POST
             user_email = session.get("user_email")
@@ -3578,27 +2694,12 @@ def handle_idea_external_links(identifier):
         
         # Check access
         user_email = session.get("user_email")
-        if not check_idea_tab_access(idea, user_email, db):
+        if not check_idea_tab_access(idea, user_email):
             return jsonify({"error": "Access denied"}), 403
         
         if request.method == "GET":
             # Get all links for the idea
-            links = db.query(IdeaExternalLink).filter_by(idea_uuid=idea.uuid).order_by(IdeaExternalLink.created_at.desc()).all()
-            
-            links_data = []
-            for link in links:
-                links_data.append({
-                    "id": link.uuid,
-                    "link_type": link.link_type.value,
-                    "title": link.title,
-                    "url": link.url,
-                    "description": link.description,
-                    "creator_name": db.query(UserProfile).filter_by(email=link.created_by).first().name if db.query(UserProfile).filter_by(email=link.created_by).first() else link.created_by,
-                    "created_at": link.created_at.strftime("%B %d, %Y"),
-                    "sub_status": link.sub_status.value if link.sub_status else None
-                })
-            
-            return jsonify(links_data)
+            return jsonify(serialize_external_links(db, idea.uuid))
         
         else:  # POST
             user_email = session.get("user_email")
@@ -3655,23 +2756,42 @@ def get_idea_activities(identifier):
         
         # Check access
         user_email = session.get("user_email")
-        if not check_idea_tab_access(idea, user_email, db):
+        if not check_idea_tab_access(idea, user_email):
             return jsonify({"error": "Access denied"}), 403
         
-        activities = db.query(IdeaActivity).filter_by(idea_uuid=idea.uuid).order_by(IdeaActivity.created_at.desc()).limit(50).all()
-        
-        activities_data = []
-        for activity in activities:
-            activities_data.append({
-                "id": activity.uuid,
-                "activity_type": activity.activity_type.value,
-                "actor_name": activity.actor_name or activity.actor_email,
-                "description": activity.description,
-                "created_at": activity.created_at.strftime("%B %d, %Y at %I:%M %p"),
-                "activity_data": activity.activity_data
-            })
+        return jsonify(serialize_activities(db, idea.uuid))
+    
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        db.close()
+
+@api_bp.route("/ideas/<identifier>/bundle", methods=["GET"])
+def get_idea_bundle(identifier):
+    """Get several idea detail tabs in one response.
+    
+    include= takes a comma-separated subset of comments, external_links,
+    activities, status_history and stage_data (default: all). Comments, links
+    and activities are omitted when the user lacks tab access.
+    """
+    if not is_valid_uuid(identifier):
+        return jsonify({"error": "Invalid identifier"}), 400
+    
+    sections = BUNDLE_SECTIONS
+    if request.args.get("include"):
+        sections = [section.strip() for section in request.args["include"].split(",") if section.strip()]
+        unknown = [section for section in sections if section not in BUNDLE_SECTIONS]
+        if unknown:
+            return jsonify({"error": f"Unknown sections: {', '.join(unknown)}"}), 400
+    
+    db = get_read_session()
+    try:
+        idea = get_by_identifier(Idea, identifier, db)
+        if not idea:
+            return jsonify({"error": "Idea not found"}), 404
         
-        return jsonify(activities_data)
+        has_tab_access = check_idea_tab_access(idea, session.get("user_email"))
+        return jsonify(build_idea_bundle(db, idea.uuid, sections, has_tab_access))
     
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
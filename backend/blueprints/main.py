@@ -5,7 +5,10 @@ from sqlalchemy import desc, asc
 from datetime import datetime
 from email_utils import send_claim_notification
 from decorators import require_verified_email, require_profile_complete
+from user_context import get_user_context
+from access_control import check_idea_tab_access
 from uuid_utils import get_by_identifier, get_identifier_for_url, is_valid_uuid
+from spending_rollup import record_spending_change
 
 main_bp = Blueprint('main', __name__)
 
@@ -83,12 +86,13 @@ def submit():
                     requires_approval=amount > 50
                 )
                 db.add(bounty)
+                record_spending_change(db, None, idea)
                 
                 # If amount > $50, create notification for managers and admins
                 if amount > 50:
                     # Get user's manager
                     from models import UserProfile
-                    user_profile = db.query(UserProfile).filter_by(email=session.get('user_email')).first()
+                    user_profile = get_user_context()
                     
                     # Notify user's manager if they have one
                     if user_profile and user_profile.managed_team_uuid:
@@ -175,40 +179,7 @@ def idea_detail(identifier):
             return redirect(url_for('main.home'))
         
         # Determine if user has access to sensitive tabs
-        has_tab_access = False
-        user_email = session.get('user_email')
-        
-        if user_email:
-            # Check if user is admin
-            if session.get('is_admin'):
-                has_tab_access = True
-            # Check if user is the idea submitter
-            elif idea.email == user_email:
-                has_tab_access = True
-            # Check if user is a direct claimer
-            elif any(claim.claimer_email == user_email for claim in idea.claims):
-                has_tab_access = True
-            else:
-                # Check if user is a manager of the submitter or any claimer
-                from models import UserProfile
-                user_profile = db.query(UserProfile).filter_by(
-                    email=user_email,
-                    role='manager'
-                ).first()
-                
-                if user_profile and user_profile.managed_team_uuid:
-                    # Get all team members' emails
-                    team_members = db.query(UserProfile).filter_by(
-                        team_uuid=user_profile.managed_team_uuid
-                    ).all()
-                    team_emails = [member.email for member in team_members]
-                    
-                    # Check if submitter is in the team
-                    if idea.email in team_emails:
-                        has_tab_access = True
-                    # Check if any claimer is in the team
-                    elif any(claim.claimer_email in team_emails for claim in idea.claims):
-                        has_tab_access = True
+        has_tab_access = check_idea_tab_access(idea, session.get('user_email'))
         
         # Serialize status history for JavaScript
         status_history_data = []
@@ -268,7 +239,7 @@ def claim_idea(identifier):
         
         # Get user profile to check if they have a manager
         from models import UserProfile
-        user_profile = db.query(UserProfile).filter_by(email=session.get('user_email')).first()
+        user_profile = get_user_context()
         
         # Create claim approval request
         claim_approval = ClaimApproval(
@@ -0,0 +1,85 @@
+"""
+Build metadata.
+
+Resolves the deployed git commit once, at app creation, instead of on every
+template render. Docker builds pass GIT_COMMIT; native deployments fall back
+to asking git a single time.
+
+Usage:
+    python build_info.py                        # print the resolved build metadata
+    python build_info.py benchmark [renders]    # time startup resolution and template renders
+"""
+
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+_build_info = None
+
+def get_git_revision_short_hash():
+    """Get the short git commit hash for version tracking"""
+    # First check if we have it as an environment variable (from Docker build)
+    git_commit = os.getenv('GIT_COMMIT')
+    if git_commit and git_commit != 'unknown':
+        return git_commit
+    
+    # Otherwise try to get it from git command
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            timeout=5
+        ).decode('ascii').strip()
+    except Exception:
+        return 'unknown'
+
+def load_build_info():
+    """Resolve build metadata. Called once from create_app()."""
+    global _build_info
+    _build_info = {
+        'git_commit': get_git_revision_short_hash(),
+        'started_at': datetime.utcnow().isoformat()
+    }
+    return _build_info
+
+def get_build_info():
+    """Return the cached build metadata, resolving it on first use."""
+    return _build_info or load_build_info()
+
+def benchmark(renders):
+    """Time resolving the commit at startup, and renders that look it up each time vs. once."""
+    from flask import Flask, render_template_string
+    
+    # Native deployments have no GIT_COMMIT, so every lookup forks git
+    os.environ.pop('GIT_COMMIT', None)
+    started = time.perf_counter()
+    load_build_info()
+    print(f"{'startup resolution':>22}: {(time.perf_counter() - started) * 1000:7.2f} ms once per process")
+    
+    template = '<footer>Version {{ git_commit }}</footer>'
+    lookups = {
+        'per render (before)': get_git_revision_short_hash,
+        'cached (after)': lambda: get_build_info()['git_commit']
+    }
+    for label, lookup in lookups.items():
+        app = Flask(__name__)
+        app.context_processor(lambda lookup=lookup: {'git_commit': lookup()})
+        with app.test_request_context('/'):
+            render_template_string(template)
+            started = time.perf_counter()
+            for _ in range(renders):
+                render_template_string(template)
+        print(f"{label:>22}: {(time.perf_counter() - started) / renders * 1000:7.3f} ms per render")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'show'
+    if command == 'show':
+        print(load_build_info())
+    elif command == 'benchmark':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 500)
+    else:
+        print(f"Unknown command '{command}'. Use 'show' or 'benchmark'.")
+        sys.exit(2)
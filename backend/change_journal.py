@@ -0,0 +1,170 @@
+"""
+Change journal.
+
+change_events records which topics (skills, teams, ideas, users) each
+committed transaction touched. The rows are written by the data_versions
+before_commit hook in the same transaction as the change. Journal ids must
+commit in id order for an id to be a cursor that never skips a committed
+change: SQLite gets that from its single writer, while on PostgreSQL ids
+come from a sequence at insert time, so each writer takes an exclusive lock
+on change_events before its insert and holds it until it commits (reads
+are not blocked). /api/changes?since=<id>
+long-polls on it: each worker process runs one background poller that reads
+new journal rows and wakes that worker's waiting requests. Idle admin pages
+therefore cost one indexed query per CHANGE_POLL_INTERVAL per worker (none
+while nobody is waiting) instead of full-table reads every few seconds per
+tab.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, text
+from config import Config
+from database import get_session
+from models import ChangeEvent
+
+TOPIC_TABLES = {
+    'skills': ('skills',),
+    'teams': ('teams',),
+    'ideas': ('ideas', 'idea_skills', 'claims', 'bounties'),
+    'users': ('user_profiles', 'user_skills')
+}
+TABLE_TOPICS = {table: topic for topic, tables in TOPIC_TABLES.items() for table in tables}
+
+# Event batches are capped so a burst cannot stall the poller
+POLL_BATCH_SIZE = 500
+
+def record_change_events(connection, tables):
+    """Append one journal row per topic touched by the given tables."""
+    topics = sorted({TABLE_TOPICS[table] for table in tables if table in TABLE_TOPICS})
+    if topics:
+        if connection.dialect.name == 'postgresql':
+            # A later id must not commit before an earlier one; see above
+            connection.execute(text('LOCK TABLE change_events IN EXCLUSIVE MODE'))
+        now = datetime.utcnow()
+        connection.execute(insert(ChangeEvent), [{'topic': topic, 'created_at': now} for topic in topics])
+
+def current_change_id(db):
+    """Id of the newest journal row, or 0."""
+    return db.query(func.max(ChangeEvent.id)).scalar() or 0
+
+def changes_since(db, since, topics):
+    """Return (current journal id, topics changed after `since`)."""
+    current = current_change_id(db)
+    if since == current:
+        return current, []
+    oldest = db.query(func.min(ChangeEvent.id)).scalar() or 0
+    if since > current or oldest > since + 1:
+        # The journal was reset or the entries after `since` were pruned
+        return current, sorted(topics)
+    changed = db.query(ChangeEvent.topic).filter(
+        ChangeEvent.id > since, ChangeEvent.topic.in_(topics)
+    ).distinct().all()
+    return current, sorted(topic for (topic,) in changed)
+
+class ChangeBroker:
+    """Per-process wake-up of /api/changes long-polls."""
+    
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or Config.CHANGE_POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._waiters = 0
+        self._last_event_id = None
+        self._recent = deque(maxlen=POLL_BATCH_SIZE * 4)  # (id, topic) read by the poller
+        self._last_prune = 0.0
+        self._thread = None
+    
+    def start(self):
+        """Start the poller thread if it is not already running in this process."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='change-broker', daemon=True)
+                self._thread.start()
+    
+    def wait(self, since, topics, timeout):
+        """Block until one of `topics` changes after journal id `since`, or `timeout` passes.
+        
+        Returns (journal id to poll from next, changed topics). Changed topics
+        are None, without waiting, when this worker already holds
+        CHANGE_LONG_POLL_LIMIT waiting long-polls.
+        """
+        self.start()
+        db = get_session()
+        try:
+            current, changed = changes_since(db, since, topics)
+        finally:
+            db.close()
+        if changed:
+            return current, changed
+        
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._waiters >= Config.CHANGE_LONG_POLL_LIMIT:
+                return current, None
+            # Nobody else depends on the poller's position, so skip ahead
+            if self._last_event_id is None or (self._waiters == 0 and current > self._last_event_id):
+                self._last_event_id = current
+            self._waiters += 1
+            try:
+                while True:
+                    changed = {topic for event_id, topic in self._recent if event_id > current and topic in topics}
+                    if changed:
+                        return max(current, self._last_event_id), sorted(changed)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return max(current, self._last_event_id), []
+                    self._condition.wait(remaining)
+            finally:
+                self._waiters -= 1
+    
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Change broker poll failed: {e}")
+    
+    def poll(self):
+        """Read journal rows committed since the last poll and wake local waiters."""
+        with self._condition:
+            waiting = self._waiters > 0
+            last_event_id = self._last_event_id
+        if not waiting and time.monotonic() - self._last_prune < Config.CHANGE_EVENT_RETENTION:
+            return
+        
+        db = get_session()
+        try:
+            events = []
+            if waiting:
+                events = db.query(ChangeEvent.id, ChangeEvent.topic).filter(
+                    ChangeEvent.id > last_event_id
+                ).order_by(ChangeEvent.id).limit(POLL_BATCH_SIZE).all()
+            self._prune(db)
+        finally:
+            db.close()
+        
+        if events:
+            with self._condition:
+                self._recent.extend((event_id, topic) for event_id, topic in events)
+                self._last_event_id = max(self._last_event_id, events[-1][0])
+                self._condition.notify_all()
+    
+    def _prune(self, db):
+        now = time.monotonic()
+        if now - self._last_prune < Config.CHANGE_EVENT_RETENTION:
+            return
+        self._last_prune = now
+        cutoff = datetime.utcnow() - timedelta(seconds=Config.CHANGE_EVENT_RETENTION)
+        # Keep the newest row so ids never restart from 1 (SQLite reuses max(id) + 1)
+        newest = current_change_id(db)
+        db.query(ChangeEvent).filter(
+            ChangeEvent.created_at < cutoff,
+            ChangeEvent.id < newest
+        ).delete(synchronize_session=False)
+        db.commit()
+
+change_broker = ChangeBroker()
@@ -1,6 +1,9 @@
 import os
 from datetime import timedelta
 
+# Same data directory database.py uses for the SQLite file
+DATA_DIR = '/app/data' if os.path.exists('/app/data') else os.path.join(os.path.dirname(__file__), 'data')
+
 class Config:
     """Base configuration."""
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
@@ -9,10 +12,15 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Session configuration
-    SESSION_TYPE = 'filesystem'
+    SESSION_TYPE = os.getenv('SESSION_TYPE', 'sqlite')  # Or any Flask-Session backend, e.g. 'filesystem'
     SESSION_FILE_DIR = './flask_session'
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', os.path.join(DATA_DIR, 'sessions.db'))
+    SESSION_REFRESH_INTERVAL = 3600  # Extend an unchanged session's expiry at most this often
+    SESSION_SWEEP_INTERVAL = 3600  # Seconds between expired-session deletes, per process
     SESSION_PERMANENT = True
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
+    USER_CONTEXT_CACHE_TTL = float(os.getenv('USER_CONTEXT_CACHE_TTL', '0'))  # Seconds to reuse a profile across requests; 0 disables
+    ACCESS_CACHE_TTL = 30  # Seconds before team membership used for idea access checks is reloaded
     
     # Email configuration
     SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -20,13 +28,69 @@ class Config:
     SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
     SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
     
+    # Database connections
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))  # Covers 25 gthread threads per worker
+    DB_POOL_TIMEOUT = 30
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # Seconds; server databases only
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))  # PostgreSQL only; 0 disables
+    DB_READ_ENGINE = os.getenv('DB_READ_ENGINE', '').lower() in ('1', 'true', 'yes')
+    READ_DATABASE_URL = os.getenv('READ_DATABASE_URL', '')  # Defaults to DATABASE_URL
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE = -64000  # Negative is in KiB: 64 MB per connection
+    
+    # Outbound email queue
+    EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', '5'))
+    EMAIL_OUTBOX_BATCH_SIZE = 20
+    EMAIL_OUTBOX_MAX_ATTEMPTS = 6
+    EMAIL_OUTBOX_RETRY_BASE = 30  # Seconds; doubles on each failed attempt
+    EMAIL_OUTBOX_RETRY_MAX = 3600
+    EMAIL_OUTBOX_CLAIM_TIMEOUT = 300  # Reclaim batches abandoned by a dead worker
+    SMTP_CONNECTION_IDLE_TIMEOUT = 60  # Close pooled SMTP connections idle this long
+    SMTP_TIMEOUT = 30
+    EMAIL_OUTBOX_SENT_RETENTION = 7 * 24 * 3600  # Keep delivered and expired messages a week
+    
+    # CSV bulk imports
+    IMPORT_CHUNK_SIZE = 1000  # Rows written per transaction
+    IMPORT_SPOOL_DIR = os.getenv('IMPORT_SPOOL_DIR', os.path.join(DATA_DIR, 'imports'))
+    IMPORT_JOB_POLL_INTERVAL = float(os.getenv('IMPORT_JOB_POLL_INTERVAL', '5'))
+    IMPORT_JOB_STALE_TIMEOUT = 120  # Resume running jobs whose worker stopped checkpointing
+    
     # Admin password
     ADMIN_PASSWORD = '2929arch'
     
     # Pagination
     IDEAS_PER_PAGE = 20
+    IDEAS_MAX_PER_PAGE = 100
+    
+    # Notification stream (Server-Sent Events), in seconds
+    NOTIFICATION_POLL_INTERVAL = float(os.getenv('NOTIFICATION_POLL_INTERVAL', '2'))
+    NOTIFICATION_STREAM_KEEPALIVE = 15
+    NOTIFICATION_STREAM_MAX_DURATION = 60  # Clients reconnect automatically
+    NOTIFICATION_EVENT_RETENTION = 3600
+    NOTIFICATION_EVENT_GAP_TIMEOUT = 60  # How long a skipped event id may still be committed
+    # Streams and change long-polls each hold a gunicorn thread for their whole
+    # duration, so each worker admits only this many and leaves the rest of its
+    # threads to ordinary requests; turned-away clients fall back to polling
+    NOTIFICATION_STREAM_LIMIT = int(os.getenv('NOTIFICATION_STREAM_LIMIT', '8'))
+    
+    # Per-request SQL instrumentation (perf.py); off unless PERF_INSTRUMENTATION is set
+    PERF_INSTRUMENTATION = os.getenv('PERF_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+    PERF_SLOW_QUERY_MS = float(os.getenv('PERF_SLOW_QUERY_MS', '100'))
+    PERF_REPEAT_THRESHOLD = 10  # Same statement this often in one request is reported as a likely N+1
+    
+    # Dashboard stats cache, in seconds
+    STATS_CACHE_MAX_STALENESS = float(os.getenv('STATS_CACHE_MAX_STALENESS', '5'))  # Reuse stats this long after a write
+    STATS_CACHE_MAX_AGE = 300  # Recompute at least this often, e.g. for writes made outside the app
+    
+    # Change journal long-poll (/api/changes), in seconds
+    CHANGE_POLL_INTERVAL = float(os.getenv('CHANGE_POLL_INTERVAL', '1'))
+    CHANGE_LONG_POLL_TIMEOUT = 25  # Below typical proxy read timeouts
+    CHANGE_LONG_POLL_LIMIT = int(os.getenv('CHANGE_LONG_POLL_LIMIT', '4'))  # Waiting long-polls per worker
+    CHANGE_LONG_POLL_BUSY_RETRY = 5  # Clients turned away by the limit poll again after this
+    CHANGE_EVENT_RETENTION = 3600
     
     # Auto-refresh intervals (in seconds)
     HOME_REFRESH_INTERVAL = 30
-    ADMIN_IDEAS_REFRESH_INTERVAL = 5
-    ADMIN_SKILLS_REFRESH_INTERVAL = 2
\ No newline at end of file
+    ADMIN_IDEAS_REFRESH_INTERVAL = 5
\ No newline at end of file
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+CSV bulk imports.
+
+Parses uploaded CSV files row by row instead of reading them into memory.
+Existing emails, teams and skills are loaded once into in-memory sets and maps
+for validation, and valid rows are written with executemany inserts in chunks
+of IMPORT_CHUNK_SIZE rows, each in its own transaction, so a large file never
+holds the SQLite write lock for the whole import. If a chunk fails to write,
+its rows are written again one per transaction, so the good rows still land
+and each bad row gets its own error. A dry run validates every row and returns
+the same error report without writing anything. Per-row errors use the same
+messages as the original endpoints.
+
+Usage:
+    python csv_import.py benchmark [rows]   # time an idea import into a scratch database
+"""
+
+import csv
+import io
+import sys
+import time
+import uuid as uuid_lib
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import insert
+from config import Config
+from models import Idea, Skill, Team, Bounty, UserProfile, IdeaStatus, PriorityLevel, IdeaSize, idea_skills, user_skills
+from spending_rollup import record_new_bounties
+from search_index import reindex_ideas, rebuild_search_index
+
+IDEA_REQUIRED_FIELDS = ['title', 'description', 'email', 'benefactor_team', 'size', 'priority', 'needed_by']
+USER_REQUIRED_FIELDS = ['email', 'name', 'role', 'team']
+VALID_ROLES = ['manager', 'idea_submitter', 'citizen_developer', 'developer']
+
+class CsvImportError(ValueError):
+    """Raised when an uploaded file cannot be imported at all."""
+
+class ImportAborted(Exception):
+    """Raised by a progress checkpoint to stop the import; the current chunk is rolled back."""
+
+def open_csv(stream, required_fields):
+    """Wrap a binary upload stream in a DictReader, checking required columns."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    fieldnames = reader.fieldnames or []
+    missing = [f for f in required_fields if f not in fieldnames]
+    if missing:
+        raise CsvImportError(f'Missing required columns: {", ".join(missing)}')
+    return reader
+
+def _skill_uuids(row, skill_map, new_skills):
+    """Resolve a row's comma-separated skills to uuids, creating unknown skills."""
+    skill_uuids = []
+    for skill_name in [s.strip() for s in row['skills'].split(',') if s.strip()]:
+        skill_uuid = skill_map.get(skill_name)
+        if skill_uuid is None:
+            skill_uuid = str(uuid_lib.uuid4())
+            skill_map[skill_name] = skill_uuid
+            new_skills.append({'uuid': skill_uuid, 'name': skill_name})
+        if skill_uuid not in skill_uuids:
+            skill_uuids.append(skill_uuid)
+    return skill_uuids
+
+def parse_idea_row(row, row_num, team_names, errors):
+    """Validate an idea row. Returns column values, or None after recording an error."""
+    # Missing fields are reported but, as before, do not stop the row by themselves
+    for field in IDEA_REQUIRED_FIELDS:
+        if not row.get(field, '').strip():
+            errors.append(f"Row {row_num}: Missing required field '{field}'")
+    
+    try:
+        size = IdeaSize(row['size'].strip().lower().replace(' ', '_'))
+    except ValueError:
+        errors.append(f"Row {row_num}: Invalid size '{row['size']}'. Must be: small, medium, large, or extra_large")
+        return None
+    
+    try:
+        priority = PriorityLevel(row['priority'].strip().lower())
+    except ValueError:
+        errors.append(f"Row {row_num}: Invalid priority '{row['priority']}'. Must be: low, medium, or high")
+        return None
+    
+    try:
+        needed_by = datetime.strptime(row['needed_by'].strip(), '%Y-%m-%d')
+    except ValueError:
+        errors.append(f"Row {row_num}: Invalid date format '{row['needed_by']}'. Use YYYY-MM-DD")
+        return None
+    
+    team_name = row['benefactor_team'].strip()
+    if team_name not in team_names:
+        errors.append(f"Row {row_num}: Team '{team_name}' does not exist")
+        return None
+    
+    status = IdeaStatus.open  # default
+    if row.get('status', '').strip():
+        try:
+            status = IdeaStatus(row['status'].strip().lower())
+        except ValueError:
+            errors.append(f"Row {row_num}: Invalid status '{row['status']}'. Must be: open, claimed, or complete")
+            return None
+    
+    return {
+        'title': row['title'].strip(),
+        'description': row['description'].strip(),
+        'email': row['email'].strip().lower(),
+        'benefactor_team': team_name,
+        'size': size,
+        'priority': priority,
+        'needed_by': needed_by,
+        'status': status,
+        'bounty': row.get('bounty', '').strip() or None
+    }
+
+def parse_bounty(row, row_num, errors):
+    """Return monetary bounty values for a row, or None when it has no monetary bounty."""
+    if row.get('is_monetary', '').strip().lower() != 'true':
+        return None
+    amount_str = row.get('amount', '').strip()
+    try:
+        amount = float(amount_str) if amount_str else 0.0
+    except ValueError:
+        amount = 0.0
+        errors.append(f"Row {row_num}: Invalid amount '{amount_str}', defaulting to 0")
+    return {
+        'is_monetary': True,
+        'is_expensed': row.get('is_expensed', '').strip().lower() == 'true',
+        'amount': amount,
+        'requires_approval': amount > 50,
+        'is_approved': True if amount <= 50 else None  # Auto-approve amounts <= $50
+    }
+
+class ImportBatch:
+    """Rows buffered for one chunked write, keyed by target table in insert order."""
+    
+    def __init__(self, *tables):
+        self.row_nums = []
+        self.rows = {table: [] for table in tables}
+        self._row_ends = []
+    
+    def __len__(self):
+        return len(self.row_nums)
+    
+    def add_row(self, row_num, rows):
+        """Buffer the table rows for one CSV row (after any skills it created)."""
+        self.row_nums.append(row_num)
+        for table, table_rows in rows.items():
+            self.rows[table].extend(table_rows)
+        self._row_ends.append({table: len(table_rows) for table, table_rows in self.rows.items()})
+    
+    def split(self):
+        """Yield a batch per CSV row, holding the table rows that row added."""
+        starts = dict.fromkeys(self.rows, 0)
+        # Skills left by rows that failed validation after the last good one go with it
+        row_ends = self._row_ends[:-1] + [{table: len(rows) for table, rows in self.rows.items()}]
+        for row_num, ends in zip(self.row_nums, row_ends):
+            part = ImportBatch(*self.rows)
+            part.add_row(row_num, {table: rows[starts[table]:ends[table]] for table, rows in self.rows.items()})
+            starts = ends
+            yield part
+
+class ImportProgress:
+    """Resume point and progress hook for an import.
+    
+    Rows up to and including last_row are skipped, and the counts and errors
+    carry on from the values given. checkpoint() is called in the transaction
+    that writes each chunk (or each row, when a failed chunk is retried row by
+    row), so progress saved there is exactly what committed; the base class
+    saves nothing.
+    """
+    
+    def __init__(self, last_row=1, imported=0, errors=None):
+        self.last_row = last_row
+        self.imported = imported
+        self.errors = list(errors or [])
+    
+    def checkpoint(self, db, last_row, imported, errors):
+        pass
+
+def write_batch(db, batch, on_write=None):
+    """Insert a batch in one transaction; on any error roll back and re-raise."""
+    try:
+        for table, rows in batch.rows.items():
+            if rows:
+                db.execute(insert(table), rows)
+        if on_write:
+            on_write(db, batch)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+def flush_batch(db, batch, skill_map, errors, progress, last_row, imported_count, on_write=None, dry_run=False):
+    """Write a batch (unless dry_run) and checkpoint progress. Returns rows imported."""
+    if dry_run:
+        progress.checkpoint(db, last_row, imported_count + len(batch), errors)
+        db.commit()
+        return len(batch)
+    
+    def stage(checkpoint_row, imported):
+        def write_hook(db, batch):
+            if on_write:
+                on_write(db, batch)
+            progress.checkpoint(db, checkpoint_row, imported, errors)
+        return write_hook
+    
+    try:
+        write_batch(db, batch, stage(last_row, imported_count + len(batch)))
+        return len(batch)
+    except ImportAborted:
+        raise
+    except Exception:
+        pass
+    
+    # A bad row fails the whole chunk; retry row by row so only it is lost
+    written = 0
+    carried_skills = []
+    for part in batch.split():
+        # Skills first created by a failed row are still needed by later rows
+        part.rows[Skill][:0] = carried_skills
+        try:
+            write_batch(db, part, stage(part.row_nums[0], imported_count + written + 1))
+        except ImportAborted:
+            raise
+        except Exception as e:
+            carried_skills = part.rows[Skill]
+            errors.append(f"Row {part.row_nums[0]}: Error processing row - {str(e)}")
+        else:
+            carried_skills = []
+            written += 1
+    # Skills that were never written must be created again if a later chunk uses them
+    for skill in carried_skills:
+        skill_map.pop(skill['name'], None)
+    progress.checkpoint(db, last_row, imported_count + written, errors)
+    db.commit()
+    return written
+
+def _record_idea_batch(db, batch):
+    """Update the spending rollup and search index for a batch of inserted ideas."""
+    ideas_by_uuid = {idea['uuid']: idea for idea in batch.rows[Idea]}
+    record_new_bounties(db, [
+        (SimpleNamespace(**ideas_by_uuid[bounty['idea_uuid']]), SimpleNamespace(**bounty))
+        for bounty in batch.rows[Bounty]
+    ])
+    reindex_ideas(db.connection(), ideas_by_uuid)
+
+def import_ideas(db, reader, chunk_size=None, progress=None):
+    """Import idea rows from a DictReader. Returns (imported_count, errors)."""
+    chunk_size = chunk_size or Config.IMPORT_CHUNK_SIZE
+    progress = progress or ImportProgress()
+    team_names = {name for (name,) in db.query(Team.name).all()}
+    skill_map = dict(db.query(Skill.name, Skill.uuid).all())
+    errors = progress.errors
+    imported_count = progress.imported
+    batch = ImportBatch(Skill, Idea, idea_skills, Bounty)
+    
+    for row_num, row in enumerate(reader, start=2):
+        if row_num <= progress.last_row:
+            continue
+        try:
+            # Skip empty rows
+            if not any(row.values()):
+                continue
+            
+            values = parse_idea_row(row, row_num, team_names, errors)
+            if values is None:
+                continue
+            
+            skill_uuids = []
+            if row.get('skills', '').strip():
+                skill_uuids = _skill_uuids(row, skill_map, batch.rows[Skill])
+            bounty = parse_bounty(row, row_num, errors)
+            
+            idea_uuid = str(uuid_lib.uuid4())
+            batch.add_row(row_num, {
+                Idea: [dict(values, uuid=idea_uuid, date_submitted=datetime.utcnow())],
+                idea_skills: [{'idea_uuid': idea_uuid, 'skill_uuid': s} for s in skill_uuids],
+                Bounty: [dict(bounty, uuid=str(uuid_lib.uuid4()), idea_uuid=idea_uuid)] if bounty else []
+            })
+        except Exception as e:
+            errors.append(f"Row {row_num}: Error processing row - {str(e)}")
+            continue
+        
+        if len(batch) >= chunk_size:
+            imported_count += flush_batch(db, batch, skill_map, errors, progress, row_num, imported_count,
+                                          on_write=_record_idea_batch)
+            batch = ImportBatch(Skill, Idea, idea_skills, Bounty)
+    
+    if len(batch):
+        imported_count += flush_batch(db, batch, skill_map, errors, progress, batch.row_nums[-1], imported_count,
+                                      on_write=_record_idea_batch)
+    return imported_count, errors
+
+def parse_user_row(row, row_num, existing_emails, team_uuids, errors):
+    """Validate a user row. Returns column values, or None after recording an error."""
+    # Missing fields are reported but, as before, do not stop the row by themselves
+    for field in USER_REQUIRED_FIELDS:
+        if not row.get(field, '').strip():
+            errors.append(f"Row {row_num}: Missing required field '{field}'")
+    
+    email = row['email'].strip().lower()
+    if email in existing_emails:
+        errors.append(f"Row {row_num}: User with email '{email}' already exists")
+        return None
+    
+    role = row['role'].strip().lower()
+    if role not in VALID_ROLES:
+        errors.append(f"Row {row_num}: Invalid role '{role}'. Must be one of: {', '.join(VALID_ROLES)}")
+        return None
+    
+    team_name = row['team'].strip()
+    team_uuid = team_uuids.get(team_name)
+    if not team_uuid:
+        errors.append(f"Row {row_num}: Team '{team_name}' does not exist")
+        return None
+    
+    return {
+        'email': email,
+        'name': row['name'].strip(),
+        'role': role,
+        'team_uuid': team_uuid,
+        'is_verified': row.get('is_verified', 'true').lower() == 'true'
+    }
+
+def import_users(db, reader, dry_run=False, chunk_size=None, progress=None):
+    """Import user rows from a DictReader. Returns (imported_count, errors).
+    
+    With dry_run, every row is validated (including duplicates within the
+    file) and the count of rows that would be imported is returned, but
+    nothing is written.
+    """
+    chunk_size = chunk_size or Config.IMPORT_CHUNK_SIZE
+    progress = progress or ImportProgress()
+    existing_emails = {email for (email,) in db.query(UserProfile.email).all()}
+    team_uuids = dict(db.query(Team.name, Team.uuid).all())
+    skill_map = dict(db.query(Skill.name, Skill.uuid).all())
+    errors = progress.errors
+    imported_count = progress.imported
+    batch = ImportBatch(Skill, UserProfile, user_skills)
+    
+    for row_num, row in enumerate(reader, start=2):
+        if row_num <= progress.last_row:
+            continue
+        try:
+            # Skip empty rows
+            if not any(row.values()):
+                continue
+            
+            values = parse_user_row(row, row_num, existing_emails, team_uuids, errors)
+            if values is None:
+                continue
+            
+            # Skills are only kept for developers and citizen developers
+            skill_uuids = []
+            if values['role'] in ['developer', 'citizen_developer'] and row.get('skills', '').strip():
+                skill_uuids = _skill_uuids(row, skill_map, batch.rows[Skill])
+            
+            existing_emails.add(values['email'])
+            batch.add_row(row_num, {
+                UserProfile: [dict(values, created_at=datetime.utcnow())],
+                user_skills: [{'user_email': values['email'], 'skill_uuid': s} for s in skill_uuids]
+            })
+        except Exception as e:
+            errors.append(f"Row {row_num}: Error processing row - {str(e)}")
+            continue
+        
+        if len(batch) >= chunk_size:
+            imported_count += flush_batch(db, batch, skill_map, errors, progress, row_num, imported_count,
+                                          dry_run=dry_run)
+            batch = ImportBatch(Skill, UserProfile, user_skills)
+    
+    if len(batch):
+        imported_count += flush_batch(db, batch, skill_map, errors, progress, batch.row_nums[-1], imported_count,
+                                      dry_run=dry_run)
+    return imported_count, errors
+
+def generate_idea_rows(count, team_name):
+    """Yield synthetic idea rows for benchmarking."""
+    for i in range(count):
+        yield {
+            'title': f'Benchmark idea {i}',
+            'description': 'Generated for the import benchmark',
+            'email': f'user{i % 500}@example.com',
+            'benefactor_team': team_name,
+            'size': ('small', 'medium', 'large', 'extra_large')[i % 4],
+            'priority': ('low', 'medium', 'high')[i % 3],
+            'needed_by': '2030-01-31',
+            'skills': f'Skill {i % 40}, Skill {(i + 7) % 40}',
+            'is_monetary': 'true' if i % 5 == 0 else 'false',
+            'amount': str(25 + i % 100)
+        }
+
+def benchmark(rows):
+    """Import `rows` synthetic ideas into a scratch SQLite file and report throughput."""
+    import os
+    import tempfile
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import Base
+    
+    fieldnames = list(next(generate_idea_rows(1, '')).keys())
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(generate_idea_rows(rows, 'Benchmark Team'))
+    
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        db.add(Team(name='Benchmark Team', is_approved=True))
+        db.commit()
+        # Imports reindex what they write, so include that cost
+        rebuild_search_index(db)
+        
+        reader = open_csv(io.BytesIO(buffer.getvalue().encode('utf-8')), IDEA_REQUIRED_FIELDS)
+        started = time.perf_counter()
+        imported, errors = import_ideas(db, reader)
+        elapsed = time.perf_counter() - started
+        db.close()
+    finally:
+        engine.dispose()
+        os.remove(path)
+    
+    print(f"Imported {imported} ideas ({len(errors)} errors) in {elapsed:.2f}s: {imported / elapsed:,.0f} rows/s")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'benchmark'
+    if command != 'benchmark':
+        print(f"Unknown command '{command}'. Use 'benchmark'.")
+        sys.exit(2)
+    benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 50000)
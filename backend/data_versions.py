@@ -0,0 +1,146 @@
+"""
+Per-table data versions and conditional JSON responses.
+
+data_versions holds a counter per table in VERSIONED_TABLES. Every
+transaction that inserts, updates or deletes rows of one of those tables
+(through the ORM or a Core statement run on the session) bumps that table's
+counter just before it commits, in the same transaction, so a version never
+moves ahead of the data it describes. Statements that match no rows, and
+writes to tables nothing reads versions of (e.g. the email outbox), bump
+nothing. Polled endpoints decorated with @versioned(...) derive an ETag
+from the versions of the tables they read and answer If-None-Match with
+304 Not Modified after a single primary-key query, without running their own
+queries or serializing anything. The same hook appends to the change journal
+(change_journal.py) that /api/changes long-polls on.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, make_response, request, session
+from sqlalchemy import event, insert, update
+from database import SessionLocal, get_read_session, insert_on_conflict
+from models import DataVersion
+from build_info import get_build_info
+from change_journal import TABLE_TOPICS, record_change_events
+
+# Tables read by @versioned endpoints and the stats cache
+VERSIONED_TABLES = frozenset({
+    'ideas', 'idea_skills', 'skills', 'claims', 'bounties', 'claim_approvals',
+    'user_profiles', 'teams', 'spending_rollup'
+})
+# The change journal also needs to see writes to its topic tables
+TRACKED_TABLES = VERSIONED_TABLES | frozenset(TABLE_TOPICS)
+
+def check_versioned_tables(tables):
+    """Raise ValueError for tables whose writes do not bump a data version."""
+    untracked = set(tables) - VERSIONED_TABLES
+    if untracked:
+        raise ValueError(f"Add {', '.join(sorted(untracked))} to VERSIONED_TABLES to read their versions")
+
+def bump_data_versions(connection, names):
+    """Increment the version of each named table on the given connection."""
+    now = datetime.utcnow()
+    for name in sorted(names):
+        upsert = insert_on_conflict(connection.dialect.name, DataVersion)
+        if upsert is not None:
+            connection.execute(upsert.values(name=name, version=1, updated_at=now).on_conflict_do_update(
+                index_elements=[DataVersion.name],
+                set_={'version': DataVersion.version + 1, 'updated_at': now}
+            ))
+            continue
+        
+        result = connection.execute(
+            update(DataVersion).where(DataVersion.name == name).values(version=DataVersion.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(DataVersion).values(name=name, version=1, updated_at=now))
+
+def get_data_versions(db, names):
+    """Current version of each named table (0 if it has never changed)."""
+    versions = dict(db.query(DataVersion.name, DataVersion.version).filter(DataVersion.name.in_(names)).all())
+    return {name: versions.get(name, 0) for name in names}
+
+def _etag(versions):
+    # Responses vary by URL and by who is asking (e.g. admins see more teams),
+    # and by deploy in case the payload format changed
+    key = repr((
+        sorted(versions.items()),
+        request.full_path,
+        session.get('user_email'),
+        bool(session.get('is_admin')),
+        get_build_info()['git_commit']
+    ))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def versioned(*tables):
+    """Serve a GET endpoint conditionally on the versions of the tables it reads."""
+    check_versioned_tables(tables)
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            db = get_read_session()
+            try:
+                etag = _etag(get_data_versions(db, tables))
+            finally:
+                db.close()
+            
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # Let browsers keep the body but always revalidate it
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+def _record_tables(db, tables):
+    tables = set(tables) & TRACKED_TABLES
+    if tables:
+        db.info.setdefault('changed_tables', set()).update(tables)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _collect_flushed_tables(db, flush_context):
+    tables = set()
+    for instance in list(db.new) + list(db.dirty) + list(db.deleted):
+        table = getattr(instance, '__table__', None)
+        if table is not None and (instance not in db.dirty or db.is_modified(instance)):
+            tables.add(table.name)
+    if tables:
+        _record_tables(db, tables)
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def _collect_statement_tables(orm_execute_state):
+    # Core and bulk statements (e.g. CSV imports, rollup upserts) bypass the flush
+    if orm_execute_state.is_select:
+        return None
+    table = getattr(orm_execute_state.statement, 'table', None)
+    name = getattr(table, 'name', None)
+    if name not in TRACKED_TABLES:
+        return None
+    
+    # Run the statement here to see whether it changed anything; an UPDATE or
+    # DELETE that matched no rows must not invalidate ETags or the stats cache
+    result = orm_execute_state.invoke_statement()
+    if getattr(result, 'rowcount', -1) != 0:
+        _record_tables(orm_execute_state.session, {name})
+    return result
+
+@event.listens_for(SessionLocal, 'before_commit')
+def _bump_changed_tables(db):
+    # Flush first so changes written by commit's own flush are counted
+    db.flush()
+    tables = db.info.pop('changed_tables', None)
+    if tables:
+        connection = db.connection()
+        bump_data_versions(connection, tables & VERSIONED_TABLES)
+        record_change_events(connection, tables)
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _discard_changed_tables(db):
+    db.info.pop('changed_tables', None)
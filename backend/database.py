@@ -1,7 +1,10 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import StaticPool, QueuePool
+from config import Config
 
 Base = declarative_base()
 
@@ -15,24 +18,159 @@ else:
     data_dir = os.path.join(os.path.dirname(__file__), 'data')
     os.makedirs(data_dir, exist_ok=True)
     DATABASE_URL = os.getenv('DATABASE_URL', f'sqlite:///{data_dir}/posting_board_uuid.db')
-# For SQLite, use StaticPool to avoid isolation issues
-from sqlalchemy.pool import StaticPool
-if DATABASE_URL.startswith('sqlite'):
-    engine = create_engine(
-        DATABASE_URL, 
-        echo=False,  # Turn off SQL logging for production
-        connect_args={'check_same_thread': False},
-        poolclass=StaticPool
+# SQLAlchemy only accepts the postgresql:// scheme
+if DATABASE_URL.startswith('postgres://'):
+    DATABASE_URL = 'postgresql://' + DATABASE_URL[len('postgres://'):]
+
+def sqlite_pragmas():
+    """Pragmas applied to every new SQLite file connection.
+    
+    WAL lets readers proceed while a writer commits, and synchronous=NORMAL is
+    durable under WAL except for the last commits before a power loss.
+    """
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': Config.SQLITE_BUSY_TIMEOUT_MS,
+        'mmap_size': Config.SQLITE_MMAP_SIZE,
+        'cache_size': Config.SQLITE_CACHE_SIZE
+    }
+
+def create_db_engine(url, read_only=False, pragmas=None):
+    """Create an engine for a database URL.
+    
+    In-memory SQLite uses StaticPool so every session sees the same database.
+    SQLite files get a QueuePool, so each thread checks out its own connection
+    and threaded workers never share one between requests, plus the pragmas
+    above on connect. read_only opens SQLite files with mode=ro and query_only.
+    
+    Server databases (PostgreSQL) get a sized QueuePool with pre-ping and
+    recycling, and a per-connection statement timeout; read_only makes every
+    transaction read-only.
+    """
+    if url.startswith('sqlite') and ':memory:' in url:
+        return create_engine(
+            url,
+            echo=False,  # Turn off SQL logging for production
+            connect_args={'check_same_thread': False},
+            poolclass=StaticPool
+        )
+    
+    if url.startswith('sqlite'):
+        pragmas = dict(sqlite_pragmas() if pragmas is None else pragmas)
+        if read_only:
+            # journal_mode is a database setting; read-only connections inherit it
+            pragmas.pop('journal_mode', None)
+            pragmas['query_only'] = 'ON'
+            url = f"sqlite:///file:{make_url(url).database}?mode=ro&uri=true"
+        
+        engine = create_engine(
+            url,
+            echo=False,  # Turn off SQL logging for production
+            connect_args={'check_same_thread': False},
+            poolclass=QueuePool,
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT
+        )
+        
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+        
+        return engine
+    
+    connect_args = {}
+    if url.startswith('postgresql'):
+        options = []
+        if Config.DB_STATEMENT_TIMEOUT_MS:
+            options.append(f'-c statement_timeout={Config.DB_STATEMENT_TIMEOUT_MS}')
+        if read_only:
+            options.append('-c default_transaction_read_only=on')
+        if options:
+            connect_args['options'] = ' '.join(options)
+    
+    return create_engine(
+        url,
+        echo=False,
+        connect_args=connect_args,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=True  # Replace connections dropped by the server or a proxy
     )
-else:
-    engine = create_engine(DATABASE_URL, echo=False)
+
+def insert_on_conflict(dialect_name, table):
+    """Return an insert() for the dialect that supports on_conflict_do_update, or None."""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional separate engine for read-only GET endpoints, so reads get their own
+# connection pool (and, for SQLite, connections that can never take a write lock)
+read_engine = None
+if Config.DB_READ_ENGINE and ':memory:' not in DATABASE_URL:
+    read_engine = create_db_engine(Config.READ_DATABASE_URL or DATABASE_URL, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else SessionLocal
+
 def init_db():
     """Initialize database - now handled by database_uuid_init.py"""
     from models import Base
     Base.metadata.create_all(bind=engine)
 
+# Bump when indexes are added to or changed in models/__init__.py
+INDEX_SET_VERSION = 1
+
+def ensure_indexes():
+    """Create any model indexes missing from an existing database.
+    
+    create_all() only creates indexes for new tables, so databases created
+    before an index was declared never get it. Runs once per INDEX_SET_VERSION
+    and uses IF NOT EXISTS, so concurrent workers can run it safely.
+    """
+    from models import Base, SchemaVersion
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.schema import CreateIndex
+    
+    db = SessionLocal()
+    try:
+        record = db.get(SchemaVersion, 'indexes')
+        if record and record.version >= INDEX_SET_VERSION:
+            return
+    finally:
+        db.close()
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    
+    db = SessionLocal()
+    try:
+        record = db.get(SchemaVersion, 'indexes')
+        if record is None:
+            db.add(SchemaVersion(name='indexes', version=INDEX_SET_VERSION))
+        else:
+            record.version = INDEX_SET_VERSION
+        db.commit()
+        print(f"Database indexes up to date (index set version {INDEX_SET_VERSION})")
+    except IntegrityError:
+        # Another worker recorded the version first
+        db.rollback()
+    finally:
+        db.close()
+
 def get_db():
     db = SessionLocal()
     try:
@@ -43,6 +181,185 @@ def get_db():
 def get_session():
     return SessionLocal()
 
+def get_read_session():
+    """Session for read-only request handlers; the primary session unless DB_READ_ENGINE is set."""
+    return ReadSessionLocal()
+
+# Bump when nullable columns are added to existing tables in models/__init__.py
+COLUMN_SET_VERSION = 1
+
+def ensure_columns():
+    """Add nullable model columns missing from existing tables.
+    
+    create_all() never alters a table that already exists. Runs once per
+    COLUMN_SET_VERSION; a column another worker added first is skipped.
+    """
+    from models import Base, SchemaVersion
+    from sqlalchemy import inspect, text
+    from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+    
+    db = SessionLocal()
+    try:
+        record = db.get(SchemaVersion, 'columns')
+        if record and record.version >= COLUMN_SET_VERSION:
+            return
+    finally:
+        db.close()
+    
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}'
+                    ))
+                print(f"Added column {table.name}.{column.name}")
+            except (OperationalError, ProgrammingError):
+                # Another worker added it first
+                pass
+    
+    db = SessionLocal()
+    try:
+        record = db.get(SchemaVersion, 'columns')
+        if record is None:
+            db.add(SchemaVersion(name='columns', version=COLUMN_SET_VERSION))
+        else:
+            record.version = COLUMN_SET_VERSION
+        db.commit()
+    except IntegrityError:
+        # Another worker recorded the version first
+        db.rollback()
+    finally:
+        db.close()
+
+# Tables whose lookup indexes INDEX_SET_VERSION 1 added; the benchmark drops them for its baseline
+BENCHMARK_INDEXED_TABLES = ('ideas', 'claims', 'claim_approvals', 'manager_requests', 'user_profiles')
+
+def benchmark(ideas):
+    """Time hot filter queries on a scratch SQLite file without and with the model indexes."""
+    import random
+    import tempfile
+    import time
+    from datetime import datetime, timedelta
+    from sqlalchemy import desc, func, insert, select, text
+    from sqlalchemy.schema import CreateIndex
+    from models import Base, Idea, Claim, ClaimApproval, ManagerRequest, UserProfile, Team, IdeaStatus, IdeaSize, PriorityLevel
+    
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    bench_engine = create_engine(f'sqlite:///{path}')
+    rng = random.Random(42)
+    users = max(ideas // 20, 10)
+    teams = [f'Team {n}' for n in range(25)]
+    statuses = list(IdeaStatus)
+    now = datetime.utcnow()
+    try:
+        Base.metadata.create_all(bind=bench_engine)
+        with bench_engine.begin() as conn:
+            team_uuids = [str(n) for n in range(len(teams))]
+            conn.execute(insert(Team.__table__), [
+                {'uuid': uuid, 'name': name, 'is_approved': True} for uuid, name in zip(team_uuids, teams)
+            ])
+            conn.execute(insert(UserProfile.__table__), [
+                {'email': f'user{n}@example.com', 'name': f'User {n}', 'team_uuid': team_uuids[n % len(teams)],
+                 'managed_team_uuid': team_uuids[n % len(teams)] if n < len(teams) else None}
+                for n in range(users)
+            ])
+            conn.execute(insert(ManagerRequest.__table__), [
+                {'uuid': f'm{n}', 'user_email': f'user{n}@example.com', 'requested_team_uuid': team_uuids[n % len(teams)],
+                 'status': 'pending' if n % 10 == 0 else 'approved'}
+                for n in range(users)
+            ])
+            idea_rows = [{
+                'uuid': f'i{n}',
+                'title': f'Benchmark idea {n}',
+                'description': 'Generated for the index benchmark',
+                'email': f'user{rng.randrange(users)}@example.com',
+                'benefactor_team': rng.choice(teams),
+                'size': IdeaSize.medium,
+                'needed_by': now + timedelta(days=30),
+                'priority': PriorityLevel.medium,
+                'status': statuses[n % len(statuses)],
+                'date_submitted': now - timedelta(minutes=n),
+                'assigned_to_email': f'user{rng.randrange(users)}@example.com' if n % 5 == 0 else None
+            } for n in range(ideas)]
+            conn.execute(insert(Idea.__table__), idea_rows)
+            claimed = [row for row in idea_rows if row['status'] != IdeaStatus.open]
+            conn.execute(insert(Claim.__table__), [
+                {'uuid': f'c{n}', 'idea_uuid': row['uuid'], 'claimer_email': f'user{rng.randrange(users)}@example.com',
+                 'claim_date': row['date_submitted'] + timedelta(days=1)}
+                for n, row in enumerate(claimed)
+            ])
+            conn.execute(insert(ClaimApproval.__table__), [
+                {'uuid': f'a{n}', 'idea_uuid': f'i{rng.randrange(ideas)}', 'claimer_email': f'user{n % users}@example.com',
+                 'claimer_name': f'User {n % users}', 'status': 'pending' if n % 4 == 0 else 'approved'}
+                for n in range(ideas // 10)
+            ])
+        print(f"Scratch database: {ideas} ideas, {len(claimed)} claims, {users} users")
+        
+        queries = {
+            'team ideas by status': select(func.count()).select_from(Idea).where(
+                Idea.benefactor_team == 'Team 7', Idea.status == IdeaStatus.open),
+            'ideas by submitter': select(Idea.uuid).where(Idea.email == 'user3@example.com'),
+            'ideas assigned to user': select(Idea.uuid).where(Idea.assigned_to_email == 'user3@example.com'),
+            'open ideas, newest first': select(Idea.uuid).where(
+                Idea.status == IdeaStatus.open).order_by(desc(Idea.date_submitted)).limit(20),
+            'claims by claimer': select(Claim.uuid).where(Claim.claimer_email == 'user3@example.com'),
+            'claims for idea': select(Claim.uuid).where(Claim.idea_uuid == 'i4'),
+            'pending approvals for claimer': select(ClaimApproval.uuid).where(
+                ClaimApproval.claimer_email == 'user8@example.com', ClaimApproval.status == 'pending'),
+            'pending manager requests': select(ManagerRequest.uuid).where(ManagerRequest.status == 'pending'),
+            'team members': select(UserProfile.email).where(UserProfile.team_uuid == '7')
+        }
+        
+        def measure(conn, runs=20):
+            results = {}
+            for label, statement in queries.items():
+                sql = str(statement.compile(bench_engine, compile_kwargs={'literal_binds': True}))
+                plan = ' / '.join(row[3] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+                started = time.perf_counter()
+                for _ in range(runs):
+                    conn.execute(statement).all()
+                results[label] = ((time.perf_counter() - started) / runs * 1000, plan)
+            return results
+        
+        indexes = [index for table in Base.metadata.sorted_tables if table.name in BENCHMARK_INDEXED_TABLES
+                   for index in table.indexes]
+        with bench_engine.begin() as conn:
+            for index in indexes:
+                conn.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+            conn.execute(text('ANALYZE'))
+            before = measure(conn)
+            for index in indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+            conn.execute(text('ANALYZE'))
+            after = measure(conn)
+        
+        for label in queries:
+            (before_ms, before_plan), (after_ms, after_plan) = before[label], after[label]
+            print(f"{label:>30}: {before_ms:7.2f} ms -> {after_ms:6.2f} ms")
+            print(f"{'':>32}before: {before_plan}")
+            print(f"{'':>32}after:  {after_plan}")
+    finally:
+        bench_engine.dispose()
+        os.remove(path)
+
 if __name__ == "__main__":
-    init_db()
-    print("Database initialized successfully!")
\ No newline at end of file
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else 'init'
+    if command == 'init':
+        init_db()
+        ensure_columns()
+        ensure_indexes()
+        print("Database initialized successfully!")
+    elif command == 'benchmark':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
+    else:
+        print(f"Unknown command '{command}'. Use 'init' or 'benchmark'.")
+        sys.exit(2)
\ No newline at end of file
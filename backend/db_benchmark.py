@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+SQLite concurrency benchmark.
+
+Runs a mixed read/write workload against a scratch database from several
+processes and threads (like gunicorn workers), once with the previous engine
+setup (rollback journal, default pool) and once with create_db_engine()'s WAL
+and pragma configuration, and reports operations per second for each.
+
+Usage:
+    python db_benchmark.py [seconds] [processes] [threads] [write_percent]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, desc
+from sqlalchemy.orm import sessionmaker
+from database import Base, create_db_engine
+from models import Idea, IdeaSize, PriorityLevel
+
+SEED_IDEAS = 2000
+
+def _baseline_engine(url):
+    """The engine database.py created before WAL and pooling were configured."""
+    return create_engine(url, echo=False, connect_args={'check_same_thread': False})
+
+ENGINES = {
+    'before': _baseline_engine,
+    'after': create_db_engine
+}
+
+def _new_idea(i):
+    return Idea(
+        title=f'Benchmark idea {i}',
+        description='Generated for the concurrency benchmark',
+        email=f'user{i % 200}@example.com',
+        benefactor_team='Benchmark Team',
+        size=IdeaSize.small,
+        priority=PriorityLevel.medium,
+        needed_by=datetime.utcnow() + timedelta(days=30)
+    )
+
+def _worker(mode, url, seconds, threads, write_percent, results):
+    engine = ENGINES[mode](url)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+    
+    def run():
+        rng = random.Random()
+        local = {'reads': 0, 'writes': 0, 'errors': 0}
+        while time.monotonic() < deadline:
+            db = Session()
+            try:
+                if rng.randrange(100) < write_percent:
+                    db.add(_new_idea(rng.randrange(1_000_000)))
+                    db.commit()
+                    local['writes'] += 1
+                else:
+                    db.query(Idea).order_by(desc(Idea.date_submitted)).limit(20).all()
+                    local['reads'] += 1
+            except Exception:
+                db.rollback()
+                local['errors'] += 1
+            finally:
+                db.close()
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+    
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    engine.dispose()
+    results.put(counts)
+
+def run_benchmark(mode, seconds, processes, threads, write_percent):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    url = f'sqlite:///{path}'
+    try:
+        engine = ENGINES[mode](url)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        db.add_all([_new_idea(i) for i in range(SEED_IDEAS)])
+        db.commit()
+        db.close()
+        engine.dispose()
+        
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_worker, args=(mode, url, seconds, threads, write_percent, results))
+                   for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        totals = {'reads': 0, 'writes': 0, 'errors': 0}
+        for _ in workers:
+            for key, value in results.get().items():
+                totals[key] += value
+        for worker in workers:
+            worker.join()
+    finally:
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    
+    ops = totals['reads'] + totals['writes']
+    print(f"{mode:>6}: {ops / seconds:8,.0f} ops/s "
+          f"({totals['reads'] / seconds:,.0f} reads/s, {totals['writes'] / seconds:,.0f} writes/s, "
+          f"{totals['errors']} errors)")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    seconds, processes, threads, write_percent = (args + [5, 4, 8, 10][len(args):])[:4]
+    print(f"{processes} processes x {threads} threads, {write_percent}% writes, {seconds}s per run")
+    for mode in ('before', 'after'):
+        run_benchmark(mode, seconds, processes, threads, write_percent)
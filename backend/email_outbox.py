@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Outbound email queue.
+
+enqueue_email() writes a message to the email_outbox table and returns at once,
+so request handlers never wait on the mail server. Each worker process runs one
+background sender that claims batches of due messages, delivers them over a
+reused, already-authenticated SMTP connection and reschedules failures with
+exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS is reached or the
+message's optional expires_at passes (verification codes are useless after
+their own expiry). Only a 5xx refusal of a message's recipients or content
+fails it at once. Failing to connect, start TLS or log in is a server or
+settings problem rather than the message's (a rotated password fails every
+message), so those failures back off like any other but never use up a
+message's attempts, and the rest of the batch waits instead of retrying the
+login; the queue drains once the settings are fixed. Batches are claimed
+with a single conditional UPDATE, so when several gunicorn workers run
+senders each message is still delivered by only one of them.
+
+Usage:
+    python email_outbox.py status   # count queued messages by status
+    python email_outbox.py drain    # deliver due messages in the foreground
+    python email_outbox.py retry    # requeue messages that exhausted their retries
+
+Admin test emails (/api/admin/test-email) skip the queue and are sent
+synchronously with send_immediately(), so SMTP errors reach the admin.
+
+For local testing, point the email settings at a debug SMTP server such as
+`python -m aiosmtpd -n -l localhost:1025` with TLS disabled.
+"""
+
+import smtplib
+import sys
+import threading
+import time
+import uuid as uuid_lib
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from sqlalchemy import and_, or_, func
+from config import Config
+from database import get_session
+from models import EmailOutbox, EmailSettings
+
+def enqueue_email(to_email, subject, body, subtype='html', expires_at=None):
+    """Queue a message for background delivery. Returns the outbox id.
+    
+    A message still undelivered at `expires_at` (UTC) is marked expired
+    instead of being sent or retried.
+    """
+    db = get_session()
+    try:
+        message = EmailOutbox(to_email=to_email, subject=subject, body=body, subtype=subtype,
+                              expires_at=expires_at)
+        db.add(message)
+        db.commit()
+        message_id = message.id
+    finally:
+        db.close()
+    email_sender.wake()
+    return message_id
+
+def send_immediately(settings, to_email, subject, body, subtype='html'):
+    """Deliver one message now on its own connection, bypassing the outbox.
+    
+    For admin test emails, where the point is to see SMTP and login errors;
+    raises whatever smtplib raised.
+    """
+    pool = SmtpConnectionPool()
+    try:
+        pool.send(settings, build_message(settings, EmailOutbox(
+            to_email=to_email, subject=subject, body=body, subtype=subtype
+        )))
+    finally:
+        pool.close_all()
+
+def build_message(settings, message):
+    """Build the MIME message for an outbox row using the current sender settings."""
+    msg = MIMEMultipart()
+    msg['From'] = f"{settings.from_name} <{settings.from_email}>"
+    msg['To'] = message.to_email
+    msg['Subject'] = message.subject
+    msg.attach(MIMEText(message.body, message.subtype or 'html'))
+    return msg
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after `attempts` failures."""
+    return min(Config.EMAIL_OUTBOX_RETRY_BASE * 2 ** (attempts - 1), Config.EMAIL_OUTBOX_RETRY_MAX)
+
+class SmtpSetupError(Exception):
+    """Connecting, STARTTLS or login failed, or no server is configured."""
+
+def is_permanent_failure(error):
+    """True for errors that retrying cannot fix: 5xx refusals of the recipients or the message."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, response in error.recipients.values())
+    if isinstance(error, smtplib.SMTPDataError):
+        return 500 <= error.smtp_code < 600
+    return False
+
+class SmtpConnectionPool:
+    """Authenticated SMTP connections reused across messages.
+    
+    Connections are keyed by server settings, so changing the email settings
+    opens a fresh connection. Owned by the sender thread; not thread-safe.
+    """
+    
+    def __init__(self, idle_timeout=None):
+        self.idle_timeout = idle_timeout or Config.SMTP_CONNECTION_IDLE_TIMEOUT
+        self._connections = {}
+    
+    @staticmethod
+    def _key(settings):
+        return (settings.smtp_server, settings.smtp_port, settings.smtp_username,
+                settings.smtp_password, bool(settings.smtp_use_tls))
+    
+    def _connect(self, settings):
+        try:
+            server = smtplib.SMTP(settings.smtp_server, settings.smtp_port, timeout=Config.SMTP_TIMEOUT)
+        except (smtplib.SMTPException, OSError) as e:
+            raise SmtpSetupError(e) from e
+        try:
+            if settings.smtp_use_tls:
+                server.starttls()
+            if settings.smtp_username and settings.smtp_password:
+                server.login(settings.smtp_username, settings.smtp_password)
+        except (smtplib.SMTPException, OSError) as e:
+            server.close()
+            raise SmtpSetupError(e) from e
+        return server
+    
+    def _connection(self, settings):
+        key = self._key(settings)
+        entry = self._connections.get(key)
+        if entry and time.monotonic() - entry[1] < self.idle_timeout:
+            return entry[0]
+        if entry:
+            self._close(key)
+        server = self._connect(settings)
+        self._connections[key] = (server, time.monotonic())
+        return server
+    
+    def send(self, settings, msg):
+        """Send a message, reconnecting once if the server dropped the connection."""
+        for attempt in range(2):
+            server = self._connection(settings)
+            try:
+                server.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self._close(self._key(settings))
+                if attempt:
+                    raise
+                continue
+            self._connections[self._key(settings)] = (server, time.monotonic())
+            return
+    
+    def discard(self, settings):
+        """Drop the connection for these settings after an error."""
+        self._close(self._key(settings))
+    
+    def _close(self, key):
+        entry = self._connections.pop(key, None)
+        if entry is None:
+            return
+        try:
+            entry[0].quit()
+        except Exception:
+            entry[0].close()
+    
+    def close_idle(self):
+        """Close connections that have not been used within the idle timeout."""
+        now = time.monotonic()
+        for key, (server, last_used) in list(self._connections.items()):
+            if now - last_used >= self.idle_timeout:
+                self._close(key)
+    
+    def close_all(self):
+        for key in list(self._connections):
+            self._close(key)
+
+class OutboxSender:
+    """Per-process background sender for the email outbox."""
+    
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or Config.EMAIL_OUTBOX_POLL_INTERVAL
+        self.pool = SmtpConnectionPool()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._last_prune = 0.0
+    
+    def start(self):
+        """Start the sender thread if it is not already running in this process."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+                self._thread.start()
+    
+    def wake(self):
+        """Ask the sender to look for due messages now."""
+        self.start()
+        self._wake.set()
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception as e:
+                print(f"Email outbox sender failed: {e}")
+            self.pool.close_idle()
+    
+    def drain(self):
+        """Deliver batches until no due messages remain. Returns messages handled."""
+        handled = 0
+        while True:
+            count = self.process_batch()
+            handled += count
+            if count < Config.EMAIL_OUTBOX_BATCH_SIZE:
+                return handled
+    
+    def _claim_batch(self, db):
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=Config.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+        due = or_(
+            and_(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == 'sending', EmailOutbox.claimed_at < stale)
+        )
+        due_ids = [message_id for (message_id,) in db.query(EmailOutbox.id).filter(due).order_by(
+            EmailOutbox.id
+        ).limit(Config.EMAIL_OUTBOX_BATCH_SIZE).all()]
+        if not due_ids:
+            # Idle polls only read, so they never take the SQLite write lock
+            return []
+        
+        # The due condition is re-checked by the UPDATE itself, so a row
+        # another worker claimed in the meantime is skipped
+        token = uuid_lib.uuid4().hex
+        db.query(EmailOutbox).filter(EmailOutbox.id.in_(due_ids), due).update({
+            EmailOutbox.status: 'sending',
+            EmailOutbox.claimed_by: token,
+            EmailOutbox.claimed_at: now
+        }, synchronize_session=False)
+        db.commit()
+        return db.query(EmailOutbox).filter(
+            EmailOutbox.claimed_by == token
+        ).order_by(EmailOutbox.id).all()
+    
+    def process_batch(self):
+        """Claim and deliver one batch of due messages. Returns the batch size."""
+        db = get_session()
+        try:
+            messages = self._claim_batch(db)
+            if not messages:
+                self._prune(db)
+                return 0
+            
+            settings = db.query(EmailSettings).filter_by(is_active=True).first()
+            setup_error = None
+            if not settings or not settings.smtp_server:
+                setup_error = SmtpSetupError('Email settings not configured')
+            now = datetime.utcnow()
+            for message in messages:
+                if message.expires_at and message.expires_at <= now:
+                    message.status = 'expired'
+                    print(f"Dropped expired email to {message.to_email}")
+                    continue
+                if setup_error:
+                    self._record_failure(message, setup_error)
+                    continue
+                try:
+                    self.pool.send(settings, build_message(settings, message))
+                except Exception as e:
+                    if isinstance(e, SmtpSetupError):
+                        setup_error = e
+                    elif not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                        # The connection itself may be broken; reconnect next time
+                        self.pool.discard(settings)
+                    self._record_failure(message, e)
+                else:
+                    message.status = 'sent'
+                    message.sent_at = datetime.utcnow()
+                    message.attempts += 1
+                    message.last_error = None
+                    print(f"Email sent to {message.to_email}")
+            for message in messages:
+                message.claimed_by = None
+                message.claimed_at = None
+            db.commit()
+            return len(messages)
+        finally:
+            db.close()
+    
+    def _record_failure(self, message, error):
+        message.attempts += 1
+        message.last_error = str(error)
+        if is_permanent_failure(error) or (
+            message.attempts >= Config.EMAIL_OUTBOX_MAX_ATTEMPTS and not isinstance(error, SmtpSetupError)
+        ):
+            message.status = 'failed'
+            print(f"Failed to send email to {message.to_email}, giving up: {error}")
+        elif message.expires_at and datetime.utcnow() + timedelta(seconds=retry_delay(message.attempts)) >= message.expires_at:
+            message.status = 'expired'
+            print(f"Failed to send email to {message.to_email}, expires before the next attempt: {error}")
+        else:
+            message.status = 'pending'
+            message.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(message.attempts))
+            print(f"Failed to send email to {message.to_email} (attempt {message.attempts}), will retry: {error}")
+    
+    def _prune(self, db):
+        now = time.monotonic()
+        if now - self._last_prune < 3600:
+            return
+        self._last_prune = now
+        cutoff = datetime.utcnow() - timedelta(seconds=Config.EMAIL_OUTBOX_SENT_RETENTION)
+        db.query(EmailOutbox).filter(or_(
+            and_(EmailOutbox.status == 'sent', EmailOutbox.sent_at < cutoff),
+            and_(EmailOutbox.status == 'expired', EmailOutbox.expires_at < cutoff)
+        )).delete(synchronize_session=False)
+        db.commit()
+
+email_sender = OutboxSender()
+
+if __name__ == "__main__":
+    from database import init_db
+    
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    init_db()
+    if command == 'drain':
+        handled = email_sender.drain()
+        email_sender.pool.close_all()
+        print(f"Processed {handled} queued messages")
+    elif command in ('status', 'retry'):
+        db = get_session()
+        try:
+            if command == 'retry':
+                requeued = db.query(EmailOutbox).filter(EmailOutbox.status == 'failed').update({
+                    EmailOutbox.status: 'pending',
+                    EmailOutbox.attempts: 0,
+                    EmailOutbox.next_attempt_at: datetime.utcnow()
+                }, synchronize_session=False)
+                db.commit()
+                print(f"Requeued {requeued} failed messages")
+            counts = db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all()
+            for status, count in sorted(counts):
+                print(f"{status}: {count}")
+        finally:
+            db.close()
+    else:
+        print(f"Unknown command '{command}'. Use 'status', 'drain' or 'retry'.")
+        sys.exit(2)
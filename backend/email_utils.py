@@ -1,12 +1,10 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from config import Config
 from database import get_session
 from models import EmailSettings
+from email_outbox import enqueue_email
 
 def send_claim_notification(idea, claim):
-    """Send email notification when an idea is claimed."""
+    """Queue an email notification when an idea is claimed."""
     db = get_session()
     try:
         # Get email settings from database
@@ -19,11 +17,6 @@ def send_claim_notification(idea, claim):
             print(f"Claimer: {claim.claimer_name} from {claim.claimer_team}")
             return
         
-        msg = MIMEMultipart()
-        msg['From'] = f"{settings.from_name} <{settings.from_email}>"
-        msg['To'] = idea.email
-        msg['Subject'] = f'Your idea "{idea.title}" has been claimed!'
-        
         body = f"""
         <html>
         <body>
@@ -41,23 +34,16 @@ def send_claim_notification(idea, claim):
         </html>
         """
         
-        msg.attach(MIMEText(body, 'html'))
-        
-        with smtplib.SMTP(settings.smtp_server, settings.smtp_port) as server:
-            if settings.smtp_use_tls:
-                server.starttls()
-            if settings.smtp_username and settings.smtp_password:
-                server.login(settings.smtp_username, settings.smtp_password)
-            server.send_message(msg)
-            print(f"Email sent to {idea.email}")
+        enqueue_email(idea.email, f'Your idea "{idea.title}" has been claimed!', body)
+        print(f"Email queued for {idea.email}")
             
     except Exception as e:
-        print(f"Failed to send email: {str(e)}")
+        print(f"Failed to queue email: {str(e)}")
     finally:
         db.close()
 
-def send_verification_code(email, code):
-    """Send email verification code."""
+def send_verification_code(email, code, expires_at=None):
+    """Queue the email verification code for delivery."""
     db = get_session()
     try:
         # Get email settings from database
@@ -70,11 +56,6 @@ def send_verification_code(email, code):
             print(f"Valid for: 3 minutes")
             return True
         
-        msg = MIMEMultipart()
-        msg['From'] = f"{settings.from_name} <{settings.from_email}>"
-        msg['To'] = email
-        msg['Subject'] = 'Your Posting Board Verification Code'
-        
         body = f"""
         <html>
         <body>
@@ -89,19 +70,12 @@ def send_verification_code(email, code):
         </html>
         """
         
-        msg.attach(MIMEText(body, 'html'))
-        
-        with smtplib.SMTP(settings.smtp_server, settings.smtp_port) as server:
-            if settings.smtp_use_tls:
-                server.starttls()
-            if settings.smtp_username and settings.smtp_password:
-                server.login(settings.smtp_username, settings.smtp_password)
-            server.send_message(msg)
-            print(f"Verification email sent to {email}")
-            return True
+        enqueue_email(email, 'Your Posting Board Verification Code', body, expires_at=expires_at)
+        print(f"Verification email queued for {email}")
+        return True
             
     except Exception as e:
-        print(f"Failed to send verification email: {str(e)}")
+        print(f"Failed to queue verification email: {str(e)}")
         return False
     finally:
         db.close()
\ No newline at end of file
@@ -3,6 +3,21 @@
 # Ensure data directory exists
 mkdir -p /app/data
 
+# Start each run with empty metrics files (see metrics.py)
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+# A PostgreSQL DATABASE_URL is used as-is; anything else uses the SQLite file
+case "$DATABASE_URL" in
+    postgres://*|postgresql://*)
+        echo "Using PostgreSQL database"
+        python database.py
+        exec "$@"
+        ;;
+esac
+
 # Initialize database if it doesn't exist
 if [ ! -f "/app/data/posting_board_uuid.db" ]; then
     echo "Database not found. Initializing..."
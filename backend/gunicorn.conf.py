@@ -0,0 +1,14 @@
+"""
+Gunicorn settings read from the working directory at startup.
+
+Server options stay on the command line (see the Dockerfile); this file only
+adds hooks.
+"""
+
+import os
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges (e.g. requests in flight) from /metrics
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,182 @@
+"""
+Idea listing helpers.
+
+Loads ideas together with their submitter, skills, bounty and claims in a fixed
+number of queries, so list endpoints no longer issue per-idea or per-claim lookups.
+Also provides keyset (cursor) pagination and field projection for /api/ideas.
+"""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import asc, desc, literal, tuple_
+from sqlalchemy.orm import selectinload, defer
+from models import Idea, UserProfile, PriorityLevel, IdeaSize
+
+# Keep IN lists well below SQLite's bound-parameter limit
+NAME_LOOKUP_CHUNK_SIZE = 500
+
+# Relationship each projected field depends on (names, since backrefs
+# only exist once mappers are configured)
+FIELD_RELATIONS = {
+    'submitter_name': 'submitter',
+    'skills': 'skills',
+    'bounty_details': 'bounty_details',
+    'claims': 'claims'
+}
+
+# Keyset columns per sort order; uuid is always the final tie-breaker
+SORT_KEYS = {
+    'date_desc': (desc, [Idea.date_submitted, Idea.uuid]),
+    'date_asc': (asc, [Idea.date_submitted, Idea.uuid]),
+    'priority': (desc, [Idea.priority, Idea.date_submitted, Idea.uuid]),
+    'size': (asc, [Idea.size, Idea.date_submitted, Idea.uuid])
+}
+
+def parse_fields(fields_param):
+    """Parse a comma-separated fields= value. Returns (fields, invalid)."""
+    if not fields_param:
+        return None, []
+    requested = [f.strip() for f in fields_param.split(',') if f.strip()]
+    invalid = [f for f in requested if f not in FIELD_SERIALIZERS]
+    # uuid is always included so clients can link to the idea
+    fields = {'uuid'} | {f for f in requested if f in FIELD_SERIALIZERS}
+    return fields, invalid
+
+def with_listing_relations(query, fields=None):
+    """Eager-load the relationships the idea list serializer touches.
+
+    When a field projection is given, only the relationships it needs are
+    loaded and the description column is deferred unless requested.
+    """
+    options = [
+        selectinload(getattr(Idea, relation)) for field, relation in FIELD_RELATIONS.items()
+        if fields is None or field in fields
+    ]
+    if fields is not None and 'description' not in fields:
+        options.append(defer(Idea.description))
+    return query.options(*options) if options else query
+
+def apply_sort(query, sort_by):
+    """Order a listing query by the given sort key, with uuid as tie-breaker."""
+    direction, columns = SORT_KEYS.get(sort_by, SORT_KEYS['date_desc'])
+    return query.order_by(*[direction(column) for column in columns])
+
+def _cursor_values(idea, sort_by):
+    _, columns = SORT_KEYS.get(sort_by, SORT_KEYS['date_desc'])
+    values = []
+    for column in columns:
+        value = getattr(idea, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif hasattr(value, 'value'):
+            value = value.value
+        values.append(value)
+    return values
+
+def encode_cursor(idea, sort_by):
+    """Build an opaque cursor pointing just past the given idea."""
+    payload = json.dumps({'s': sort_by, 'k': _cursor_values(idea, sort_by)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def apply_cursor(query, cursor, sort_by):
+    """Restrict a sorted listing query to rows after the cursor.
+
+    Raises ValueError if the cursor is malformed or was issued for a different sort.
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    if payload.get('s') != sort_by:
+        raise ValueError('Cursor does not match sort order')
+    direction, columns = SORT_KEYS.get(sort_by, SORT_KEYS['date_desc'])
+    raw_values = payload.get('k') or []
+    if len(raw_values) != len(columns):
+        raise ValueError('Malformed cursor')
+    
+    values = []
+    for column, value in zip(columns, raw_values):
+        if column is Idea.date_submitted:
+            value = datetime.fromisoformat(value)
+        elif column is Idea.priority:
+            value = PriorityLevel(value)
+        elif column is Idea.size:
+            value = IdeaSize(value)
+        values.append(literal(value, type_=column.type))
+    
+    if direction is desc:
+        return query.filter(tuple_(*columns) < tuple_(*values))
+    return query.filter(tuple_(*columns) > tuple_(*values))
+
+def get_claimer_names(ideas, db):
+    """Map claimer email -> display name for all claims on the given ideas."""
+    emails = sorted({claim.claimer_email for idea in ideas for claim in idea.claims})
+    names = {}
+    for start in range(0, len(emails), NAME_LOOKUP_CHUNK_SIZE):
+        chunk = emails[start:start + NAME_LOOKUP_CHUNK_SIZE]
+        rows = db.query(UserProfile.email, UserProfile.name).filter(
+            UserProfile.email.in_(chunk)
+        ).all()
+        names.update(dict(rows))
+    return names
+
+def serialize_bounty_details(idea):
+    """Serialize the monetary bounty attached to an idea, if any."""
+    if not idea.bounty_details:
+        return None
+    bounty = idea.bounty_details[0]
+    return {
+        'is_monetary': bounty.is_monetary,
+        'is_expensed': bounty.is_expensed,
+        'amount': bounty.amount,
+        'requires_approval': bounty.requires_approval,
+        'is_approved': bounty.is_approved
+    }
+
+def serialize_claims(idea, claimer_names):
+    """Serialize an idea's claims using a pre-built claimer name map."""
+    return [{
+        'name': claimer_names.get(c.claimer_email, c.claimer_email),
+        'email': c.claimer_email,
+        'date': c.claim_date.strftime('%Y-%m-%d')
+    } for c in idea.claims]
+
+# Field name -> serializer(idea, claimer_names), in output order
+FIELD_SERIALIZERS = {
+    'uuid': lambda idea, names: idea.uuid,
+    'title': lambda idea, names: idea.title,
+    'description': lambda idea, names: idea.description,
+    'email': lambda idea, names: idea.email,
+    'submitter_name': lambda idea, names: idea.submitter.name if idea.submitter else None,
+    'benefactor_team': lambda idea, names: idea.benefactor_team,
+    'priority': lambda idea, names: idea.priority.value,
+    'size': lambda idea, names: idea.size.value,
+    'status': lambda idea, names: idea.status.value,
+    'bounty': lambda idea, names: idea.bounty,
+    'bounty_details': lambda idea, names: serialize_bounty_details(idea),
+    'sub_status': lambda idea, names: idea.sub_status.value if idea.sub_status else None,
+    'sub_status_updated_at': lambda idea, names: idea.sub_status_updated_at.strftime('%Y-%m-%d %H:%M') if idea.sub_status_updated_at else None,
+    'sub_status_updated_by': lambda idea, names: idea.sub_status_updated_by,
+    'progress_percentage': lambda idea, names: idea.progress_percentage or 0,
+    'blocked_reason': lambda idea, names: idea.blocked_reason,
+    'expected_completion': lambda idea, names: idea.expected_completion.strftime('%Y-%m-%d') if idea.expected_completion else None,
+    'needed_by': lambda idea, names: idea.needed_by.strftime('%Y-%m-%d') if idea.needed_by else None,
+    'date_submitted': lambda idea, names: idea.date_submitted.strftime('%Y-%m-%d'),
+    'skills': lambda idea, names: [{'uuid': s.uuid, 'name': s.name} for s in idea.skills],
+    'claims': lambda idea, names: serialize_claims(idea, names)
+}
+
+def serialize_idea(idea, claimer_names, fields=None):
+    """Serialize an idea for the /api/ideas listing, optionally projected to fields."""
+    return {
+        key: serializer(idea, claimer_names)
+        for key, serializer in FIELD_SERIALIZERS.items()
+        if fields is None or key in fields
+    }
+
+def serialize_ideas(ideas, db, fields=None):
+    """Serialize a list of eagerly-loaded ideas with one extra name lookup."""
+    if fields is not None and 'claims' not in fields:
+        claimer_names = {}
+    else:
+        claimer_names = get_claimer_names(ideas, db)
+    return [serialize_idea(idea, claimer_names, fields) for idea in ideas]
@@ -0,0 +1,100 @@
+"""
+Idea detail tab data.
+
+Serializers for the comments, external links, activity, status history and
+stage data shown on the idea detail page. Each runs a fixed number of
+queries for one idea, and they are shared by the per-tab API endpoints and
+the /api/ideas/<uuid>/bundle endpoint that returns several tabs at once.
+"""
+
+from models import IdeaComment, IdeaExternalLink, IdeaActivity, IdeaStageData, StatusHistory, UserProfile
+
+# Bundle sections; the first three need idea tab access
+PRIVATE_SECTIONS = ('comments', 'external_links', 'activities')
+BUNDLE_SECTIONS = PRIVATE_SECTIONS + ('status_history', 'stage_data')
+
+ACTIVITY_LIMIT = 50
+
+def serialize_comments(db, idea_uuid):
+    comments = db.query(IdeaComment).filter_by(idea_uuid=idea_uuid).order_by(IdeaComment.created_at.desc()).all()
+    return [{
+        "id": comment.uuid,
+        "author_name": comment.author_name or comment.author_email,
+        "author_email": comment.author_email,
+        "content": comment.content,
+        "created_at": comment.created_at.strftime("%B %d, %Y at %I:%M %p"),
+        "is_internal": comment.is_internal,
+        "sub_status": comment.sub_status.value if comment.sub_status else None
+    } for comment in comments]
+
+def serialize_external_links(db, idea_uuid):
+    links = db.query(IdeaExternalLink).filter_by(idea_uuid=idea_uuid).order_by(IdeaExternalLink.created_at.desc()).all()
+    creator_emails = {link.created_by for link in links if link.created_by}
+    creator_names = dict(
+        db.query(UserProfile.email, UserProfile.name).filter(UserProfile.email.in_(creator_emails)).all()
+    ) if creator_emails else {}
+    return [{
+        "id": link.uuid,
+        "link_type": link.link_type.value,
+        "title": link.title,
+        "url": link.url,
+        "description": link.description,
+        "creator_name": creator_names[link.created_by] if link.created_by in creator_names else link.created_by,
+        "created_at": link.created_at.strftime("%B %d, %Y"),
+        "sub_status": link.sub_status.value if link.sub_status else None
+    } for link in links]
+
+def serialize_activities(db, idea_uuid, limit=ACTIVITY_LIMIT):
+    activities = db.query(IdeaActivity).filter_by(idea_uuid=idea_uuid).order_by(
+        IdeaActivity.created_at.desc()
+    ).limit(limit).all()
+    return [{
+        "id": activity.uuid,
+        "activity_type": activity.activity_type.value,
+        "actor_name": activity.actor_name or activity.actor_email,
+        "description": activity.description,
+        "created_at": activity.created_at.strftime("%B %d, %Y at %I:%M %p"),
+        "activity_data": activity.activity_data
+    } for activity in activities]
+
+def serialize_status_history(db, idea_uuid):
+    history = db.query(StatusHistory).filter_by(idea_uuid=idea_uuid).order_by(StatusHistory.changed_at.desc()).all()
+    return [{
+        'from_status': entry.from_status.value if entry.from_status else None,
+        'to_status': entry.to_status.value if entry.to_status else None,
+        'from_sub_status': entry.from_sub_status.value if entry.from_sub_status else None,
+        'to_sub_status': entry.to_sub_status.value if entry.to_sub_status else None,
+        'changed_by': entry.changed_by,
+        'changed_at': entry.changed_at.strftime('%Y-%m-%d %H:%M'),
+        'comment': entry.comment,
+        'duration_minutes': entry.duration_minutes
+    } for entry in history]
+
+def serialize_stage_data(db, idea_uuid, sub_status=None):
+    """Stage fields as {field: value} for one sub-status, or {sub_status: {field: value}} for all."""
+    query = db.query(IdeaStageData).filter(IdeaStageData.idea_uuid == idea_uuid)
+    if sub_status is not None:
+        return {record.field_name: record.field_value
+                for record in query.filter(IdeaStageData.sub_status == sub_status).all()}
+    
+    data = {}
+    for record in query.all():
+        data.setdefault(record.sub_status.value, {})[record.field_name] = record.field_value
+    return data
+
+SERIALIZERS = {
+    'comments': serialize_comments,
+    'external_links': serialize_external_links,
+    'activities': serialize_activities,
+    'status_history': serialize_status_history,
+    'stage_data': serialize_stage_data
+}
+
+def build_idea_bundle(db, idea_uuid, sections, has_tab_access):
+    """Serialize the requested sections; private ones are left out without tab access."""
+    bundle = {'has_tab_access': has_tab_access}
+    for section in sections:
+        if section in PRIVATE_SECTIONS and not has_tab_access:
+            continue
+        bundle[section] = SERIALIZERS[section](db, idea_uuid)
+    return bundle
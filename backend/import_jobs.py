@@ -0,0 +1,230 @@
+"""
+Background CSV import jobs.
+
+The bulk-upload endpoints spool the upload to IMPORT_SPOOL_DIR, record an
+import_jobs row and return at once. Each worker process runs one background
+runner that claims queued jobs with a conditional UPDATE and feeds the spooled
+file through csv_import. Progress (last committed row, imported count and
+errors) is saved in the same transaction as each chunk, so a job whose worker
+died is picked up by another runner once its heartbeat goes stale and resumes
+after the last committed row. Every checkpoint and the final status update are
+conditional on the runner's claim token, so a runner whose job was reclaimed
+rolls back its current chunk and stops instead of writing rows twice.
+"""
+
+import csv
+import json
+import os
+import threading
+import uuid as uuid_lib
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, update
+from config import Config
+from database import get_session
+from models import ImportJob
+from csv_import import (open_csv, import_ideas, import_users, ImportProgress, ImportAborted, CsvImportError,
+                        IDEA_REQUIRED_FIELDS, USER_REQUIRED_FIELDS)
+
+REQUIRED_FIELDS = {
+    'ideas': IDEA_REQUIRED_FIELDS,
+    'users': USER_REQUIRED_FIELDS
+}
+
+def count_rows(path):
+    """Count data rows in a CSV file, excluding the header and blank lines."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return max(sum(1 for row in csv.reader(f) if row) - 1, 0)
+
+def create_import_job(db, kind, upload, created_by=None, dry_run=False):
+    """Spool an uploaded file and queue an import job for it.
+    
+    Raises CsvImportError (after removing the spooled file) if required
+    columns are missing.
+    """
+    os.makedirs(Config.IMPORT_SPOOL_DIR, exist_ok=True)
+    job_uuid = str(uuid_lib.uuid4())
+    path = os.path.join(Config.IMPORT_SPOOL_DIR, f'{job_uuid}.csv')
+    upload.save(path)
+    
+    try:
+        with open(path, 'rb') as f:
+            open_csv(f, REQUIRED_FIELDS[kind])
+    except (CsvImportError, UnicodeDecodeError):
+        os.remove(path)
+        raise
+    
+    job = ImportJob(
+        uuid=job_uuid,
+        kind=kind,
+        filename=upload.filename,
+        path=path,
+        dry_run=dry_run,
+        created_by=created_by
+    )
+    db.add(job)
+    db.commit()
+    import_runner.wake()
+    return job
+
+def serialize_import_job(job):
+    """Serialize an import job for status polling."""
+    processed = max(job.last_row - 1, 0)
+    return {
+        'uuid': job.uuid,
+        'kind': job.kind,
+        'filename': job.filename,
+        'dry_run': bool(job.dry_run),
+        'status': job.status,
+        'total_rows': job.total_rows,
+        'processed_rows': min(processed, job.total_rows) if job.total_rows is not None else processed,
+        'imported': job.imported_count,
+        'errors': json.loads(job.errors) if job.errors else [],
+        'message': job.message,
+        'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else None,
+        'started_at': job.started_at.strftime('%Y-%m-%d %H:%M:%S') if job.started_at else None,
+        'finished_at': job.finished_at.strftime('%Y-%m-%d %H:%M:%S') if job.finished_at else None
+    }
+
+class JobProgress(ImportProgress):
+    """Saves import progress onto the job row within each chunk's transaction."""
+    
+    def __init__(self, job):
+        super().__init__(job.last_row, job.imported_count, json.loads(job.errors) if job.errors else [])
+        self.job_uuid = job.uuid
+        self.claimed_by = job.claimed_by
+    
+    def checkpoint(self, db, last_row, imported, errors):
+        result = db.execute(update(ImportJob).where(
+            ImportJob.uuid == self.job_uuid,
+            ImportJob.claimed_by == self.claimed_by
+        ).values(
+            last_row=last_row,
+            imported_count=imported,
+            errors=json.dumps(errors),
+            heartbeat_at=datetime.utcnow()
+        ))
+        if result.rowcount == 0:
+            raise ImportAborted(f'Import job {self.job_uuid} was reclaimed by another runner')
+
+class ImportJobRunner:
+    """Per-process background runner for import jobs."""
+    
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or Config.IMPORT_JOB_POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start the runner thread if it is not already running in this process."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='import-jobs', daemon=True)
+                self._thread.start()
+    
+    def wake(self):
+        """Ask the runner to look for queued jobs now."""
+        self.start()
+        self._wake.set()
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                while self.run_next():
+                    pass
+            except Exception as e:
+                print(f"Import job runner failed: {e}")
+    
+    def _claim(self, db):
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=Config.IMPORT_JOB_STALE_TIMEOUT)
+        claimable = or_(
+            ImportJob.status == 'queued',
+            and_(ImportJob.status == 'running', ImportJob.heartbeat_at < stale)
+        )
+        candidate = db.query(ImportJob.uuid).filter(claimable).order_by(ImportJob.created_at).first()
+        if candidate is None:
+            return None
+        
+        # Re-check the condition in the UPDATE so only one runner wins the job
+        token = uuid_lib.uuid4().hex
+        claimed = db.query(ImportJob).filter(ImportJob.uuid == candidate.uuid, claimable).update({
+            ImportJob.status: 'running',
+            ImportJob.claimed_by: token,
+            ImportJob.heartbeat_at: now
+        }, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return None
+        return db.get(ImportJob, candidate.uuid)
+    
+    def run_next(self):
+        """Claim and run one job. Returns False when there was nothing to claim."""
+        db = get_session()
+        try:
+            job = self._claim(db)
+            if job is None:
+                return False
+            self._execute(db, job)
+            return True
+        finally:
+            db.close()
+    
+    def _execute(self, db, job):
+        job_uuid, token, path = job.uuid, job.claimed_by, job.path
+        if job.last_row > 1:
+            print(f"Resuming import job {job_uuid} after row {job.last_row}")
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+        try:
+            if job.total_rows is None:
+                job.total_rows = count_rows(path)
+            total_rows = job.total_rows
+            db.commit()
+            
+            progress = JobProgress(job)
+            with open(path, 'rb') as f:
+                reader = open_csv(f, REQUIRED_FIELDS[job.kind])
+                if job.kind == 'ideas':
+                    imported, errors = import_ideas(db, reader, progress=progress)
+                else:
+                    imported, errors = import_users(db, reader, dry_run=job.dry_run, progress=progress)
+            
+            noun = 'ideas' if job.kind == 'ideas' else 'users'
+            if job.dry_run:
+                message = f'Validation complete: {imported} {noun} would be imported'
+            else:
+                message = f'Successfully imported {imported} {noun}'
+            values = {
+                'status': 'complete',
+                'last_row': total_rows + 1,
+                'imported_count': imported,
+                'errors': json.dumps(errors),
+                'message': message
+            }
+        except ImportAborted as e:
+            db.rollback()
+            print(f"{e}; stopping")
+            return
+        except Exception as e:
+            db.rollback()
+            values = {'status': 'failed', 'message': f'Error processing file: {str(e)}'}
+        
+        finished = db.execute(update(ImportJob).where(
+            ImportJob.uuid == job_uuid,
+            ImportJob.claimed_by == token
+        ).values(finished_at=datetime.utcnow(), claimed_by=None, **values)).rowcount
+        db.commit()
+        if not finished:
+            # The runner that reclaimed the job still needs the spooled file
+            print(f"Import job {job_uuid} was reclaimed by another runner; leaving it to finish")
+            return
+        
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+import_runner = ImportJobRunner()
@@ -0,0 +1,198 @@
+"""
+Prometheus metrics.
+
+GET /metrics serves the Prometheus text exposition format for:
+
+- request latency per route, method and status, and requests in flight
+- time spent waiting for a database pool connection, checkout timeouts and
+  connections in use, per engine (primary and read)
+- session store open/save latency
+- notification stream subscribers, events delivered and events dropped
+- email outbox depth by status and the age of the oldest pending message
+
+Under gunicorn each worker is a separate process, so values are written to
+per-process files in PROMETHEUS_MULTIPROC_DIR (prometheus_client's
+multiprocess mode) and every scrape merges the files of all workers,
+whichever worker answers it. The directory must be set in the environment
+before the workers start and emptied on each deploy (entrypoint.sh does
+both), and gunicorn.conf.py removes a worker's live gauges when it exits.
+Without PROMETHEUS_MULTIPROC_DIR (e.g. `python app.py`) the values of the
+single process are served as-is.
+
+Email outbox depth is read from the database at scrape time, since it is
+shared by all workers rather than owned by one.
+"""
+
+import os
+import time
+from datetime import datetime
+from flask import Response, g, request
+from flask.sessions import SessionInterface
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event, func
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from database import engine, read_engine, get_read_session
+from models import EmailOutbox
+
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+# Long enough to cover long-polls (/api/changes) in the last finite bucket
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+SESSION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests being served',
+    ['route'], multiprocess_mode='livesum'
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Time to get a connection from the pool, including opening one',
+    ['engine'], buckets=POOL_WAIT_BUCKETS
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    'db_pool_checkout_timeouts', 'Pool checkouts that gave up after DB_POOL_TIMEOUT',
+    ['engine']
+)
+POOL_CONNECTIONS_IN_USE = Gauge(
+    'db_pool_connections_in_use', 'Connections checked out of the pool',
+    ['engine'], multiprocess_mode='livesum'
+)
+SESSION_STORE_LATENCY = Histogram(
+    'session_store_duration_seconds', 'Session store latency',
+    ['operation'], buckets=SESSION_BUCKETS
+)
+NOTIFICATION_SUBSCRIBERS = Gauge(
+    'notification_stream_subscribers', 'Open notification streams',
+    multiprocess_mode='livesum'
+)
+NOTIFICATION_EVENTS_DELIVERED = Counter(
+    'notification_events_delivered', 'Notification events queued to stream subscribers'
+)
+NOTIFICATION_EVENTS_DROPPED = Counter(
+    'notification_events_dropped', 'Notification events dropped because a subscriber queue was full'
+)
+
+class EmailOutboxCollector:
+    """Outbox depth, read from the database on each scrape."""
+    
+    def describe(self):
+        # Lets the collector be registered without running its queries
+        return []
+    
+    def collect(self):
+        depth = GaugeMetricFamily('email_outbox_messages', 'Queued emails by status', labels=['status'])
+        oldest = GaugeMetricFamily('email_outbox_oldest_pending_age_seconds',
+                                   'Age of the oldest email waiting to be sent')
+        db = get_read_session()
+        try:
+            counts = dict(db.query(EmailOutbox.status, func.count(EmailOutbox.id)).filter(
+                EmailOutbox.status != 'sent'
+            ).group_by(EmailOutbox.status).all())
+            oldest_created = db.query(func.min(EmailOutbox.created_at)).filter(
+                EmailOutbox.status.in_(('pending', 'sending'))
+            ).scalar()
+        finally:
+            db.close()
+        for status in ('pending', 'sending', 'failed', 'expired'):
+            depth.add_metric([status], counts.get(status, 0))
+        oldest.add_metric([], (datetime.utcnow() - oldest_created).total_seconds() if oldest_created else 0)
+        yield depth
+        yield oldest
+
+outbox_collector = EmailOutboxCollector()
+if not MULTIPROCESS:
+    REGISTRY.register(outbox_collector)
+
+class TimedSessionInterface(SessionInterface):
+    """Wraps the configured session interface to time its loads and saves."""
+    
+    def __init__(self, interface):
+        self.interface = interface
+    
+    def __getattr__(self, name):
+        return getattr(self.interface, name)
+    
+    def open_session(self, app, request):
+        with SESSION_STORE_LATENCY.labels('open').time():
+            return self.interface.open_session(app, request)
+    
+    def save_session(self, app, session, response):
+        with SESSION_STORE_LATENCY.labels('save').time():
+            return self.interface.save_session(app, session, response)
+    
+    def make_null_session(self, app):
+        return self.interface.make_null_session(app)
+    
+    def is_null_session(self, obj):
+        return self.interface.is_null_session(obj)
+
+def _instrument_pool(db_engine, name):
+    pool = db_engine.pool
+    do_get = pool._do_get
+    
+    # The pool has no event before a checkout, so time the call that waits
+    def timed_do_get():
+        started = time.perf_counter()
+        try:
+            return do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(name).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(name).observe(time.perf_counter() - started)
+    
+    pool._do_get = timed_do_get
+    in_use = POOL_CONNECTIONS_IN_USE.labels(name)
+    event.listen(pool, 'checkout', lambda *args: in_use.inc())
+    event.listen(pool, 'checkin', lambda *args: in_use.dec())
+
+_instrument_pool(engine, 'primary')
+if read_engine is not None:
+    _instrument_pool(read_engine, 'read')
+
+def _route():
+    return request.url_rule.rule if request.url_rule else '<unmatched>'
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = _route()
+    REQUESTS_IN_FLIGHT.labels(g.metrics_route).inc()
+
+def _record_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+def _finish_request(exception):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    route = g.pop('metrics_route')
+    REQUESTS_IN_FLIGHT.labels(route).dec()
+    # after_request does not run when a view raises
+    status = g.pop('metrics_status', 500)
+    REQUEST_LATENCY.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
+
+def metrics_endpoint():
+    """Prometheus text exposition for all workers."""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(outbox_collector)
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST,
+                    headers={'Cache-Control': 'no-store'})
+
+def init_metrics(app):
+    """Instrument the app's requests and session interface, and add /metrics."""
+    # Registered first so the timing covers the app's other before_request hooks
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+    app.session_interface = TimedSessionInterface(app.session_interface)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
@@ -2,7 +2,7 @@
 Database models using UUID-only design - no integer IDs.
 """
 
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Float, ForeignKey, Table, Enum, Integer
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Float, ForeignKey, Table, Enum, Integer, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -69,6 +69,13 @@ user_skills = Table('user_skills', Base.metadata,
 
 class Idea(Base):
     __tablename__ = 'ideas'
+    __table_args__ = (
+        Index('ix_ideas_status_date_submitted', 'status', 'date_submitted'),
+        Index('ix_ideas_benefactor_team_status', 'benefactor_team', 'status'),
+        Index('ix_ideas_email', 'email'),
+        Index('ix_ideas_date_submitted', 'date_submitted'),
+        Index('ix_ideas_assigned_to_email', 'assigned_to_email'),
+    )
     
     uuid = Column(String(36), primary_key=True, default=lambda: str(uuid_lib.uuid4()))
     title = Column(String(200), nullable=False)
@@ -116,6 +123,10 @@ class Skill(Base):
 
 class Claim(Base):
     __tablename__ = 'claims'
+    __table_args__ = (
+        Index('ix_claims_idea_uuid', 'idea_uuid'),
+        Index('ix_claims_claimer_email_claim_date', 'claimer_email', 'claim_date'),
+    )
     
     uuid = Column(String(36), primary_key=True, default=lambda: str(uuid_lib.uuid4()))
     idea_uuid = Column(String(36), ForeignKey('ideas.uuid'), nullable=False)
@@ -138,6 +149,10 @@ class Team(Base):
 
 class UserProfile(Base):
     __tablename__ = 'user_profiles'
+    __table_args__ = (
+        Index('ix_user_profiles_team_uuid', 'team_uuid'),
+        Index('ix_user_profiles_managed_team_uuid', 'managed_team_uuid'),
+    )
     
     email = Column(String(120), primary_key=True)
     name = Column(String(100), nullable=False)
@@ -170,6 +185,10 @@ class VerificationCode(Base):
 
 class ManagerRequest(Base):
     __tablename__ = 'manager_requests'
+    __table_args__ = (
+        Index('ix_manager_requests_user_email_status', 'user_email', 'status'),
+        Index('ix_manager_requests_status', 'status'),
+    )
     
     uuid = Column(String(36), primary_key=True, default=lambda: str(uuid_lib.uuid4()))
     user_email = Column(String(120), ForeignKey('user_profiles.email'), nullable=False)
@@ -185,6 +204,11 @@ class ManagerRequest(Base):
 
 class ClaimApproval(Base):
     __tablename__ = 'claim_approvals'
+    __table_args__ = (
+        Index('ix_claim_approvals_claimer_email_status', 'claimer_email', 'status'),
+        Index('ix_claim_approvals_idea_uuid_status', 'idea_uuid', 'status'),
+        Index('ix_claim_approvals_status', 'status'),
+    )
     
     uuid = Column(String(36), primary_key=True, default=lambda: str(uuid_lib.uuid4()))
     idea_uuid = Column(String(36), ForeignKey('ideas.uuid'), nullable=False)
@@ -223,6 +247,49 @@ class EmailSettings(Base):
     is_active = Column(Boolean, default=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class EmailOutbox(Base):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    # Autoincrement id keeps delivery roughly in enqueue order
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    subtype = Column(String(10), default='html')  # html or plain
+    status = Column(String(20), nullable=False, default='pending')  # pending, sending, sent, failed, expired
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    claimed_by = Column(String(64))
+    claimed_at = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    expires_at = Column(DateTime)  # Never delivered after this, e.g. verification codes
+
+class ImportJob(Base):
+    __tablename__ = 'import_jobs'
+    
+    uuid = Column(String(36), primary_key=True, default=lambda: str(uuid_lib.uuid4()))
+    kind = Column(String(20), nullable=False)  # ideas, users
+    filename = Column(String(255))
+    path = Column(String(500), nullable=False)  # Spooled upload
+    dry_run = Column(Boolean, default=False)
+    status = Column(String(20), nullable=False, default='queued', index=True)  # queued, running, complete, failed
+    total_rows = Column(Integer)
+    last_row = Column(Integer, nullable=False, default=1)  # Last CSV row committed (header is row 1)
+    imported_count = Column(Integer, nullable=False, default=0)
+    errors = Column(Text)  # JSON list of per-row messages
+    message = Column(Text)
+    created_by = Column(String(120))
+    claimed_by = Column(String(64))
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
 class Notification(Base):
     __tablename__ = 'notifications'
     
@@ -240,6 +307,31 @@ class Notification(Base):
     # Relationships
     idea = relationship('Idea', foreign_keys=[idea_uuid])
 
+class NotificationCounter(Base):
+    __tablename__ = 'notification_counters'
+    
+    user_email = Column(String(120), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class NotificationEvent(Base):
+    __tablename__ = 'notification_events'
+    
+    # Autoincrement id gives stream pollers a monotonic cursor
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_email = Column(String(120), nullable=False)
+    notification_uuid = Column(String(36), nullable=False)
+    kind = Column(String(20), nullable=False)  # created, read, unread, deleted
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ChangeEvent(Base):
+    __tablename__ = 'change_events'
+    
+    # Autoincrement id is the cursor /api/changes clients pass as since=
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    topic = Column(String(20), nullable=False)  # skills, teams, ideas, users
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
 class Bounty(Base):
     __tablename__ = 'bounties'
     
@@ -355,4 +447,45 @@ class IdeaStageData(Base):
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
     
     # Relationships
-    idea = relationship('Idea', back_populates='stage_data')
\ No newline at end of file
+    idea = relationship('Idea', back_populates='stage_data')
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_versions'
+    
+    name = Column(String(50), primary_key=True)  # e.g. 'indexes'
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SpendingRollup(Base):
+    __tablename__ = 'spending_rollup'
+    __table_args__ = (
+        UniqueConstraint('team', 'month', 'priority', 'size', 'idea_status', 'state', 'is_expensed',
+                         name='uq_spending_rollup_key'),
+        Index('ix_spending_rollup_team', 'team'),
+    )
+    
+    uuid = Column(String(36), primary_key=True, default=lambda: str(uuid_lib.uuid4()))
+    team = Column(String(100), nullable=False)  # Idea.benefactor_team
+    month = Column(String(7), nullable=False)  # YYYY-MM of Idea.date_submitted
+    priority = Column(Enum(PriorityLevel), nullable=False)
+    size = Column(Enum(IdeaSize), nullable=False)
+    idea_status = Column(Enum(IdeaStatus), nullable=False)
+    state = Column(String(20), nullable=False)  # approved, pending
+    is_expensed = Column(Boolean, nullable=False, default=False)
+    amount = Column(Float, nullable=False, default=0.0)
+    bounty_count = Column(Integer, nullable=False, default=0)
+
+class DataVersion(Base):
+    __tablename__ = 'data_versions'
+    
+    name = Column(String(64), primary_key=True)  # table name
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class StatsCacheEntry(Base):
+    __tablename__ = 'stats_cache'
+    
+    key = Column(String(50), primary_key=True)  # e.g. 'dashboard'
+    versions = Column(String(255), nullable=False)  # data versions the payload was computed at
+    payload = Column(Text, nullable=False)  # JSON
+    computed_at = Column(Float, nullable=False)  # Unix time
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Unread notification counters.
+
+notification_counters holds one unread count per recipient. The notification
+flush hook in notification_events.py adjusts it in the same transaction as
+every add, read, unread or delete, so the bell badge can be served without
+loading notification rows. reconcile_unread_counters() repairs any drift,
+e.g. from rows changed outside the ORM.
+
+Usage:
+    python notification_counters.py reconcile
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import func, insert, update
+from database import insert_on_conflict
+from models import Notification, NotificationCounter, SchemaVersion
+
+# Bump to force a reconcile on next startup when counting rules change
+COUNTER_VERSION = 1
+
+def apply_unread_deltas(connection, deltas):
+    """Add per-email deltas to the unread counters on the given connection."""
+    now = datetime.utcnow()
+    for user_email, delta in deltas.items():
+        if not delta:
+            continue
+        upsert = insert_on_conflict(connection.dialect.name, NotificationCounter)
+        if upsert is not None:
+            # Single statement, so concurrent first notifications cannot collide
+            connection.execute(upsert.values(
+                user_email=user_email,
+                unread_count=max(delta, 0),
+                updated_at=now
+            ).on_conflict_do_update(
+                index_elements=[NotificationCounter.user_email],
+                set_={'unread_count': NotificationCounter.unread_count + delta, 'updated_at': now}
+            ))
+            continue
+        
+        result = connection.execute(
+            update(NotificationCounter).where(
+                NotificationCounter.user_email == user_email
+            ).values(
+                unread_count=NotificationCounter.unread_count + delta,
+                updated_at=now
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(NotificationCounter).values(
+                user_email=user_email,
+                unread_count=max(delta, 0),
+                updated_at=now
+            ))
+
+def get_unread_count(db, emails):
+    """Total unread notifications addressed to any of the given emails."""
+    total = db.query(func.sum(NotificationCounter.unread_count)).filter(
+        NotificationCounter.user_email.in_(emails)
+    ).scalar() or 0
+    return max(total, 0)
+
+def reconcile_unread_counters(db):
+    """Recompute every counter from the notifications table. Returns fixes made."""
+    actual = dict(db.query(Notification.user_email, func.count(Notification.uuid)).filter(
+        Notification.is_read == False
+    ).group_by(Notification.user_email).all())
+    counters = {c.user_email: c for c in db.query(NotificationCounter).all()}
+    
+    fixed = 0
+    for user_email in set(actual) | set(counters):
+        expected = actual.get(user_email, 0)
+        counter = counters.get(user_email)
+        if counter is None:
+            db.add(NotificationCounter(user_email=user_email, unread_count=expected))
+            fixed += 1
+        elif counter.unread_count != expected:
+            counter.unread_count = expected
+            fixed += 1
+    
+    record = db.get(SchemaVersion, 'notification_counters')
+    if record is None:
+        db.add(SchemaVersion(name='notification_counters', version=COUNTER_VERSION))
+    else:
+        record.version = COUNTER_VERSION
+    db.commit()
+    return fixed
+
+def ensure_unread_counters():
+    """Populate the counters on first startup (or after COUNTER_VERSION changes)."""
+    from database import get_session
+    from sqlalchemy.exc import IntegrityError
+    
+    db = get_session()
+    try:
+        record = db.get(SchemaVersion, 'notification_counters')
+        if record and record.version >= COUNTER_VERSION:
+            return
+        fixed = reconcile_unread_counters(db)
+        print(f"Unread notification counters initialized ({fixed} users)")
+    except IntegrityError:
+        # Another worker initialized them first
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    from database import get_session, init_db
+    
+    command = sys.argv[1] if len(sys.argv) > 1 else 'reconcile'
+    if command != 'reconcile':
+        print(f"Unknown command '{command}'. Use 'reconcile'.")
+        sys.exit(2)
+    
+    init_db()
+    db = get_session()
+    try:
+        fixed = reconcile_unread_counters(db)
+        print(f"Reconciled unread notification counters ({fixed} corrected)")
+    finally:
+        db.close()
@@ -0,0 +1,247 @@
+"""
+Notification events.
+
+Every flush that adds, reads, unreads or deletes a Notification also writes a
+row to the notification_events change log and adjusts the recipient's unread
+counter, in the same transaction. Each worker process runs one background
+poller that reads new log rows and fans them out to that worker's Server-Sent
+Events subscribers. Because the log lives in the
+database, events committed by any gunicorn worker reach streams held by every
+other worker. Idle streams cost no queries: the poller does nothing while a
+worker has no subscribers, and otherwise issues one indexed query per interval
+for all of them.
+
+Log ids are assigned when a row is inserted, which on PostgreSQL is not the
+order transactions commit in: a lower id can become visible after the poller
+has read a higher one. Ids the poller skips over are kept as gaps and read
+again on each poll until their row appears or NOTIFICATION_EVENT_GAP_TIMEOUT
+passes (a rolled-back transaction never fills its gap).
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, inspect, insert, or_
+from config import Config
+from database import SessionLocal, get_session
+from models import Notification, NotificationEvent
+from notification_counters import apply_unread_deltas, get_unread_count
+from metrics import NOTIFICATION_EVENTS_DELIVERED, NOTIFICATION_EVENTS_DROPPED, NOTIFICATION_SUBSCRIBERS
+
+# Event batches are capped so a burst cannot stall the poller
+POLL_BATCH_SIZE = 500
+# Bound on tracked gaps; a larger jump in ids is not waited on
+MAX_EVENT_GAPS = 1000
+
+def _notification_changes(session):
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Notification):
+            changes.append((obj, 'created'))
+    for obj in session.dirty:
+        if isinstance(obj, Notification):
+            history = inspect(obj).attrs.is_read.history
+            if history.has_changes():
+                changes.append((obj, 'read' if obj.is_read else 'unread'))
+    for obj in session.deleted:
+        if isinstance(obj, Notification):
+            changes.append((obj, 'deleted'))
+    return changes
+
+def _unread_delta(notification, kind):
+    if kind in ('created', 'deleted'):
+        if notification.is_read is True:
+            return 0
+        return 1 if kind == 'created' else -1
+    return -1 if kind == 'read' else 1
+
+@event.listens_for(SessionLocal, 'after_flush')
+def record_notification_events(session, flush_context):
+    """Append notification changes in this flush to the change log and
+    adjust the per-user unread counters."""
+    changes = _notification_changes(session)
+    if not changes:
+        return
+    now = datetime.utcnow()
+    connection = session.connection()
+    connection.execute(insert(NotificationEvent), [{
+        'user_email': notification.user_email,
+        'notification_uuid': notification.uuid,
+        'kind': kind,
+        'created_at': now
+    } for notification, kind in changes])
+    
+    deltas = {}
+    for notification, kind in changes:
+        deltas[notification.user_email] = deltas.get(notification.user_email, 0) + _unread_delta(notification, kind)
+    apply_unread_deltas(connection, deltas)
+
+def serialize_event_notification(notification):
+    """Serialize a notification for a stream event."""
+    return {
+        'uuid': notification.uuid,
+        'type': notification.type,
+        'title': notification.title,
+        'message': notification.message,
+        'idea_uuid': notification.idea_uuid,
+        'related_user': notification.related_user_email,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.strftime('%Y-%m-%d %H:%M:%S') if notification.created_at else None
+    }
+
+class Subscription:
+    """A single stream's queue of events for a set of recipient emails."""
+    
+    def __init__(self, emails):
+        self.emails = tuple(sorted(set(emails)))
+        self.events = queue.Queue(maxsize=100)
+    
+    def put(self, event_data):
+        try:
+            self.events.put_nowait(event_data)
+            NOTIFICATION_EVENTS_DELIVERED.inc()
+        except queue.Full:
+            # A stalled client; drop events and let it resync on reconnect
+            NOTIFICATION_EVENTS_DROPPED.inc()
+    
+    def get(self, timeout):
+        return self.events.get(timeout=timeout)
+
+class NotificationBroker:
+    """Per-process fan-out of notification events to stream subscribers."""
+    
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or Config.NOTIFICATION_POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._last_event_id = None
+        self._gaps = {}  # skipped event id -> when it was skipped
+        self._last_prune = 0.0
+        self._thread = None
+    
+    def subscribe(self, emails):
+        """Register a stream for the given recipient emails.
+        
+        Returns None when this worker already holds NOTIFICATION_STREAM_LIMIT streams.
+        """
+        subscription = Subscription(emails)
+        with self._lock:
+            if len(self._subscriptions) >= Config.NOTIFICATION_STREAM_LIMIT:
+                return None
+            if not self._subscriptions:
+                # The poller stood still while nobody was subscribed; start
+                # from now rather than replaying what happened meanwhile
+                self._last_event_id = self._current_event_id()
+                self._gaps = {}
+            self._subscriptions.add(subscription)
+            NOTIFICATION_SUBSCRIBERS.inc()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='notification-broker', daemon=True)
+                self._thread.start()
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.discard(subscription)
+                NOTIFICATION_SUBSCRIBERS.dec()
+    
+    def _current_event_id(self):
+        db = get_session()
+        try:
+            return db.query(func.max(NotificationEvent.id)).scalar() or 0
+        finally:
+            db.close()
+    
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Notification broker poll failed: {e}")
+    
+    def poll(self):
+        """Deliver events committed since the last poll to local subscribers."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        if not subscriptions:
+            return
+        
+        unread = NotificationEvent.id > self._last_event_id
+        if self._gaps:
+            unread = or_(unread, NotificationEvent.id.in_(list(self._gaps)))
+        db = get_session()
+        try:
+            events = db.query(NotificationEvent).filter(unread).order_by(
+                NotificationEvent.id
+            ).limit(POLL_BATCH_SIZE).all()
+            self._advance([e.id for e in events])
+            if events:
+                self._dispatch(db, events, subscriptions)
+            self._prune(db)
+        finally:
+            db.close()
+    
+    def _advance(self, event_ids):
+        """Move past the (ascending) ids just read, keeping skipped ids as gaps."""
+        now = time.monotonic()
+        for event_id in event_ids:
+            self._gaps.pop(event_id, None)
+            if event_id > self._last_event_id:
+                skipped = range(self._last_event_id + 1, event_id)
+                if len(self._gaps) + len(skipped) <= MAX_EVENT_GAPS:
+                    self._gaps.update(dict.fromkeys(skipped, now))
+                self._last_event_id = event_id
+        self._gaps = {event_id: skipped_at for event_id, skipped_at in self._gaps.items()
+                      if now - skipped_at < Config.NOTIFICATION_EVENT_GAP_TIMEOUT}
+    
+    def _dispatch(self, db, events, subscriptions):
+        events_by_email = {}
+        for notification_event in events:
+            events_by_email.setdefault(notification_event.user_email, []).append(notification_event)
+        
+        interested = [s for s in subscriptions if any(email in events_by_email for email in s.emails)]
+        if not interested:
+            return
+        
+        # Load created rows once for all subscribers
+        interested_emails = {email for s in interested for email in s.emails}
+        created_uuids = [e.notification_uuid for e in events
+                         if e.kind == 'created' and e.user_email in interested_emails]
+        notifications = {}
+        if created_uuids:
+            notifications = {n.uuid: n for n in db.query(Notification).filter(
+                Notification.uuid.in_(created_uuids)
+            ).all()}
+        
+        unread_counts = {}
+        for subscription in interested:
+            if subscription.emails not in unread_counts:
+                unread_counts[subscription.emails] = get_unread_count(db, subscription.emails)
+            
+            for email in subscription.emails:
+                for notification_event in events_by_email.get(email, []):
+                    event_data = {
+                        'kind': notification_event.kind,
+                        'notification_uuid': notification_event.notification_uuid,
+                        'unread_count': unread_counts[subscription.emails]
+                    }
+                    notification = notifications.get(notification_event.notification_uuid)
+                    if notification_event.kind == 'created' and notification is not None:
+                        event_data['notification'] = serialize_event_notification(notification)
+                    subscription.put(event_data)
+    
+    def _prune(self, db):
+        now = time.monotonic()
+        if now - self._last_prune < Config.NOTIFICATION_EVENT_RETENTION:
+            return
+        self._last_prune = now
+        cutoff = datetime.utcnow() - timedelta(seconds=Config.NOTIFICATION_EVENT_RETENTION)
+        db.query(NotificationEvent).filter(
+            NotificationEvent.created_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+
+notification_broker = NotificationBroker()
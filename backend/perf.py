@@ -0,0 +1,194 @@
+"""
+Per-request SQL instrumentation.
+
+When PERF_INSTRUMENTATION is on, every request records how many statements
+it ran, the time spent in the database, its total time and its response
+size. Totals are kept per endpoint in this worker process, served as JSON
+from /api/admin/perf, and sent on each response as a Server-Timing header
+(visible in the browser's network panel). Statements slower than
+PERF_SLOW_QUERY_MS are printed and kept with the line of app code that ran
+them, and so is any statement a single request runs PERF_REPEAT_THRESHOLD
+times or more, which usually means an N+1 query loop.
+
+Nothing is hooked while PERF_INSTRUMENTATION is off.
+"""
+
+import os
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import Config
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Recent request durations kept per endpoint for percentiles
+DURATION_SAMPLES = 200
+SLOW_QUERY_LOG_SIZE = 50
+STATEMENT_PREVIEW = 300
+
+def _call_site():
+    """File:line and function of the innermost app frame outside this module."""
+    for frame in reversed(traceback.extract_stack()):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(APP_ROOT) and path != os.path.abspath(__file__) and 'site-packages' not in path:
+            return f"{os.path.relpath(path, APP_ROOT)}:{frame.lineno} in {frame.name}"
+    return None
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class EndpointStats:
+    """Running totals for one endpoint."""
+    
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.bytes = 0
+        self.durations = deque(maxlen=DURATION_SAMPLES)
+        self.repeated_statements = {}
+    
+    def add(self, queries, db_ms, total_ms, size, repeated):
+        self.requests += 1
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+        self.db_ms += db_ms
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, total_ms)
+        self.bytes += size
+        self.durations.append(total_ms)
+        for statement, (count, call_site) in repeated.items():
+            previous = self.repeated_statements.get(statement)
+            if previous is None or count > previous['max_per_request']:
+                self.repeated_statements[statement] = {'max_per_request': count, 'call_site': call_site}
+    
+    def report(self):
+        return {
+            'requests': self.requests,
+            'avg_queries': round(self.queries / self.requests, 1),
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(self.db_ms / self.requests, 2),
+            'avg_ms': round(self.total_ms / self.requests, 2),
+            'p95_ms': round(_percentile(self.durations, 0.95), 2),
+            'max_ms': round(self.max_ms, 2),
+            'avg_bytes': self.bytes // self.requests,
+            'repeated_statements': [
+                dict(statement=statement, **details) for statement, details in sorted(
+                    self.repeated_statements.items(), key=lambda item: -item[1]['max_per_request']
+                )
+            ]
+        }
+
+class PerfRecorder:
+    """Per-process endpoint totals and slow-query log."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self._started_at = time.time()
+    
+    def record_request(self, endpoint, queries, db_ms, total_ms, size, repeated):
+        with self._lock:
+            self._endpoints.setdefault(endpoint, EndpointStats()).add(queries, db_ms, total_ms, size, repeated)
+    
+    def record_slow_query(self, statement, duration_ms, call_site, endpoint):
+        entry = {
+            'statement': statement[:STATEMENT_PREVIEW],
+            'duration_ms': round(duration_ms, 2),
+            'call_site': call_site,
+            'endpoint': endpoint,
+            'at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+        print(f"Slow query ({duration_ms:.1f} ms) at {call_site} [{endpoint}]: {entry['statement']}")
+    
+    def report(self):
+        """Endpoint totals, slowest first, and the recent slow queries."""
+        with self._lock:
+            endpoints = {endpoint: stats.report() for endpoint, stats in self._endpoints.items()}
+            slow_queries = list(reversed(self._slow_queries))
+        return {
+            'pid': os.getpid(),
+            'since': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._started_at)),
+            'endpoints': dict(sorted(endpoints.items(), key=lambda item: -item[1]['avg_ms'] * item[1]['requests'])),
+            'slow_queries': slow_queries
+        }
+    
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._slow_queries.clear()
+            self._started_at = time.time()
+
+perf_recorder = PerfRecorder()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('perf_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - conn.info['perf_query_start'].pop()) * 1000
+    # Background threads (brokers, outbox, imports) run outside any request
+    in_request = has_request_context() and 'perf' in g
+    if in_request:
+        perf = g.perf
+        perf['queries'] += 1
+        perf['db_ms'] += duration_ms
+        count = perf['statements'][statement] = perf['statements'][statement] + 1
+        if count == Config.PERF_REPEAT_THRESHOLD:
+            perf['repeat_sites'][statement] = _call_site()
+    if duration_ms >= Config.PERF_SLOW_QUERY_MS:
+        perf_recorder.record_slow_query(statement, duration_ms, _call_site(),
+                                        request.endpoint if in_request else None)
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for failed statements
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('perf_query_start'):
+        connection.info['perf_query_start'].pop()
+
+def _start_request():
+    g.perf = {
+        'started': time.perf_counter(),
+        'queries': 0,
+        'db_ms': 0.0,
+        'statements': Counter(),
+        'repeat_sites': {}
+    }
+
+def _finish_request(response):
+    perf = g.pop('perf', None)
+    if perf is None:
+        return response
+    total_ms = (time.perf_counter() - perf['started']) * 1000
+    size = response.calculate_content_length() or 0
+    repeated = {
+        statement[:STATEMENT_PREVIEW]: (perf['statements'][statement], call_site)
+        for statement, call_site in perf['repeat_sites'].items()
+    }
+    perf_recorder.record_request(request.endpoint or '<unmatched>', perf['queries'], perf['db_ms'],
+                                 total_ms, size, repeated)
+    response.headers['Server-Timing'] = (
+        f'db;dur={perf["db_ms"]:.1f};desc="{perf["queries"]} queries", app;dur={total_ms:.1f}'
+    )
+    return response
+
+def init_perf(app):
+    """Install the instrumentation on the app and all engines if enabled."""
+    if not Config.PERF_INSTRUMENTATION:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    print(f"Performance instrumentation enabled (slow query threshold {Config.PERF_SLOW_QUERY_MS} ms)")
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Full-text idea search.
+
+Keeps an idea_search table with one row per idea holding its title,
+description, comment text and skill names, and an idea_search_docs table
+mapping each idea to its row. On SQLite idea_search is an FTS5 table ranked
+with bm25; on PostgreSQL it is a plain table with generated, weighted
+tsvector columns and GIN indexes, ranked with ts_rank_cd.
+
+Comments sit behind the idea tab access check, so internal comments are not
+indexed and the comments column is only matched, ranked and snippeted for
+ideas the caller has tab access to. Rows are rebuilt for
+the affected ideas in the same transaction as every flush that changes an
+idea's text or skills, a comment, or a skill name, and CSV imports reindex
+each chunk they write.
+
+Usage:
+    python search_index.py rebuild              # rebuild the index from the ideas table
+    python search_index.py benchmark [ideas]    # time searches over a scratch database
+"""
+
+import html
+import re
+import sys
+import weakref
+from sqlalchemy import (Column, Integer, MetaData, String, Table, Text, case, delete, event, func, inspect, literal_column,
+                        or_, select, text)
+from sqlalchemy.exc import IntegrityError, OperationalError
+from database import SessionLocal
+from models import Idea, IdeaComment, Skill, SchemaVersion, idea_skills
+
+# Bump to force a rebuild on next startup when the indexed content changes
+SEARCH_INDEX_VERSION = 2
+
+# Keep IN lists well below SQLite's bound-parameter limit
+REINDEX_CHUNK_SIZE = 500
+
+# Snippet highlight markers; replaced with <mark> after HTML-escaping
+MARK_START, MARK_END = '\x02', '\x03'
+
+# FTS5 column filter for the columns anyone may search
+PUBLIC_COLUMNS = '{title description skills}'
+
+# Index rows are keyed by an integer doc_id (the FTS5 rowid) so lookups by
+# idea stay on B-tree indexes; idea_search_docs maps ideas to their doc_id
+search_docs = Table(
+    'idea_search_docs', MetaData(),
+    Column('doc_id', Integer, primary_key=True),
+    Column('idea_uuid', String(36), nullable=False, unique=True)
+)
+
+search_table = Table(
+    'idea_search', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('title', Text),
+    Column('description', Text),
+    Column('comments', Text),
+    Column('skills', Text)
+)
+
+SCHEMA = {
+    'sqlite': [
+        "CREATE TABLE IF NOT EXISTS idea_search_docs ("
+        "doc_id INTEGER PRIMARY KEY, idea_uuid VARCHAR(36) NOT NULL UNIQUE)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS idea_search USING fts5("
+        "title, description, comments, skills, tokenize='porter unicode61', prefix='2 3')"
+    ],
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS idea_search_docs ("
+        "doc_id SERIAL PRIMARY KEY, idea_uuid VARCHAR(36) NOT NULL UNIQUE)",
+        # rowid is named to match the FTS5 table so queries are shared
+        "CREATE TABLE IF NOT EXISTS idea_search ("
+        "rowid INTEGER PRIMARY KEY, title TEXT, description TEXT, comments TEXT, skills TEXT, "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(skills, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED, "
+        "comments_document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(comments, '')), 'D')) STORED)",
+        "CREATE INDEX IF NOT EXISTS ix_idea_search_document ON idea_search USING GIN (document)",
+        "CREATE INDEX IF NOT EXISTS ix_idea_search_comments_document ON idea_search USING GIN (comments_document)"
+    ]
+}
+
+# Engines whose database is known to have the index
+_indexed_engines = weakref.WeakSet()
+
+def search_supported(dialect_name):
+    return dialect_name in SCHEMA
+
+def index_available(connection):
+    """True if the connection's database has the index.
+    
+    It may not: SQLite can be built without FTS5, and scratch databases
+    (benchmarks, tests) are created without it. Writes then skip indexing
+    rather than fail.
+    """
+    if connection.engine in _indexed_engines:
+        return True
+    if not search_supported(connection.dialect.name) or not inspect(connection).has_table('idea_search'):
+        return False
+    _indexed_engines.add(connection.engine)
+    return True
+
+def _text_agg(dialect_name, column):
+    if dialect_name == 'postgresql':
+        return func.string_agg(column, literal_column("' '"))
+    return func.group_concat(column, ' ')
+
+def reindex_ideas(connection, idea_uuids):
+    """Rebuild the index rows for the given ideas from their current state."""
+    dialect_name = connection.dialect.name
+    if not index_available(connection):
+        return
+    idea_uuids = list(idea_uuids)
+    comments = select(_text_agg(dialect_name, IdeaComment.content)).where(
+        IdeaComment.idea_uuid == Idea.uuid, IdeaComment.is_internal.is_not(True)
+    ).scalar_subquery()
+    skills = select(_text_agg(dialect_name, Skill.name)).select_from(
+        idea_skills.join(Skill, Skill.uuid == idea_skills.c.skill_uuid)
+    ).where(idea_skills.c.idea_uuid == Idea.uuid).scalar_subquery()
+    
+    for start in range(0, len(idea_uuids), REINDEX_CHUNK_SIZE):
+        chunk = idea_uuids[start:start + REINDEX_CHUNK_SIZE]
+        doc_ids = select(search_docs.c.doc_id).where(search_docs.c.idea_uuid.in_(chunk))
+        connection.execute(delete(search_table).where(search_table.c.rowid.in_(doc_ids)))
+        connection.execute(delete(search_docs).where(search_docs.c.idea_uuid.in_(chunk)))
+        connection.execute(search_docs.insert().from_select(
+            ['idea_uuid'], select(Idea.uuid).where(Idea.uuid.in_(chunk))
+        ))
+        connection.execute(search_table.insert().from_select(
+            ['rowid', 'title', 'description', 'comments', 'skills'],
+            select(search_docs.c.doc_id, Idea.title, Idea.description, comments, skills).join(
+                search_docs, search_docs.c.idea_uuid == Idea.uuid
+            ).where(Idea.uuid.in_(chunk))
+        ))
+
+def rebuild_search_index(db):
+    """Create the index if needed and repopulate it from every idea."""
+    connection = db.connection()
+    # Recreated so a new SEARCH_INDEX_VERSION can change its columns
+    connection.execute(text("DROP TABLE IF EXISTS idea_search"))
+    for statement in SCHEMA[connection.dialect.name]:
+        connection.execute(text(statement))
+    connection.execute(delete(search_docs))
+    reindex_ideas(connection, [uuid for (uuid,) in db.query(Idea.uuid).all()])
+    
+    record = db.get(SchemaVersion, 'search_index')
+    if record is None:
+        db.add(SchemaVersion(name='search_index', version=SEARCH_INDEX_VERSION))
+    else:
+        record.version = SEARCH_INDEX_VERSION
+    db.commit()
+
+def ensure_search_index():
+    """Build the index on first startup (or after SEARCH_INDEX_VERSION changes)."""
+    from database import get_session
+    
+    db = get_session()
+    try:
+        if not search_supported(db.get_bind().dialect.name):
+            return
+        record = db.get(SchemaVersion, 'search_index')
+        if record and record.version >= SEARCH_INDEX_VERSION and inspect(db.get_bind()).has_table('idea_search_docs'):
+            return
+        rebuild_search_index(db)
+        print(f"Search index rebuilt ({db.query(Idea).count()} ideas)")
+    except IntegrityError:
+        # Another worker rebuilt it first
+        db.rollback()
+    except OperationalError as e:
+        # e.g. SQLite built without FTS5; search stays unavailable
+        db.rollback()
+        print(f"Search index unavailable: {e}")
+    finally:
+        db.close()
+
+def match_terms(query_text):
+    """Split user input into search words; punctuation and operators are dropped."""
+    return re.findall(r'\w+', query_text.lower())[:20]
+
+def _match_expression(dialect_name, terms):
+    # Every word must match; the last one also matches as a prefix (search as you type)
+    if dialect_name == 'postgresql':
+        return ' & '.join(terms[:-1] + [terms[-1] + ':*'])
+    return ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+
+def search_ideas(query, dialect_name, terms, comment_access=None):
+    """Restrict an Idea query to matches for `terms`.
+    
+    comment_access says which ideas' comments may be matched and shown in
+    snippets: None for none, True for all, or a clause over Idea (see
+    access_control.idea_tab_access_filter). Other ideas match and are ranked
+    on their title, description and skills only.
+    
+    Returns (query, rank, snippet) where rank is a labelled column that orders
+    best matches first when sorted ascending (add it to the query before
+    ordering by it, so it is computed once per row) and snippet is a column
+    with the highlighted excerpt.
+    """
+    expression = _match_expression(dialect_name, terms)
+    query = query.join(search_docs, search_docs.c.idea_uuid == Idea.uuid).join(
+        search_table, search_table.c.rowid == search_docs.c.doc_id
+    )
+    if dialect_name == 'postgresql':
+        tsquery = func.to_tsquery('english', expression)
+        document = literal_column('idea_search.document')
+        comments_document = literal_column('idea_search.comments_document')
+        options = f'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=24, MinWords=8'
+        public_match = document.op('@@')(tsquery)
+        all_match = or_(public_match, comments_document.op('@@')(tsquery))
+        public_rank = -func.ts_rank_cd(document, tsquery)
+        all_rank = -func.ts_rank_cd(document.op('||')(comments_document), tsquery)
+        public_snippet = func.ts_headline(
+            'english', func.concat_ws(' ', search_table.c.title, search_table.c.description), tsquery, options
+        )
+        all_snippet = func.ts_headline(
+            'english',
+            func.concat_ws(' ', search_table.c.title, search_table.c.description, search_table.c.comments),
+            tsquery, options
+        )
+        row_public_match = public_match
+    else:
+        index = literal_column('idea_search')
+        public_expression = f'{PUBLIC_COLUMNS} : ({expression})'
+        public_match = index.op('MATCH')(public_expression)
+        all_match = index.op('MATCH')(expression)
+        # bm25 weights per column: title, description, comments, skills
+        public_rank = func.bm25(index, 10.0, 4.0, 0.0, 6.0)
+        all_rank = func.bm25(index, 10.0, 4.0, 1.0, 6.0)
+        # Under a column filter, snippet() only picks from the filtered columns
+        public_snippet = func.snippet(index, -1, MARK_START, MARK_END, '…', 16)
+        all_snippet = public_snippet
+        # FTS5 allows one MATCH per table reference, so when the outer query
+        # matches every column, public matches come from a second lookup
+        public_docs = select(search_table.c.rowid).where(public_match).correlate(None)
+        row_public_match = search_docs.c.doc_id.in_(public_docs)
+        if comment_access is not None and comment_access is not True:
+            public_snippet = select(func.snippet(index, -1, MARK_START, MARK_END, '…', 16)).select_from(
+                search_table
+            ).where(public_match, search_table.c.rowid == search_docs.c.doc_id).correlate(search_docs).scalar_subquery()
+    
+    if comment_access is None:
+        return query.filter(public_match), public_rank.label('rank'), public_snippet
+    if comment_access is True:
+        return query.filter(all_match), all_rank.label('rank'), all_snippet
+    return (
+        query.filter(all_match, or_(comment_access, row_public_match)),
+        case((comment_access, all_rank), else_=public_rank).label('rank'),
+        case((comment_access, all_snippet), else_=public_snippet)
+    )
+
+def render_snippet(snippet):
+    """HTML-escape a snippet and turn the match markers into <mark> tags."""
+    if not snippet:
+        return ''
+    return html.escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+def _changed(instance, *attributes):
+    state = inspect(instance)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def reindex_flushed_ideas(db, flush_context):
+    """Reindex ideas whose title, description, skills or comments changed in this flush."""
+    idea_uuids = set()
+    renamed_skills = []
+    for instance in list(db.new) + list(db.deleted):
+        if isinstance(instance, Idea):
+            idea_uuids.add(instance.uuid)
+        elif isinstance(instance, IdeaComment):
+            idea_uuids.add(instance.idea_uuid)
+    for instance in db.dirty:
+        if isinstance(instance, Idea) and _changed(instance, 'title', 'description', 'skills'):
+            idea_uuids.add(instance.uuid)
+        elif isinstance(instance, IdeaComment) and _changed(instance, 'content', 'is_internal'):
+            idea_uuids.add(instance.idea_uuid)
+        elif isinstance(instance, Skill) and _changed(instance, 'name'):
+            renamed_skills.append(instance.uuid)
+    if not idea_uuids and not renamed_skills:
+        return
+    
+    connection = db.connection()
+    if not index_available(connection):
+        return
+    if renamed_skills:
+        idea_uuids.update(connection.execute(
+            select(idea_skills.c.idea_uuid).where(idea_skills.c.skill_uuid.in_(renamed_skills))
+        ).scalars())
+    idea_uuids.discard(None)
+    reindex_ideas(connection, idea_uuids)
+
+def benchmark(ideas):
+    """Index `ideas` synthetic ideas into a scratch SQLite file and time searches."""
+    import csv
+    import io
+    import os
+    import tempfile
+    import time
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import Base
+    from models import Team
+    from csv_import import open_csv, import_ideas, generate_idea_rows, IDEA_REQUIRED_FIELDS
+    
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        db.add(Team(name='Benchmark Team', is_approved=True))
+        db.commit()
+        rebuild_search_index(db)
+        
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(next(generate_idea_rows(1, '')).keys()))
+        writer.writeheader()
+        words = ('billing', 'dashboard', 'export', 'onboarding', 'reporting', 'migration', 'audit', 'alerts')
+        for i, row in enumerate(generate_idea_rows(ideas, 'Benchmark Team')):
+            row['title'] = f'{words[i % 8].title()} {words[(i // 8) % 8]} tool {i}'
+            row['description'] = f'Automate {words[(i * 7) % 8]} and {words[(i * 3) % 8]} for team {i % 97}'
+            writer.writerow(row)
+        started = time.perf_counter()
+        import_ideas(db, open_csv(io.BytesIO(buffer.getvalue().encode('utf-8')), IDEA_REQUIRED_FIELDS))
+        print(f"Imported and indexed {ideas} ideas in {time.perf_counter() - started:.1f}s")
+        
+        for query_text in ('billing', 'dashboard export', 'audit alerts team 42', 'migr', 'nomatch'):
+            terms = match_terms(query_text)
+            query, rank, snippet = search_ideas(db.query(Idea.uuid), 'sqlite', terms)
+            runs = 20
+            started = time.perf_counter()
+            for _ in range(runs):
+                results = query.add_columns(rank, snippet).order_by(rank).limit(20).all()
+            elapsed = (time.perf_counter() - started) / runs * 1000
+            total = search_ideas(db.query(func.count(Idea.uuid)), 'sqlite', terms)[0].scalar()
+            print(f"{query_text!r:>24}: {elapsed:6.2f} ms for top 20 of {total} matches")
+        db.close()
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'rebuild'
+    if command == 'rebuild':
+        from database import get_session, init_db
+        init_db()
+        db = get_session()
+        try:
+            rebuild_search_index(db)
+            print(f"Search index rebuilt ({db.query(Idea).count()} ideas)")
+        finally:
+            db.close()
+    elif command == 'benchmark':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
+    else:
+        print(f"Unknown command '{command}'. Use 'rebuild' or 'benchmark'.")
+        sys.exit(2)
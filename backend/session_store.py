@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed server-side sessions.
+
+Replaces Flask-Session's filesystem backend (one pickle file per session) with
+a single SQLite table keyed by session id. Session data is stored as Flask's
+tagged JSON rather than pickle, each row carries its expiry time, and expired
+rows are swept in one DELETE at most every SESSION_SWEEP_INTERVAL seconds.
+A request whose session data is unchanged does not write at all unless its
+expiry is more than SESSION_REFRESH_INTERVAL seconds old, so re-setting the
+same values (as update_session_from_db does) costs a read and nothing else.
+
+Set SESSION_TYPE to any Flask-Session backend (e.g. 'filesystem') to use that
+instead.
+
+Usage:
+    python session_store.py sweep                  # delete expired sessions
+    python session_store.py benchmark [requests]   # compare with the filesystem backend
+"""
+
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface
+from flask_session.sessions import ServerSideSession
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    sid TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at);
+"""
+
+class SqliteSession(ServerSideSession):
+    """Server-side session that remembers what was loaded, to skip no-op writes."""
+    
+    def __init__(self, initial=None, sid=None, permanent=None, payload=None, expires_at=None):
+        super().__init__(initial, sid=sid, permanent=permanent)
+        self.loaded_payload = payload
+        self.loaded_expires_at = expires_at
+
+class SqliteSessionInterface(SessionInterface):
+    """Flask session interface storing sessions in a SQLite file."""
+    
+    session_class = SqliteSession
+    serializer = TaggedJSONSerializer()
+    
+    def __init__(self, path=None, refresh_interval=None, sweep_interval=None):
+        self.path = path or Config.SESSION_SQLITE_PATH
+        self.refresh_interval = Config.SESSION_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.sweep_interval = Config.SESSION_SWEEP_INTERVAL if sweep_interval is None else sweep_interval
+        self._local = threading.local()
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+    
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+    
+    def _connection(self):
+        # One connection per thread; gthread workers serve requests from many threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+    
+    def _lifetime(self, app):
+        return app.permanent_session_lifetime.total_seconds()
+    
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            row = self._connection().execute(
+                'SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at > ?', (sid, time.time())
+            ).fetchone()
+            if row is not None:
+                try:
+                    data = self.serializer.loads(row[0])
+                except ValueError:
+                    data = None
+                if data is not None:
+                    return self.session_class(data, sid=sid, payload=row[0], expires_at=row[1])
+        return self.session_class(sid=secrets.token_urlsafe(32), permanent=Config.SESSION_PERMANENT)
+    
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        now = time.time()
+        self._maybe_sweep(now)
+        
+        if not session:
+            if session.modified or session.loaded_payload is not None:
+                self._connection().execute('DELETE FROM sessions WHERE sid = ?', (session.sid,))
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        
+        payload = self.serializer.dumps(dict(session))
+        expires_at = now + self._lifetime(app)
+        if payload == session.loaded_payload and expires_at - session.loaded_expires_at < self.refresh_interval:
+            return
+        
+        self._connection().execute(
+            'INSERT INTO sessions (sid, data, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (sid) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at',
+            (session.sid, payload, expires_at)
+        )
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=datetime.fromtimestamp(expires_at, timezone.utc) if session.permanent else None,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+    
+    def _maybe_sweep(self, now):
+        if now < self._next_sweep or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sweep = now + self.sweep_interval
+            self.sweep(now)
+        finally:
+            self._sweep_lock.release()
+    
+    def sweep(self, now=None):
+        """Delete expired sessions. Returns the number removed."""
+        cursor = self._connection().execute('DELETE FROM sessions WHERE expires_at <= ?', (now or time.time(),))
+        return cursor.rowcount
+
+def init_sessions(app):
+    """Install the configured session backend on the app."""
+    if app.config.get('SESSION_TYPE') == 'sqlite':
+        app.session_interface = SqliteSessionInterface()
+    else:
+        from flask_session import Session
+        Session(app)
+
+def benchmark(requests):
+    """Time requests through the filesystem and SQLite session backends."""
+    import shutil
+    import tempfile
+    from flask import Flask, session
+    
+    profile = {
+        'user_email': 'user@example.com',
+        'user_name': 'Benchmark User',
+        'user_role': 'developer',
+        'user_team': 'Benchmark Team',
+        'user_team_uuid': '2f1b6c1e-7d0a-4c55-9a34-3f1f4c6a9b10',
+        'user_managed_team': None,
+        'user_managed_team_uuid': None,
+        'user_verified': True,
+        'user_skills': [f'Skill {i}' for i in range(8)],
+        'pending_manager_request': False,
+        'pending_team': None
+    }
+    
+    def make_app(backend, scratch):
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        app.config['SESSION_TYPE'] = backend
+        app.config['SESSION_FILE_DIR'] = os.path.join(scratch, 'flask_session')
+        
+        @app.route('/login')
+        def login():
+            session.update(profile)
+            session.permanent = True
+            return ''
+        
+        @app.route('/read')
+        def read():
+            return session.get('user_email', '')
+        
+        @app.route('/refresh')
+        def refresh():
+            # What update_session_from_db does: re-set every field to the same value
+            session.update(profile)
+            return ''
+        
+        if backend == 'sqlite':
+            app.session_interface = SqliteSessionInterface(os.path.join(scratch, 'sessions.db'))
+        else:
+            init_sessions(app)
+        return app
+    
+    scratch = tempfile.mkdtemp()
+    try:
+        results = {}
+        for backend in ('filesystem', 'sqlite', 'null'):
+            app = make_app(backend, scratch) if backend != 'null' else Flask(__name__)
+            if backend == 'null':
+                app.secret_key = Config.SECRET_KEY
+                app.add_url_rule('/login', 'login', lambda: '')
+                app.add_url_rule('/read', 'read', lambda: '')
+                app.add_url_rule('/refresh', 'refresh', lambda: '')
+            client = app.test_client()
+            # Many live sessions, as in production, then time one user's requests
+            for _ in range(min(requests, 2000)):
+                app.test_client().get('/login')
+            client.get('/login')
+            for route in ('read', 'refresh'):
+                started = time.perf_counter()
+                for _ in range(requests):
+                    client.get(f'/{route}')
+                results[(backend, route)] = (time.perf_counter() - started) / requests * 1e6
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    
+    for route in ('read', 'refresh'):
+        base = results[('null', route)]
+        for backend in ('filesystem', 'sqlite'):
+            print(f"{route:>8} {backend:>10}: {results[(backend, route)] - base:7.0f} us session overhead per request")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'sweep'
+    if command == 'sweep':
+        print(f"Removed {SqliteSessionInterface().sweep()} expired sessions")
+    elif command == 'benchmark':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
+    else:
+        print(f"Unknown command '{command}'. Use 'sweep' or 'benchmark'.")
+        sys.exit(2)
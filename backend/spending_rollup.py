@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Spending rollup.
+
+Maintains the spending_rollup table: approved and pending monetary bounty
+totals keyed by (team, month, priority, size, idea status, state, expensed).
+Write paths take a snapshot of an idea's contribution before changing the idea
+or its bounty and record the delta afterwards, so dashboard spending reads are
+indexed lookups instead of SUMs over bounties joined to ideas.
+
+Usage:
+    python spending_rollup.py rebuild   # recompute the table from bounties
+    python spending_rollup.py check     # report rows that disagree with bounties
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import func
+from database import insert_on_conflict
+from models import Idea, Bounty, IdeaStatus, SpendingRollup, SchemaVersion
+
+# Bump to force a rebuild on next startup when the rollup definition changes
+ROLLUP_VERSION = 1
+
+KEY_COLUMNS = ('team', 'month', 'priority', 'size', 'idea_status', 'state', 'is_expensed')
+
+def month_key(value):
+    """Return the YYYY-MM bucket for a datetime."""
+    return (value or datetime.utcnow()).strftime('%Y-%m')
+
+def recent_months(count=6, now=None):
+    """Return [(YYYY-MM, 'Month YYYY')] for the last `count` calendar months, oldest first."""
+    now = now or datetime.utcnow()
+    months = []
+    year, month = now.year, now.month
+    for _ in range(count):
+        first_day = datetime(year, month, 1)
+        months.append((first_day.strftime('%Y-%m'), first_day.strftime('%B %Y')))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return list(reversed(months))
+
+def _entry(idea, bounty):
+    """Return (key, amount) for the rollup row a bounty contributes to, or None."""
+    if idea is None or bounty is None or not bounty.is_monetary:
+        return None
+    
+    if bounty.is_approved is True:
+        state = 'approved'
+        is_expensed = bool(bounty.is_expensed)
+    elif bounty.requires_approval:
+        state = 'pending'
+        is_expensed = False
+    else:
+        return None
+    
+    key = (
+        idea.benefactor_team,
+        month_key(idea.date_submitted),
+        idea.priority,
+        idea.size,
+        idea.status or IdeaStatus.open,
+        state,
+        is_expensed
+    )
+    return key, bounty.amount or 0.0
+
+def spending_snapshot(db, idea):
+    """Capture the rollup entry an idea currently contributes, before changing it."""
+    if idea is None:
+        return None
+    bounty = db.query(Bounty).filter_by(idea_uuid=idea.uuid).first()
+    return _entry(idea, bounty)
+
+def _apply(db, key, amount, count):
+    key_filter = dict(zip(KEY_COLUMNS, key))
+    upsert = insert_on_conflict(db.get_bind().dialect.name, SpendingRollup)
+    if upsert is not None and count > 0:
+        # Single statement, so concurrent writers cannot both create the row
+        db.execute(upsert.values(amount=amount, bounty_count=count, **key_filter).on_conflict_do_update(
+            index_elements=[getattr(SpendingRollup, column) for column in KEY_COLUMNS],
+            set_={
+                'amount': SpendingRollup.amount + amount,
+                'bounty_count': SpendingRollup.bounty_count + count
+            }
+        ))
+        return
+    
+    updated = db.query(SpendingRollup).filter_by(**key_filter).update({
+        SpendingRollup.amount: SpendingRollup.amount + amount,
+        SpendingRollup.bounty_count: SpendingRollup.bounty_count + count
+    }, synchronize_session=False)
+    
+    if not updated:
+        db.add(SpendingRollup(amount=amount, bounty_count=count, **key_filter))
+        # Flush so a later delta for the same key in this transaction updates it
+        db.flush()
+    elif count < 0:
+        db.query(SpendingRollup).filter_by(**key_filter).filter(
+            SpendingRollup.bounty_count <= 0
+        ).delete(synchronize_session=False)
+
+def record_spending_change(db, before, idea=None):
+    """Apply the rollup delta between a snapshot and the idea's current state.
+    
+    Pass idea=None when the idea (and its bounty) is being deleted. Flushes
+    the session first so new or deleted bounties are visible.
+    """
+    db.flush()
+    after = spending_snapshot(db, idea)
+    if before == after:
+        return
+    if before is not None:
+        _apply(db, before[0], -before[1], -1)
+    if after is not None:
+        _apply(db, after[0], after[1], 1)
+
+def record_new_bounties(db, pairs):
+    """Add rollup totals for bounties inserted outside the ORM.
+
+    `pairs` is an iterable of (idea, bounty) objects exposing the model
+    attributes; deltas are summed so each rollup key is updated once.
+    """
+    totals = {}
+    for idea, bounty in pairs:
+        entry = _entry(idea, bounty)
+        if entry is None:
+            continue
+        key, amount = entry
+        total_amount, total_count = totals.get(key, (0.0, 0))
+        totals[key] = (total_amount + amount, total_count + 1)
+    for key, (amount, count) in totals.items():
+        _apply(db, key, amount, count)
+
+def _expected_totals(db):
+    """Compute rollup totals directly from bounties and ideas."""
+    rows = db.query(Idea, Bounty).join(Bounty, Bounty.idea_uuid == Idea.uuid).filter(
+        Bounty.is_monetary == True
+    ).all()
+    totals = {}
+    for idea, bounty in rows:
+        entry = _entry(idea, bounty)
+        if entry is None:
+            continue
+        key, amount = entry
+        total_amount, total_count = totals.get(key, (0.0, 0))
+        totals[key] = (total_amount + amount, total_count + 1)
+    return totals
+
+def rebuild_spending_rollup(db):
+    """Replace the rollup table contents with totals recomputed from bounties."""
+    totals = _expected_totals(db)
+    db.query(SpendingRollup).delete(synchronize_session=False)
+    for key, (amount, count) in totals.items():
+        db.add(SpendingRollup(amount=amount, bounty_count=count, **dict(zip(KEY_COLUMNS, key))))
+    
+    record = db.get(SchemaVersion, 'spending_rollup')
+    if record is None:
+        db.add(SchemaVersion(name='spending_rollup', version=ROLLUP_VERSION))
+    else:
+        record.version = ROLLUP_VERSION
+    db.commit()
+    return len(totals)
+
+def check_spending_rollup(db, tolerance=0.005):
+    """Return a list of (key, expected, actual) rows where the rollup is wrong."""
+    expected = _expected_totals(db)
+    actual = {
+        tuple(getattr(row, column) for column in KEY_COLUMNS): (row.amount, row.bounty_count)
+        for row in db.query(SpendingRollup).all()
+    }
+    
+    mismatches = []
+    for key in set(expected) | set(actual):
+        expected_amount, expected_count = expected.get(key, (0.0, 0))
+        actual_amount, actual_count = actual.get(key, (0.0, 0))
+        if expected_count != actual_count or abs(expected_amount - actual_amount) > tolerance:
+            mismatches.append((key, expected.get(key), actual.get(key)))
+    return mismatches
+
+def ensure_spending_rollup():
+    """Build the rollup on first startup (or after ROLLUP_VERSION changes)."""
+    from database import get_session
+    from sqlalchemy.exc import IntegrityError
+    
+    db = get_session()
+    try:
+        record = db.get(SchemaVersion, 'spending_rollup')
+        if record and record.version >= ROLLUP_VERSION:
+            return
+        rows = rebuild_spending_rollup(db)
+        print(f"Spending rollup rebuilt ({rows} rows)")
+    except IntegrityError:
+        # Another worker rebuilt it first
+        db.rollback()
+    finally:
+        db.close()
+
+def _round(amount):
+    return round(float(amount or 0), 2)
+
+def get_team_spending(db, team_name):
+    """Spending totals, breakdowns and the 6-month trend for a benefactor team."""
+    rows = db.query(SpendingRollup).filter(SpendingRollup.team == team_name).all()
+    months = recent_months()
+    monthly = {key: 0.0 for key, _ in months}
+    
+    totals = {'approved': 0.0, 'expensed': 0.0, 'pending': 0.0, 'actual': 0.0, 'committed': 0.0}
+    spending_by_priority = {}
+    spending_by_size = {}
+    for row in rows:
+        if row.state == 'pending':
+            totals['pending'] += row.amount
+            continue
+        
+        totals['approved'] += row.amount
+        if row.is_expensed:
+            totals['expensed'] += row.amount
+        if row.idea_status == IdeaStatus.complete:
+            totals['actual'] += row.amount
+        elif row.idea_status == IdeaStatus.claimed:
+            totals['committed'] += row.amount
+        spending_by_priority[row.priority.value] = spending_by_priority.get(row.priority.value, 0.0) + row.amount
+        spending_by_size[row.size.value] = spending_by_size.get(row.size.value, 0.0) + row.amount
+        if row.month in monthly:
+            monthly[row.month] += row.amount
+    
+    return {
+        'total_approved_spend': _round(totals['approved']),
+        'total_expensed': _round(totals['expensed']),
+        'pending_approval_spend': _round(totals['pending']),
+        'actual_spend': _round(totals['actual']),
+        'committed_spend': _round(totals['committed']),
+        'spending_by_priority': {key: _round(value) for key, value in spending_by_priority.items()},
+        'spending_by_size': {key: _round(value) for key, value in spending_by_size.items()},
+        'monthly_spending': [{'month': label, 'amount': _round(monthly[key])} for key, label in months]
+    }
+
+def get_org_spending(db, top_teams=10):
+    """Organization-wide spending totals and the top spending teams."""
+    totals = {'approved': 0.0, 'expensed': 0.0, 'pending': 0.0, 'actual': 0.0, 'committed': 0.0}
+    grouped = db.query(
+        SpendingRollup.state, SpendingRollup.idea_status, SpendingRollup.is_expensed,
+        func.sum(SpendingRollup.amount)
+    ).group_by(
+        SpendingRollup.state, SpendingRollup.idea_status, SpendingRollup.is_expensed
+    ).all()
+    
+    for state, idea_status, is_expensed, amount in grouped:
+        amount = amount or 0.0
+        if state == 'pending':
+            totals['pending'] += amount
+            continue
+        totals['approved'] += amount
+        if is_expensed:
+            totals['expensed'] += amount
+        if idea_status == IdeaStatus.complete:
+            totals['actual'] += amount
+        elif idea_status == IdeaStatus.claimed:
+            totals['committed'] += amount
+    
+    top_teams_query = db.query(
+        SpendingRollup.team, func.sum(SpendingRollup.amount)
+    ).filter(
+        SpendingRollup.state == 'approved'
+    ).group_by(SpendingRollup.team).order_by(
+        func.sum(SpendingRollup.amount).desc()
+    ).limit(top_teams).all()
+    
+    return {
+        'total_approved_spend': _round(totals['approved']),
+        'total_expensed': _round(totals['expensed']),
+        'pending_approval_spend': _round(totals['pending']),
+        'actual_spend': _round(totals['actual']),
+        'committed_spend': _round(totals['committed']),
+        'top_spending_teams': [{'team': team, 'total_spend': _round(total)} for team, total in top_teams_query]
+    }
+
+if __name__ == "__main__":
+    from database import get_session, init_db
+    
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    init_db()
+    db = get_session()
+    try:
+        if command == 'rebuild':
+            rows = rebuild_spending_rollup(db)
+            print(f"Spending rollup rebuilt ({rows} rows)")
+        elif command == 'check':
+            mismatches = check_spending_rollup(db)
+            if not mismatches:
+                print("Spending rollup is consistent")
+            else:
+                for key, expected, actual in mismatches:
+                    print(f"Mismatch {dict(zip(KEY_COLUMNS, key))}: expected {expected}, found {actual}")
+                print(f"{len(mismatches)} inconsistent rollup rows; run 'python spending_rollup.py rebuild'")
+                sys.exit(1)
+        else:
+            print(f"Unknown command '{command}'. Use 'rebuild' or 'check'.")
+            sys.exit(2)
+    finally:
+        db.close()
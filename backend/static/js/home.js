@@ -2,14 +2,32 @@
 
 (function() {
     // Elements
+    const searchInput = document.getElementById('search-input');
     const skillFilter = document.getElementById('skill-filter');
     const priorityFilter = document.getElementById('priority-filter');
     const statusFilter = document.getElementById('status-filter');
     const sortBy = document.getElementById('sort-by');
     const ideasContainer = document.getElementById('ideas-container');
     
+    // Ideas are fetched a page at a time; only the fields the cards render
+    const PAGE_SIZE = 20;
+    const CARD_FIELDS = [
+        'uuid', 'title', 'description', 'submitter_name', 'benefactor_team',
+        'priority', 'size', 'status', 'bounty', 'bounty_details', 'needed_by',
+        'date_submitted', 'skills', 'claims'
+    ].join(',');
+    
     // State
     let currentIdeas = [];
+    let nextCursor = null;
+    let hasMore = false;
+    let isLoadingPage = false;
+    let loadGeneration = 0;
+    
+    // Sentinel below the grid that triggers loading the next page
+    const scrollSentinel = document.createElement('div');
+    scrollSentinel.className = 'ideas-scroll-sentinel';
+    ideasContainer.insertAdjacentElement('afterend', scrollSentinel);
     
     // Initialize
     async function init() {
@@ -17,13 +35,26 @@
         await loadIdeas();
         
         // Add event listeners
-        skillFilter.addEventListener('change', loadIdeas);
-        priorityFilter.addEventListener('change', loadIdeas);
-        statusFilter.addEventListener('change', loadIdeas);
-        sortBy.addEventListener('change', loadIdeas);
+        searchInput.addEventListener('input', utils.debounce(() => loadIdeas(), 250));
+        skillFilter.addEventListener('change', () => loadIdeas());
+        priorityFilter.addEventListener('change', () => loadIdeas());
+        statusFilter.addEventListener('change', () => loadIdeas());
+        sortBy.addEventListener('change', () => loadIdeas());
+        
+        // Load the next page as the user nears the end of the list
+        if ('IntersectionObserver' in window) {
+            const observer = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    loadNextPage();
+                }
+            }, { rootMargin: '400px' });
+            observer.observe(scrollSentinel);
+        } else {
+            window.addEventListener('scroll', loadIfNearEnd);
+        }
         
         // Auto-refresh every 30 seconds
-        setInterval(loadIdeas, 30000);
+        setInterval(() => loadIdeas({ refresh: true }), 30000);
     }
     
     // Load skills for filter
@@ -42,20 +73,57 @@
         }
     }
     
-    // Load and display ideas
-    async function loadIdeas() {
+    // Fetch one page of ideas for the current filters. Searches are ordered by
+    // relevance and paged by offset, which is carried in the cursor.
+    async function fetchPage(cursor) {
+        const params = new URLSearchParams({
+            skill: skillFilter.value,
+            priority: priorityFilter.value,
+            status: statusFilter.value,
+            limit: PAGE_SIZE,
+            fields: CARD_FIELDS
+        });
+        const searchText = searchInput.value.trim();
+        if (searchText) {
+            params.set('q', searchText);
+            params.set('offset', cursor || 0);
+            const page = await utils.fetchJson(`/api/ideas/search?${params}`);
+            page.next_cursor = page.has_more ? page.offset + page.ideas.length : null;
+            return page;
+        }
+        params.set('sort', sortBy.value);
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        return utils.fetchJson(`/api/ideas?${params}`);
+    }
+    
+    // Load and display ideas from the first page. A refresh re-fetches as many
+    // pages as are already shown so the user's scroll position is kept.
+    async function loadIdeas(options = {}) {
+        const generation = ++loadGeneration;
+        const targetCount = options.refresh ? Math.max(currentIdeas.length, PAGE_SIZE) : PAGE_SIZE;
+        
         try {
-            const params = new URLSearchParams({
-                skill: skillFilter.value,
-                priority: priorityFilter.value,
-                status: statusFilter.value,
-                sort: sortBy.value
-            });
+            if (!options.refresh) {
+                ideasContainer.innerHTML = '<div class="loading">Loading ideas...</div>';
+            }
+            
+            isLoadingPage = true;
+            let ideas = [];
+            let page = await fetchPage(null);
+            ideas = ideas.concat(page.ideas);
+            while (page.has_more && ideas.length < targetCount) {
+                page = await fetchPage(page.next_cursor);
+                ideas = ideas.concat(page.ideas);
+            }
             
-            ideasContainer.innerHTML = '<div class="loading">Loading ideas...</div>';
+            // A newer load (filter change) superseded this one
+            if (generation !== loadGeneration) return;
             
-            const ideas = await utils.fetchJson(`/api/ideas?${params}`);
             currentIdeas = ideas;
+            nextCursor = page.next_cursor;
+            hasMore = page.has_more;
             
             if (ideas.length === 0) {
                 ideasContainer.innerHTML = `
@@ -68,9 +136,49 @@
             }
             
             ideasContainer.innerHTML = ideas.map(idea => createIdeaCard(idea)).join('');
+            isLoadingPage = false;
+            loadIfNearEnd();
         } catch (error) {
+            if (generation !== loadGeneration) return;
             console.error('Error loading ideas:', error);
             ideasContainer.innerHTML = '<div class="error">Error loading ideas. Please try again.</div>';
+        } finally {
+            if (generation === loadGeneration) {
+                isLoadingPage = false;
+            }
+        }
+    }
+    
+    // The observer only fires on changes, so re-check after each render in
+    // case the page is still short enough to show the sentinel
+    function loadIfNearEnd() {
+        if (scrollSentinel.getBoundingClientRect().top < window.innerHeight + 400) {
+            loadNextPage();
+        }
+    }
+    
+    // Append the next page of ideas to the grid
+    async function loadNextPage() {
+        if (!hasMore || isLoadingPage) return;
+        
+        const generation = loadGeneration;
+        isLoadingPage = true;
+        try {
+            const page = await fetchPage(nextCursor);
+            if (generation !== loadGeneration) return;
+            
+            currentIdeas = currentIdeas.concat(page.ideas);
+            nextCursor = page.next_cursor;
+            hasMore = page.has_more;
+            ideasContainer.insertAdjacentHTML('beforeend', page.ideas.map(idea => createIdeaCard(idea)).join(''));
+            isLoadingPage = false;
+            loadIfNearEnd();
+        } catch (error) {
+            console.error('Error loading more ideas:', error);
+        } finally {
+            if (generation === loadGeneration) {
+                isLoadingPage = false;
+            }
         }
     }
     
@@ -127,11 +235,14 @@
             ? `<div class="claim-info">Claimed by ${utils.escapeHtml(idea.claims[0].name)}</div>`
             : '';
         
-        // Create full description for tooltip
+        // Create full description for tooltip; search results show the
+        // server-escaped match snippet instead
         const fullDescription = utils.escapeHtml(idea.description);
-        const truncatedDescription = idea.description.length > 150 
-            ? utils.escapeHtml(idea.description.substring(0, 150)) + '...'
-            : fullDescription;
+        const truncatedDescription = idea.snippet
+            ? idea.snippet
+            : idea.description.length > 150 
+                ? utils.escapeHtml(idea.description.substring(0, 150)) + '...'
+                : fullDescription;
         
         return `
             <div class="idea-card" onclick="window.location.href='/idea/${utils.getUuid(idea)}'">
@@ -147,7 +258,7 @@
                 
                 ${skillsHtml ? `<div class="skills-tags">${skillsHtml}</div>` : ''}
                 
-                <p class="idea-description" ${idea.description.length > 150 ? `title="${fullDescription}"` : ''}>
+                <p class="idea-description" ${idea.description.length > 150 || idea.snippet ? `title="${fullDescription}"` : ''}>
                     ${truncatedDescription}
                 </p>
                 
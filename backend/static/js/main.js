@@ -66,18 +66,35 @@ const utils = {
         };
     },
     
-    // Fetch with error handling
+    // Last ETag and body per GET URL, so polls can be answered with 304
+    etagCache: new Map(),
+    
+    // Fetch with error handling. GETs send If-None-Match and reuse the cached
+    // body when the server answers 304 Not Modified.
     fetchJson: async function(url, options = {}) {
         try {
+            const isGet = !options.method || options.method.toUpperCase() === 'GET';
+            const cached = isGet ? utils.etagCache.get(url) : null;
             const response = await fetch(url, {
                 ...options,
                 headers: {
                     'Content-Type': 'application/json',
+                    ...(cached ? { 'If-None-Match': cached.etag } : {}),
                     ...options.headers
                 }
             });
             
-            const data = await response.json();
+            if (response.status === 304 && cached) {
+                // Parse a fresh copy so callers can't mutate the cached body
+                return JSON.parse(cached.body);
+            }
+            
+            const body = await response.text();
+            const data = JSON.parse(body);
+            const etag = response.headers.get('ETag');
+            if (isGet && response.ok && etag) {
+                utils.etagCache.set(url, { etag, body });
+            }
             
             if (!response.ok) {
                 throw new Error(data.message || 'Request failed');
@@ -88,6 +105,33 @@ const utils = {
             console.error('Fetch error:', error);
             throw error;
         }
+    },
+    
+    // Long-poll /api/changes and call onChange(changedTopics) whenever one of
+    // the topics changes. Each request waits server-side until something
+    // changes or times out, so an idle page makes about two requests a minute.
+    watchChanges: async function(topics, onChange) {
+        let since = null;
+        while (true) {
+            try {
+                const params = new URLSearchParams({ topics: topics.join(',') });
+                if (since !== null) {
+                    params.set('since', since);
+                }
+                const data = await utils.fetchJson(`/api/changes?${params}`);
+                since = data.version;
+                if (data.changes.length > 0) {
+                    onChange(data.changes);
+                }
+                if (data.retry_after) {
+                    // The server is holding as many long-polls as it allows
+                    await new Promise(resolve => setTimeout(resolve, data.retry_after * 1000));
+                }
+            } catch (error) {
+                // Back off before retrying (e.g. server restarting)
+                await new Promise(resolve => setTimeout(resolve, 5000));
+            }
+        }
     }
 };
 
@@ -331,6 +375,92 @@ async function deleteNotification(notificationId) {
     }
 }
 
+// Update the bell badge without reloading the notification list
+function updateNotificationBadge(unreadCount) {
+    const notificationCount = document.getElementById('notification-count');
+    if (!notificationCount) return;
+    
+    if (unreadCount > 0) {
+        notificationCount.textContent = unreadCount;
+        notificationCount.style.cssText = 'display: inline-block !important; visibility: visible !important; opacity: 1 !important;';
+    } else {
+        notificationCount.style.cssText = 'display: none !important;';
+    }
+}
+
+// How long to poll before trying the stream again after the server turned it away
+const NOTIFICATION_STREAM_RETRY_MS = 300000;
+
+// Poll the cheap unread counter and reload the list only when it changes.
+// With a duration, go back to the stream afterwards.
+function startNotificationPolling(durationMs) {
+    let lastUnreadCount = null;
+    const started = Date.now();
+    const timer = setInterval(async function() {
+        if (durationMs && Date.now() - started >= durationMs) {
+            clearInterval(timer);
+            startNotificationStream();
+            return;
+        }
+        try {
+            const data = await utils.fetchJson('/api/user/notifications/count');
+            if (data.unread_count !== lastUnreadCount) {
+                lastUnreadCount = data.unread_count;
+                updateNotificationBadge(data.unread_count);
+                if (notificationsPanelOpen) {
+                    loadNotifications();
+                }
+            }
+        } catch (error) {
+            console.error('Error checking notification count:', error);
+        }
+    }, 30000);
+}
+
+// Subscribe to notification changes pushed by the server
+function startNotificationStream() {
+    if (!window.EventSource) {
+        startNotificationPolling(null);
+        return;
+    }
+    
+    const stream = new EventSource('/api/user/notifications/stream');
+    let connectedOnce = false;
+    
+    stream.addEventListener('open', async function() {
+        // Resync after a reconnect in case events were missed while disconnected;
+        // streams end every minute, so check the counter rather than reloading the list
+        if (connectedOnce) {
+            try {
+                const data = await utils.fetchJson('/api/user/notifications/count');
+                updateNotificationBadge(data.unread_count);
+                if (notificationsPanelOpen) {
+                    loadNotifications();
+                }
+            } catch (error) {
+                console.error('Error checking notification count:', error);
+            }
+        }
+        connectedOnce = true;
+    });
+    
+    stream.addEventListener('error', function() {
+        // Closed for good (e.g. 204 when the worker is at its stream limit)
+        if (stream.readyState === EventSource.CLOSED) {
+            startNotificationPolling(NOTIFICATION_STREAM_RETRY_MS);
+        }
+    });
+    
+    stream.addEventListener('notification', function(event) {
+        const data = JSON.parse(event.data);
+        updateNotificationBadge(data.unread_count);
+        
+        if (notificationsPanelOpen) {
+            loadNotifications();
+        }
+    });
+}
+
 // Initialize notifications when DOM is ready
 function initializeNotifications() {
     if (window.notificationsInitialized) {
@@ -352,8 +482,8 @@ function initializeNotifications() {
         console.log('Notification bell found, loading notifications...');
         loadNotifications();
         
-        // Refresh notifications every 30 seconds
-        setInterval(loadNotifications, 30000);
+        // Push updates over Server-Sent Events; poll only without EventSource
+        startNotificationStream();
         
         // Close notifications panel when clicking outside
         document.addEventListener('click', function(event) {
@@ -0,0 +1,110 @@
+"""
+Dashboard stats cache.
+
+The /api/stats payload is computed once and stored as JSON in the
+stats_cache table, tagged with the data versions (see data_versions.py) of
+the tables it reads. Those versions are bumped in the same transaction as
+every committed write to ideas, bounties, skills or the spending rollup, so
+each worker can tell whether an entry is current from the one primary-key
+query it already needs, and reuses its in-memory copy until a write lands.
+The first worker to see a change recomputes the payload and stores it for
+the others. During write bursts (e.g. CSV imports) an entry is still served
+for STATS_CACHE_MAX_STALENESS seconds after it goes out of date, and no entry
+is served once it is older than STATS_CACHE_MAX_AGE.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from database import get_session
+from models import Idea, IdeaStatus, Skill, StatsCacheEntry
+from data_versions import check_versioned_tables, get_data_versions
+from spending_rollup import get_org_spending
+
+STATS_TABLES = ('ideas', 'bounties', 'skills', 'spending_rollup')
+check_versioned_tables(STATS_TABLES)
+CACHE_KEY = 'dashboard'
+
+def compute_stats(db):
+    """Dashboard statistics: idea counts by status, skill count and org spending."""
+    stats = {
+        'total_ideas': db.query(Idea).count(),
+        'open_ideas': db.query(Idea).filter(Idea.status == IdeaStatus.open).count(),
+        'claimed_ideas': db.query(Idea).filter(Idea.status == IdeaStatus.claimed).count(),
+        'complete_ideas': db.query(Idea).filter(Idea.status == IdeaStatus.complete).count(),
+        'total_skills': db.query(Skill).count()
+    }
+    
+    # Organization-wide spending analytics from the spending rollup
+    spending = get_org_spending(db)
+    stats['spending'] = spending
+    stats['spending_analytics'] = dict(spending)
+    return stats
+
+class CachedStats:
+    """A computed payload and the data versions it reflects."""
+    
+    def __init__(self, versions, payload, computed_at):
+        self.versions = versions
+        self.payload = payload
+        self.computed_at = computed_at
+        self.etag = hashlib.sha1(f'{versions}|{computed_at}'.encode('utf-8')).hexdigest()
+
+class StatsCache:
+    """Per-process copy of the shared stats_cache entry."""
+    
+    def __init__(self, max_staleness=None, max_age=None):
+        self.max_staleness = Config.STATS_CACHE_MAX_STALENESS if max_staleness is None else max_staleness
+        self.max_age = Config.STATS_CACHE_MAX_AGE if max_age is None else max_age
+        self._lock = threading.Lock()
+        self._entry = None
+    
+    def _usable(self, entry, versions, now):
+        if entry is None or now - entry.computed_at >= self.max_age:
+            return False
+        return entry.versions == versions or now - entry.computed_at < self.max_staleness
+    
+    def get(self, db):
+        """Return the current CachedStats, recomputing it from `db` if needed."""
+        versions = ','.join(f'{name}:{version}' for name, version in get_data_versions(db, STATS_TABLES).items())
+        entry = self._entry
+        if self._usable(entry, versions, time.time()):
+            return entry
+        
+        # One thread per process refreshes; the rest wait for its result
+        with self._lock:
+            entry = self._entry
+            if self._usable(entry, versions, time.time()):
+                return entry
+            
+            row = db.get(StatsCacheEntry, CACHE_KEY)
+            if row is not None:
+                entry = CachedStats(row.versions, row.payload, row.computed_at)
+            if not self._usable(entry, versions, time.time()):
+                entry = CachedStats(versions, json.dumps(compute_stats(db)), time.time())
+                self._store(entry)
+            self._entry = entry
+            return entry
+    
+    def _store(self, entry):
+        db = get_session()
+        try:
+            row = db.get(StatsCacheEntry, CACHE_KEY)
+            if row is None:
+                db.add(StatsCacheEntry(key=CACHE_KEY, versions=entry.versions, payload=entry.payload,
+                                       computed_at=entry.computed_at))
+            elif row.computed_at < entry.computed_at:
+                row.versions = entry.versions
+                row.payload = entry.payload
+                row.computed_at = entry.computed_at
+            db.commit()
+        except IntegrityError:
+            # Another worker stored its entry first
+            db.rollback()
+        finally:
+            db.close()
+
+stats_cache = StatsCache()
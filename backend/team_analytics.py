@@ -0,0 +1,306 @@
+"""
+Team analytics.
+
+Builds the team statistics payload served by /api/team-stats and
+/api/admin/team-stats?team_id= from a fixed number of grouped queries: one scan
+of the team's submitted ideas, one of its members' claims (joined to their
+ideas) and skill counts. Spending comes from the spending rollup.
+Every breakdown is then aggregated in a single pass over those rows.
+
+The admin all-teams overview is likewise built from grouped queries keyed by
+team rather than a set of queries per team.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import func, case
+from models import Idea, Claim, Skill, Bounty, ClaimApproval, IdeaStatus, Team, UserProfile, user_skills, idea_skills
+from spending_rollup import get_team_spending
+
+def _increment(counts, key, amount=1):
+    counts[key] = counts.get(key, 0) + amount
+
+def _top_counts(counts, limit=10):
+    """Sort a name -> count map by count (stable on ties) as [{'skill', 'count'}]."""
+    return [{'skill': skill, 'count': count}
+            for skill, count in sorted(counts.items(), key=lambda x: x[1], reverse=True)][:limit]
+
+def calculate_team_spending_analytics(team, team_member_emails, db):
+    """Calculate spending analytics for a team from the spending rollup."""
+    spending = get_team_spending(db, team.name)
+    
+    # Top spenders (team members with highest bounty claims)
+    top_spenders = []
+    if team_member_emails:
+        spender_query = db.query(
+            Claim.claimer_email,
+            UserProfile.name,
+            func.sum(Bounty.amount).label('total_claimed')
+        ).join(
+            Idea, Claim.idea_uuid == Idea.uuid
+        ).join(
+            Bounty, Idea.uuid == Bounty.idea_uuid
+        ).join(
+            UserProfile, Claim.claimer_email == UserProfile.email
+        ).filter(
+            Claim.claimer_email.in_(team_member_emails),
+            Bounty.is_monetary == True,
+            Bounty.is_approved == True
+        ).group_by(Claim.claimer_email, UserProfile.name).order_by(
+            func.sum(Bounty.amount).desc()
+        ).limit(10).all()
+        
+        for email, name, total in spender_query:
+            top_spenders.append({
+                'email': email,
+                'name': name,
+                'total_claimed': float(total or 0)
+            })
+    
+    return {
+        'total_approved_spend': spending['total_approved_spend'],
+        'total_expensed': spending['total_expensed'],
+        'pending_approval_spend': spending['pending_approval_spend'],
+        'actual_spend': spending['actual_spend'],
+        'committed_spend': spending['committed_spend'],
+        'spending_by_priority': spending['spending_by_priority'],
+        'spending_by_size': spending['spending_by_size'],
+        'top_spenders': top_spenders,
+        'monthly_spending': spending['monthly_spending']
+    }
+
+def build_team_stats(team, team_members, db):
+    """Build the full team statistics payload for the given team and members."""
+    team_member_emails = [member.email for member in team_members]
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    
+    submitted_rows = []
+    claim_rows = []
+    member_skill_rows = []
+    needed_skill_rows = []
+    pending_approvals = 0
+    
+    if team_member_emails:
+        # Ideas submitted by team members
+        submitted_rows = db.query(
+            Idea.email, Idea.status, Idea.priority, Idea.size, Idea.date_submitted
+        ).filter(
+            Idea.email.in_(team_member_emails)
+        ).all()
+        
+        # Claims by team members; the outer join keeps claims whose idea is gone
+        # so plain claim counts match the claims table
+        claim_rows = db.query(
+            Claim.claimer_email, Claim.idea_uuid, Claim.claim_date, Idea.uuid,
+            Idea.status, Idea.priority, Idea.size, Idea.benefactor_team
+        ).outerjoin(
+            Idea, Claim.idea_uuid == Idea.uuid
+        ).filter(
+            Claim.claimer_email.in_(team_member_emails)
+        ).all()
+        
+        # Skills of team members
+        member_skill_rows = db.query(user_skills.c.user_email, Skill.name).join(
+            Skill, Skill.uuid == user_skills.c.skill_uuid
+        ).filter(
+            user_skills.c.user_email.in_(team_member_emails)
+        ).all()
+        
+        # Skills needed for ideas submitted by team members
+        needed_skill_rows = db.query(Skill.name, func.count()).join(
+            idea_skills, Skill.uuid == idea_skills.c.skill_uuid
+        ).join(
+            Idea, Idea.uuid == idea_skills.c.idea_uuid
+        ).filter(
+            Idea.email.in_(team_member_emails)
+        ).group_by(Skill.name).all()
+        
+        # Pending approvals for team
+        pending_approvals = db.query(ClaimApproval).join(
+            Idea, ClaimApproval.idea_uuid == Idea.uuid
+        ).filter(
+            ClaimApproval.claimer_email.in_(team_member_emails),
+            ClaimApproval.status == 'pending',
+            ClaimApproval.manager_approved == None
+        ).count()
+    
+    member_stats = {email: {
+        'submitted': 0, 'claimed': 0, 'completed': 0,
+        'own_team_claims': 0, 'other_team_claims': 0,
+        'own_team_completed': 0, 'other_team_completed': 0
+    } for email in team_member_emails}
+    
+    # Submitted ideas
+    submitted_status_breakdown = {}
+    priority_submitted = {}
+    size_submitted = {}
+    recent_submissions = 0
+    for email, status, priority, size, date_submitted in submitted_rows:
+        _increment(submitted_status_breakdown, status.value)
+        _increment(priority_submitted, priority.value)
+        _increment(size_submitted, size.value)
+        if date_submitted and date_submitted >= thirty_days_ago:
+            recent_submissions += 1
+        member_stats[email]['submitted'] += 1
+    
+    # Claimed ideas
+    status_breakdown = {}
+    priority_claimed = {}
+    size_claimed = {}
+    claimed_idea_uuids = set()
+    total_claimed = 0
+    completed_ideas = 0
+    recent_claims = 0
+    team_claims = {'own_team': 0, 'other_teams': 0, 'own_team_completed': 0, 'other_teams_completed': 0}
+    for claimer_email, claim_idea_uuid, claim_date, idea_uuid, status, priority, size, benefactor_team in claim_rows:
+        member = member_stats[claimer_email]
+        total_claimed += 1
+        member['claimed'] += 1
+        if claim_date and claim_date >= thirty_days_ago:
+            recent_claims += 1
+        
+        if idea_uuid is None:
+            continue
+        
+        claimed_idea_uuids.add(claim_idea_uuid)
+        _increment(status_breakdown, status.value)
+        _increment(priority_claimed, priority.value)
+        _increment(size_claimed, size.value)
+        
+        is_complete = status == IdeaStatus.complete
+        own_team = benefactor_team == team.name
+        if is_complete:
+            completed_ideas += 1
+            member['completed'] += 1
+        if own_team:
+            team_claims['own_team'] += 1
+            member['own_team_claims'] += 1
+            if is_complete:
+                team_claims['own_team_completed'] += 1
+                member['own_team_completed'] += 1
+        else:
+            team_claims['other_teams'] += 1
+            member['other_team_claims'] += 1
+            if is_complete:
+                team_claims['other_teams_completed'] += 1
+                member['other_team_completed'] += 1
+    
+    # Team member skills
+    skills_by_member = {}
+    for email, skill_name in member_skill_rows:
+        skills_by_member.setdefault(email, []).append(skill_name)
+    
+    team_skills = {}
+    for member in team_members:
+        for skill_name in skills_by_member.get(member.email, []):
+            _increment(team_skills, skill_name)
+    
+    skills_needed = dict(needed_skill_rows)
+    
+    # Team member activity
+    member_activity = []
+    for member in team_members:
+        member_activity.append({
+            'name': member.name,
+            'email': member.email,
+            'role': member.role,
+            'skills': skills_by_member.get(member.email, []),
+            **member_stats[member.email]
+        })
+    
+    # Sort by total activity
+    member_activity.sort(key=lambda x: x['submitted'] + x['claimed'], reverse=True)
+    
+    completion_rate = round((completed_ideas / total_claimed * 100) if total_claimed > 0 else 0, 1)
+    
+    return {
+        'teamId': team.uuid,
+        'teamName': team.name,
+        'overview': {
+            'total_members': len(team_members),
+            'ideas_submitted': len(submitted_rows),
+            'ideas_claimed': len(claimed_idea_uuids),
+            'completion_rate': completion_rate,
+            'pending_approvals': pending_approvals
+        },
+        'breakdowns': {
+            'status': status_breakdown,
+            'submitted_status': submitted_status_breakdown,
+            'priority': {
+                'submitted': priority_submitted,
+                'claimed': priority_claimed
+            },
+            'size': {
+                'submitted': size_submitted,
+                'claimed': size_claimed
+            },
+            'team_skills': _top_counts(team_skills),
+            'skills_needed': _top_counts(skills_needed),
+            'team_claims': team_claims
+        },
+        'member_activity': member_activity[:10],  # Top 10 members
+        'recent_activity': {
+            'submissions_30d': recent_submissions,
+            'claims_30d': recent_claims
+        },
+        'spending': calculate_team_spending_analytics(team, team_member_emails, db)
+    }
+
+def build_teams_overview(db):
+    """Build the all-teams overview for admins with one grouped query per metric."""
+    teams = db.query(Team).order_by(Team.name).all()
+    
+    member_counts = dict(db.query(UserProfile.team_uuid, func.count(UserProfile.email)).filter(
+        UserProfile.team_uuid != None
+    ).group_by(UserProfile.team_uuid).all())
+    
+    submitted_counts = dict(db.query(UserProfile.team_uuid, func.count(Idea.uuid)).join(
+        Idea, Idea.email == UserProfile.email
+    ).filter(
+        UserProfile.team_uuid != None
+    ).group_by(UserProfile.team_uuid).all())
+    
+    # Distinct ideas claimed and completed claims, keyed by the claimer's team
+    claim_counts = {
+        team_uuid: (claimed, completed or 0)
+        for team_uuid, claimed, completed in db.query(
+            UserProfile.team_uuid,
+            func.count(func.distinct(Claim.idea_uuid)),
+            func.sum(case((Idea.status == IdeaStatus.complete, 1), else_=0))
+        ).join(
+            Idea, Claim.idea_uuid == Idea.uuid
+        ).join(
+            UserProfile, Claim.claimer_email == UserProfile.email
+        ).filter(
+            UserProfile.team_uuid != None
+        ).group_by(UserProfile.team_uuid).all()
+    }
+    
+    approved_spend = dict(db.query(Idea.benefactor_team, func.sum(Bounty.amount)).join(
+        Bounty, Bounty.idea_uuid == Idea.uuid
+    ).filter(
+        Bounty.is_monetary == True,
+        Bounty.is_approved == True
+    ).group_by(Idea.benefactor_team).all())
+    
+    all_teams_stats = []
+    for team in teams:
+        member_count = member_counts.get(team.uuid, 0)
+        if not member_count:
+            # Skip teams with no members
+            continue
+        
+        team_claimed, completed_ideas = claim_counts.get(team.uuid, (0, 0))
+        completion_rate = round((completed_ideas / team_claimed * 100) if team_claimed > 0 else 0, 1)
+        
+        all_teams_stats.append({
+            'uuid': team.uuid,
+            'name': team.name,
+            'is_approved': team.is_approved,
+            'member_count': member_count,
+            'submitted_count': submitted_counts.get(team.uuid, 0),
+            'claimed_count': team_claimed,
+            'completion_rate': completion_rate,
+            'total_approved_spend': float(approved_spend.get(team.name) or 0.0)
+        })
+    
+    return all_teams_stats
@@ -0,0 +1,85 @@
+"""
+Test setup.
+
+Tests run against a scratch SQLite file. With TEST_DATABASE=postgresql they
+run against PostgreSQL instead: TEST_POSTGRES_URL if set, otherwise a
+throwaway cluster made with initdb and pg_ctl (from PG_BIN, or PATH) that is
+stopped when the run ends. initdb will not run as root.
+"""
+
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+def start_postgres(directory):
+    """Start a throwaway PostgreSQL cluster listening on a socket in `directory`; returns its URL."""
+    def tool(name):
+        bin_dir = os.environ.get('PG_BIN')
+        return os.path.join(bin_dir, name) if bin_dir else (shutil.which(name) or name)
+    
+    data_dir = os.path.join(directory, 'pgdata')
+    subprocess.run([tool('initdb'), '-D', data_dir, '-U', 'postgres', '-A', 'trust', '-E', 'UTF8', '--no-sync'],
+                   check=True, stdout=subprocess.DEVNULL)
+    subprocess.run([tool('pg_ctl'), '-D', data_dir, '-l', os.path.join(directory, 'postgres.log'), '-w',
+                    '-o', f"-c listen_addresses='' -k {directory} -c fsync=off", 'start'],
+                   check=True, stdout=subprocess.DEVNULL)
+    atexit.register(subprocess.run, [tool('pg_ctl'), '-D', data_dir, '-m', 'immediate', 'stop'],
+                    stdout=subprocess.DEVNULL)
+    return f'postgresql://postgres@/postgres?host={directory}'
+
+# database.py binds its engine at import time, so point it at a scratch
+# database before any app module is imported
+_scratch = tempfile.mkdtemp(prefix='postingboard-tests-')
+if os.environ.get('TEST_DATABASE') == 'postgresql':
+    os.environ['DATABASE_URL'] = os.environ.get('TEST_POSTGRES_URL') or start_postgres(_scratch)
+else:
+    os.environ['DATABASE_URL'] = f'sqlite:///{_scratch}/test.db'
+os.environ['SESSION_SQLITE_PATH'] = f'{_scratch}/sessions.db'
+os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    return create_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def login(client):
+    """Sign the test client in as `email`; pass email=None to sign out."""
+    def sign_in(email, is_admin=False):
+        with client.session_transaction() as flask_session:
+            flask_session.clear()
+            if email:
+                flask_session['user_email'] = email
+                flask_session['user_name'] = email.split('@')[0]
+                flask_session['is_admin'] = is_admin
+    return sign_in
+
+@pytest.fixture
+def postgres_url():
+    """URL of a new, empty PostgreSQL database; skips unless TEST_DATABASE=postgresql."""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine import make_url
+    from uuid import uuid4
+    
+    if os.environ.get('TEST_DATABASE') != 'postgresql':
+        pytest.skip('set TEST_DATABASE=postgresql to run PostgreSQL tests')
+    server_url = make_url(os.environ['DATABASE_URL'])
+    name = f'test_{uuid4().hex[:12]}'
+    server = create_engine(server_url, isolation_level='AUTOCOMMIT')
+    with server.connect() as connection:
+        connection.execute(text(f'CREATE DATABASE {name}'))
+    yield server_url.set(database=name).render_as_string(hide_password=False)
+    with server.connect() as connection:
+        connection.execute(text(f'DROP DATABASE {name} WITH (FORCE)'))
+    server.dispose()
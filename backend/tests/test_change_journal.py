@@ -0,0 +1,125 @@
+"""The change journal must be a cursor that never skips a committed change, and wake the right long-polls."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func, select
+from change_journal import ChangeBroker, record_change_events, current_change_id, changes_since
+from config import Config
+from database import engine, get_session
+from models import ChangeEvent, Skill, Team
+
+def journal_id():
+    db = get_session()
+    try:
+        return current_change_id(db)
+    finally:
+        db.close()
+
+def add(model, name):
+    db = get_session()
+    try:
+        db.add(model(name=name))
+        db.commit()
+    finally:
+        db.close()
+
+@pytest.fixture
+def broker(app):
+    # Polled by hand; the background poller never wakes during a test
+    return ChangeBroker(poll_interval=3600)
+
+def start_waiting(broker, since, topics, timeout=5):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=broker.wait(since, topics, timeout)))
+    thread.start()
+    deadline = time.monotonic() + 5
+    while broker._waiters == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert broker._waiters == 1
+    return thread, result
+
+def test_journal_ids_commit_in_order(app):
+    if engine.dialect.name != 'postgresql':
+        pytest.skip('SQLite serializes writers itself')
+    
+    first = engine.connect()
+    transaction = first.begin()
+    record_change_events(first, {'skills'})
+    committed = threading.Event()
+    
+    def second_writer():
+        with engine.begin() as connection:
+            record_change_events(connection, {'teams'})
+        committed.set()
+    
+    thread = threading.Thread(target=second_writer)
+    thread.start()
+    try:
+        # The second writer's id is higher, so it must wait for the first to commit
+        assert not committed.wait(0.5)
+        transaction.commit()
+        thread.join(5)
+        assert committed.is_set()
+    finally:
+        first.close()
+    
+    with engine.connect() as connection:
+        newest = connection.execute(select(ChangeEvent.topic).order_by(ChangeEvent.id.desc()).limit(2)).scalars().all()
+    assert newest == ['teams', 'skills']
+
+def test_long_poll_wakes_only_for_its_topics(broker):
+    since = journal_id()
+    thread, result = start_waiting(broker, since, ['skills'])
+    
+    add(Team, 'Journal team')
+    broker.poll()
+    thread.join(0.2)
+    assert thread.is_alive()
+    
+    add(Skill, 'Journal skill')
+    broker.poll()
+    thread.join(5)
+    assert not thread.is_alive()
+    version, changed = result['value']
+    assert changed == ['skills'] and version == journal_id()
+
+def test_long_poll_returns_at_once_for_missed_changes(broker):
+    since = journal_id()
+    add(Skill, 'Missed journal skill')
+    assert broker.wait(since, ['skills', 'teams'], timeout=5) == (journal_id(), ['skills'])
+
+def test_long_poll_times_out_without_changes(broker):
+    since = journal_id()
+    assert broker.wait(since, ['users'], timeout=0.05) == (since, [])
+
+def test_busy_worker_turns_long_polls_away(client, login, monkeypatch):
+    monkeypatch.setattr(Config, 'CHANGE_LONG_POLL_LIMIT', 0)
+    login('admin@journal.test', is_admin=True)
+    version = client.get('/api/changes', query_string={'topics': 'skills'}).get_json()['version']
+    response = client.get('/api/changes', query_string={'topics': 'skills', 'since': version})
+    assert response.get_json() == {'version': version, 'changes': [], 'retry_after': Config.CHANGE_LONG_POLL_BUSY_RETRY}
+    assert response.headers['Retry-After'] == str(Config.CHANGE_LONG_POLL_BUSY_RETRY)
+
+def test_prune_keeps_newest_row_and_resyncs_stale_cursors(broker):
+    add(Skill, 'Pruned journal skill')
+    add(Skill, 'Newest journal skill')
+    expired = datetime.utcnow() - timedelta(seconds=Config.CHANGE_EVENT_RETENTION + 60)
+    db = get_session()
+    try:
+        db.query(ChangeEvent).update({ChangeEvent.created_at: expired})
+        db.commit()
+        newest = current_change_id(db)
+    finally:
+        db.close()
+    
+    broker.poll()
+    db = get_session()
+    try:
+        assert db.query(func.count(ChangeEvent.id)).scalar() == 1
+        assert current_change_id(db) == newest
+        # The rows after an old cursor are gone, so every topic is reported changed
+        assert changes_since(db, newest - 2, ['skills', 'teams']) == (newest, ['skills', 'teams'])
+    finally:
+        db.close()
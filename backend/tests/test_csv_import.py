@@ -0,0 +1,46 @@
+"""A row that fails to save must cost only that row, with its own error."""
+
+from database import get_session
+from csv_import import import_users
+from models import Team, Skill, UserProfile, user_skills
+
+TEAM = 'CSV Import Team'
+
+def user_row(email, skills=''):
+    return {'email': email, 'name': email.split('@')[0], 'role': 'developer', 'team': TEAM, 'skills': skills}
+
+def add_profile(email):
+    db = get_session()
+    try:
+        db.add(UserProfile(email=email, name='Signed up meanwhile'))
+        db.commit()
+    finally:
+        db.close()
+
+def test_bad_row_in_chunk_is_reported_alone(app):
+    db = get_session()
+    try:
+        db.add(Team(name=TEAM, is_approved=True))
+        db.commit()
+        
+        def rows():
+            yield user_row('first@csv.test')
+            # Signs up after the import loaded existing emails, so only the insert catches it
+            add_profile('taken@csv.test')
+            yield user_row('taken@csv.test', skills='Brand new CSV skill')
+            yield user_row('last@csv.test', skills='Brand new CSV skill')
+        
+        imported, errors = import_users(db, rows(), chunk_size=10)
+        
+        assert imported == 2
+        assert len(errors) == 1 and errors[0].startswith('Row 3: Error processing row')
+        emails = {email for (email,) in db.query(UserProfile.email).filter(UserProfile.email.like('%@csv.test'))}
+        assert emails == {'first@csv.test', 'taken@csv.test', 'last@csv.test'}
+        
+        # The skill was first created by the failed row; the later row still gets it
+        skill_uuid = db.query(Skill.uuid).filter_by(name='Brand new CSV skill').scalar()
+        assert skill_uuid
+        linked = db.execute(user_skills.select().where(user_skills.c.user_email == 'last@csv.test')).all()
+        assert [row.skill_uuid for row in linked] == [skill_uuid]
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+"""Versioned endpoints must answer 304 until a commit changes a table they read."""
+
+from datetime import datetime
+import pytest
+from sqlalchemy import insert, update
+from database import get_session
+from data_versions import check_versioned_tables, get_data_versions
+from models import Skill, EmailOutbox
+
+def skills_version():
+    db = get_session()
+    try:
+        return get_data_versions(db, ['skills'])['skills']
+    finally:
+        db.close()
+
+def etag(client, path='/api/skills'):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    return response.headers['ETag']
+
+def revalidate(client, tag, path='/api/skills'):
+    return client.get(path, headers={'If-None-Match': tag})
+
+def test_unchanged_data_is_not_modified(client):
+    tag = etag(client)
+    response = revalidate(client, tag)
+    assert response.status_code == 304
+    assert response.data == b'' and response.headers['ETag'] == tag
+
+def test_committed_change_bumps_version_and_etag(client):
+    tag = etag(client)
+    before = skills_version()
+    db = get_session()
+    try:
+        db.add(Skill(name='Versioned skill'))
+        db.commit()
+    finally:
+        db.close()
+    assert skills_version() == before + 1
+    
+    response = revalidate(client, tag)
+    assert response.status_code == 200
+    assert 'Versioned skill' in {skill['name'] for skill in response.get_json()}
+    assert response.headers['ETag'] != tag
+
+def test_core_statement_bumps_version(app):
+    before = skills_version()
+    db = get_session()
+    try:
+        db.execute(insert(Skill).values(uuid='00000000-0000-4000-8000-00000000d001', name='Core versioned skill'))
+        db.commit()
+    finally:
+        db.close()
+    assert skills_version() == before + 1
+
+@pytest.mark.parametrize('write', ['rollback', 'no_match', 'untracked'])
+def test_writes_that_change_nothing_read_keep_version(client, write):
+    tag = etag(client)
+    before = skills_version()
+    db = get_session()
+    try:
+        if write == 'rollback':
+            db.add(Skill(name='Rolled back skill'))
+            db.flush()
+            db.rollback()
+        elif write == 'no_match':
+            db.execute(update(Skill).where(Skill.name == 'No such skill').values(name='Renamed'))
+        else:
+            db.add(EmailOutbox(to_email='nobody@versions.test', subject='Hi', body='Body',
+                               next_attempt_at=datetime(2100, 1, 1)))
+        db.commit()
+    finally:
+        db.close()
+    assert skills_version() == before
+    assert revalidate(client, tag).status_code == 304
+
+def test_etag_depends_on_who_is_asking(client, login):
+    login('first@versions.test')
+    tag = etag(client, '/api/teams')
+    login('first@versions.test', is_admin=True)
+    assert revalidate(client, tag, '/api/teams').status_code == 200
+
+def test_unversioned_tables_are_rejected():
+    with pytest.raises(ValueError, match='email_outbox'):
+        check_versioned_tables(['skills', 'email_outbox'])
@@ -0,0 +1,144 @@
+"""The outbox sender must deliver, back off, expire and give up on the right messages."""
+
+import smtplib
+from datetime import datetime, timedelta
+import pytest
+from database import get_session
+from email_outbox import OutboxSender, email_sender
+from models import EmailOutbox, EmailSettings
+
+class StubSMTP:
+    """Stands in for smtplib.SMTP; failures are set per test on the class."""
+    
+    connections = []
+    sent = []
+    login_error = None
+    send_error = None
+    
+    def __init__(self, host, port, timeout=None):
+        StubSMTP.connections.append((host, port))
+    
+    def starttls(self):
+        pass
+    
+    def login(self, username, password):
+        if StubSMTP.login_error:
+            raise StubSMTP.login_error
+    
+    def send_message(self, msg):
+        if StubSMTP.send_error:
+            raise StubSMTP.send_error
+        StubSMTP.sent.append(msg['To'])
+    
+    def quit(self):
+        pass
+    
+    def close(self):
+        pass
+
+@pytest.fixture
+def outbox(app, monkeypatch):
+    monkeypatch.setattr(StubSMTP, 'connections', [])
+    monkeypatch.setattr(StubSMTP, 'sent', [])
+    monkeypatch.setattr(StubSMTP, 'login_error', None)
+    monkeypatch.setattr(StubSMTP, 'send_error', None)
+    monkeypatch.setattr(smtplib, 'SMTP', StubSMTP)
+    # Keep the app's own background sender away from these messages
+    monkeypatch.setattr(email_sender, 'drain', lambda: 0)
+    
+    db = get_session()
+    try:
+        db.query(EmailOutbox).delete()
+        db.query(EmailSettings).delete()
+        db.add(EmailSettings(smtp_server='smtp.outbox.test', smtp_port=1025, smtp_username='sender',
+                             smtp_password='secret', from_email='board@outbox.test', is_active=True))
+        db.commit()
+    finally:
+        db.close()
+    sender = OutboxSender()
+    yield sender
+    sender.pool.close_all()
+
+def queue_message(to_email, expires_at=None):
+    db = get_session()
+    try:
+        message = EmailOutbox(to_email=to_email, subject='Subject', body='Body', expires_at=expires_at,
+                              next_attempt_at=datetime.utcnow() - timedelta(seconds=1))
+        db.add(message)
+        db.commit()
+        return message.id
+    finally:
+        db.close()
+
+def message_state(message_id):
+    db = get_session()
+    try:
+        message = db.get(EmailOutbox, message_id)
+        return message.status, message.attempts, message.next_attempt_at
+    finally:
+        db.close()
+
+def make_due(message_id):
+    db = get_session()
+    try:
+        db.get(EmailOutbox, message_id).next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+    finally:
+        db.close()
+
+def test_batch_is_sent_over_one_connection(outbox):
+    ids = [queue_message(f'user{n}@outbox.test') for n in range(3)]
+    assert outbox.drain() == 3
+    assert StubSMTP.sent == [f'user{n}@outbox.test' for n in range(3)]
+    assert len(StubSMTP.connections) == 1
+    assert all(message_state(message_id)[0] == 'sent' for message_id in ids)
+
+def test_transient_failure_backs_off(outbox):
+    message_id = queue_message('busy@outbox.test')
+    StubSMTP.send_error = smtplib.SMTPDataError(451, b'Try again later')
+    outbox.drain()
+    status, attempts, next_attempt_at = message_state(message_id)
+    assert (status, attempts) == ('pending', 1)
+    assert next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+    
+    StubSMTP.send_error = None
+    make_due(message_id)
+    outbox.drain()
+    assert message_state(message_id)[:2] == ('sent', 2)
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPRecipientsRefused({'gone@outbox.test': (550, b'No such user')}),
+    smtplib.SMTPDataError(554, b'Message rejected')
+])
+def test_recipient_or_message_refusal_fails_at_once(outbox, error):
+    message_id = queue_message('gone@outbox.test')
+    StubSMTP.send_error = error
+    outbox.drain()
+    assert message_state(message_id)[:2] == ('failed', 1)
+
+def test_login_failure_is_retried_once_settings_are_fixed(outbox, monkeypatch):
+    monkeypatch.setattr('config.Config.EMAIL_OUTBOX_MAX_ATTEMPTS', 1)
+    ids = [queue_message(f'wait{n}@outbox.test') for n in range(3)]
+    StubSMTP.login_error = smtplib.SMTPAuthenticationError(535, b'Authentication failed')
+    outbox.drain()
+    # One login attempt for the batch, and nothing given up despite the attempt limit
+    assert len(StubSMTP.connections) == 1
+    assert all(message_state(message_id)[:2] == ('pending', 1) for message_id in ids)
+    
+    StubSMTP.login_error = None
+    for message_id in ids:
+        make_due(message_id)
+    outbox.drain()
+    assert all(message_state(message_id)[0] == 'sent' for message_id in ids)
+
+def test_expired_messages_are_not_sent(outbox):
+    stale = queue_message('late@outbox.test', expires_at=datetime.utcnow() - timedelta(seconds=1))
+    outbox.drain()
+    assert message_state(stale)[0] == 'expired'
+    assert StubSMTP.sent == []
+    
+    # A retry that would land after expiry is not scheduled
+    short_lived = queue_message('code@outbox.test', expires_at=datetime.utcnow() + timedelta(seconds=10))
+    StubSMTP.send_error = smtplib.SMTPDataError(451, b'Try again later')
+    outbox.drain()
+    assert message_state(short_lived)[:2] == ('expired', 1)
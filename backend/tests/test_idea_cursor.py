@@ -0,0 +1,91 @@
+"""Keyset pages of GET /api/ideas must cover every idea exactly once, ties included."""
+
+from datetime import datetime, timedelta
+import pytest
+from database import get_session
+from idea_listing import encode_cursor, apply_cursor, apply_sort
+from models import Idea, Skill, IdeaStatus, IdeaSize, PriorityLevel
+
+@pytest.fixture(scope='module')
+def tied_ideas(app):
+    """Ideas under one skill; all share a submission time, two also a priority and size."""
+    db = get_session()
+    try:
+        skill = Skill(name='Cursor skill')
+        submitted = datetime(2026, 3, 1, 12, 0, 0)
+        settings = [(PriorityLevel.medium, IdeaSize.small)] * 5 + [(PriorityLevel.high, IdeaSize.large),
+                                                                  (PriorityLevel.low, IdeaSize.medium)]
+        ideas = [
+            Idea(
+                title=f'Cursor idea {n}',
+                description='Cursor fixture',
+                email='owner@cursor.test',
+                benefactor_team='Engineering',
+                size=size,
+                priority=priority,
+                status=IdeaStatus.open,
+                needed_by=submitted + timedelta(days=30),
+                date_submitted=submitted,
+                skills=[skill]
+            )
+            for n, (priority, size) in enumerate(settings)
+        ]
+        db.add_all(ideas)
+        db.commit()
+        return skill.uuid, {idea.uuid for idea in ideas}
+    finally:
+        db.close()
+
+def fetch_pages(client, skill_uuid, sort, limit):
+    pages = []
+    params = {'skill': skill_uuid, 'sort': sort, 'limit': limit}
+    while True:
+        response = client.get('/api/ideas', query_string=params)
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append([idea['uuid'] for idea in body['ideas']])
+        if not body['has_more']:
+            assert body['next_cursor'] is None
+            return pages
+        params['cursor'] = body['next_cursor']
+
+@pytest.mark.parametrize('sort', ['date_desc', 'date_asc', 'priority', 'size'])
+def test_pages_cover_tied_ideas_once(client, tied_ideas, sort):
+    skill_uuid, expected = tied_ideas
+    pages = fetch_pages(client, skill_uuid, sort, limit=2)
+    seen = [uuid for page in pages for uuid in page]
+    assert len(seen) == len(expected) and set(seen) == expected
+    assert all(len(page) == 2 for page in pages[:-1])
+    
+    # Same order as one unpaginated page
+    assert fetch_pages(client, skill_uuid, sort, limit=len(expected)) == [seen]
+
+def test_ties_are_broken_by_uuid(client, tied_ideas):
+    skill_uuid, expected = tied_ideas
+    seen = [uuid for page in fetch_pages(client, skill_uuid, 'date_desc', limit=3) for uuid in page]
+    assert seen == sorted(expected, reverse=True)
+
+def test_cursor_round_trips_the_sort_key(app, tied_ideas):
+    db = get_session()
+    try:
+        idea = db.query(Idea).filter(Idea.uuid.in_(tied_ideas[1])).first()
+        cursor = encode_cursor(idea, 'priority')
+        assert '=' not in cursor
+        
+        query = apply_sort(db.query(Idea).filter(Idea.uuid.in_(tied_ideas[1])), 'priority')
+        after = apply_cursor(query, cursor, 'priority').all()
+        ordered = query.all()
+        assert after == ordered[ordered.index(idea) + 1:]
+    finally:
+        db.close()
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'e30', None])
+def test_bad_or_mismatched_cursor_is_rejected(client, tied_ideas, cursor):
+    skill_uuid, _ = tied_ideas
+    if cursor is None:
+        # Issued for another sort order
+        first = client.get('/api/ideas', query_string={'skill': skill_uuid, 'sort': 'size', 'limit': 1})
+        cursor = first.get_json()['next_cursor']
+    response = client.get('/api/ideas', query_string={'skill': skill_uuid, 'sort': 'date_desc', 'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
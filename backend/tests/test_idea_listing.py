@@ -0,0 +1,74 @@
+"""GET /api/ideas must load any number of ideas in a fixed number of statements."""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from database import get_session
+from models import Idea, Skill, Claim, Bounty, UserProfile, IdeaStatus, IdeaSize, PriorityLevel
+
+@contextmanager
+def count_statements():
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    # Engine-wide, so reads served by the optional read engine are counted too
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+
+def add_ideas(count):
+    """Add ideas that each have their own submitter, skill, bounty and claimer."""
+    db = get_session()
+    try:
+        start = db.query(Idea).count()
+        for n in range(start, start + count):
+            submitter = UserProfile(email=f'submitter{n}@example.com', name=f'Submitter {n}')
+            claimer = UserProfile(email=f'claimer{n}@example.com', name=f'Claimer {n}')
+            skill = Skill(name=f'Listing skill {n}')
+            idea = Idea(
+                title=f'Idea {n}',
+                description='Statement count fixture',
+                email=submitter.email,
+                benefactor_team='Engineering',
+                size=IdeaSize.medium,
+                priority=PriorityLevel.medium,
+                status=IdeaStatus.claimed,
+                needed_by=datetime.utcnow() + timedelta(days=30),
+                skills=[skill]
+            )
+            db.add_all([submitter, claimer, skill, idea])
+            db.flush()
+            db.add_all([
+                Bounty(idea_uuid=idea.uuid, is_monetary=True, amount=100.0),
+                Claim(idea_uuid=idea.uuid, claimer_email=claimer.email)
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+def list_ideas(client):
+    db = get_session()
+    try:
+        expected = db.query(Idea).count()
+    finally:
+        db.close()
+    with count_statements() as statements:
+        response = client.get('/api/ideas')
+    assert response.status_code == 200
+    ideas = response.get_json()
+    assert len(ideas) == expected
+    fixtures = [idea for idea in ideas if idea['description'] == 'Statement count fixture']
+    assert fixtures and all(idea['claims'][0]['name'].startswith('Claimer') for idea in fixtures)
+    return len(statements)
+
+def test_listing_statement_count_is_constant(client):
+    add_ideas(3)
+    small = list_ideas(client)
+    add_ideas(27)
+    large = list_ideas(client)
+    assert small == large
@@ -0,0 +1,81 @@
+"""GET /api/ideas/search must only match and quote comments the caller may read."""
+
+from datetime import datetime, timedelta
+import pytest
+from database import get_session
+from models import Idea, IdeaComment, Claim, IdeaStatus, IdeaSize, PriorityLevel
+
+def add_idea(title, submitter, comments=(), claimer=None):
+    db = get_session()
+    try:
+        idea = Idea(
+            title=title,
+            description='Search access fixture',
+            email=submitter,
+            benefactor_team='Engineering',
+            size=IdeaSize.small,
+            priority=PriorityLevel.low,
+            status=IdeaStatus.claimed if claimer else IdeaStatus.open,
+            needed_by=datetime.utcnow() + timedelta(days=30)
+        )
+        db.add(idea)
+        db.flush()
+        for content, is_internal in comments:
+            db.add(IdeaComment(idea_uuid=idea.uuid, author_email=submitter, content=content, is_internal=is_internal))
+        if claimer:
+            db.add(Claim(idea_uuid=idea.uuid, claimer_email=claimer))
+        db.commit()
+        return idea.uuid
+    finally:
+        db.close()
+
+@pytest.fixture(scope='module')
+def ideas():
+    return {
+        'private': add_idea('Quarterly review tool', 'owner@search.test', [
+            ('budget kestrel planning', False),
+            ('secret salary figures internal', True)
+        ], claimer='claimer@search.test'),
+        'public': add_idea('Salary benchmark report', 'other@search.test'),
+        'mixed': add_idea('Kestrel roadmap', 'other@search.test', [('kestrel notes mention zebra', False)])
+    }
+
+def search(client, text):
+    response = client.get('/api/ideas/search', query_string={'q': text})
+    assert response.status_code == 200
+    return {idea['uuid']: idea['snippet'] for idea in response.get_json()['ideas']}
+
+@pytest.mark.parametrize('email, is_admin', [
+    (None, False), ('stranger@search.test', False), ('owner@search.test', False), ('admin@search.test', True)
+])
+def test_internal_comments_are_never_searchable(client, login, ideas, email, is_admin):
+    login(email, is_admin)
+    results = search(client, 'salary')
+    assert ideas['public'] in results
+    assert ideas['private'] not in results
+    assert not search(client, 'secret')
+
+@pytest.mark.parametrize('email, is_admin, visible', [
+    (None, False, False),
+    ('stranger@search.test', False, False),
+    ('owner@search.test', False, True),
+    ('claimer@search.test', False, True),
+    ('admin@search.test', True, True)
+])
+def test_comments_match_only_with_tab_access(client, login, ideas, email, is_admin, visible):
+    login(email, is_admin)
+    results = search(client, 'budget')
+    assert (ideas['private'] in results) == visible
+    if visible:
+        assert '<mark>budget</mark>' in results[ideas['private']]
+
+def test_snippet_skips_comments_without_tab_access(client, login, ideas):
+    # Matches on the title for everyone; only its comment mentions zebra
+    login('stranger@search.test')
+    results = search(client, 'kestrel')
+    assert ideas['mixed'] in results
+    assert ideas['private'] not in results
+    assert 'zebra' not in results[ideas['mixed']]
+
+    login(None)
+    assert 'zebra' not in search(client, 'kestrel')[ideas['mixed']]
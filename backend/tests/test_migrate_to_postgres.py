@@ -0,0 +1,77 @@
+"""migrate_to_postgres.py must copy a SQLite database into PostgreSQL unchanged."""
+
+from datetime import datetime, timedelta
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import sessionmaker
+from database import Base, create_db_engine
+from migrate_to_postgres import migrate
+from models import (Team, UserProfile, Skill, Idea, Claim, Bounty, IdeaComment, EmailOutbox, ChangeEvent,
+                    IdeaStatus, IdeaSize, PriorityLevel)
+
+def make_source(path):
+    url = f'sqlite:///{path}'
+    engine = create_db_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    team = Team(name='Migration Team', is_approved=True)
+    skill = Skill(name='Migration skill')
+    db.add_all([team, skill])
+    db.flush()
+    idea = Idea(
+        title='Migrated idea',
+        description='Round trip',
+        email='owner@migrate.test',
+        benefactor_team=team.name,
+        size=IdeaSize.large,
+        priority=PriorityLevel.high,
+        status=IdeaStatus.claimed,
+        needed_by=datetime(2026, 1, 2, 3, 4, 5),
+        skills=[skill]
+    )
+    db.add_all([
+        UserProfile(email='owner@migrate.test', name='Owner', team_uuid=team.uuid),
+        idea,
+        EmailOutbox(id=5, to_email='owner@migrate.test', subject='Hello', body='Body',
+                    next_attempt_at=datetime.utcnow() + timedelta(minutes=1)),
+        ChangeEvent(id=3, topic='skills')
+    ])
+    db.flush()
+    db.add_all([
+        Claim(idea_uuid=idea.uuid, claimer_email='claimer@migrate.test'),
+        Bounty(idea_uuid=idea.uuid, is_monetary=True, amount=250.5),
+        IdeaComment(idea_uuid=idea.uuid, author_email='owner@migrate.test', content='Ünïcode comment')
+    ])
+    db.commit()
+    db.close()
+    engine.dispose()
+    return url
+
+def table_rows(engine, table):
+    with engine.connect() as connection:
+        return sorted((tuple(row) for row in connection.execute(select(table))), key=repr)
+
+def test_round_trip(tmp_path, postgres_url):
+    source_url = make_source(tmp_path / 'source.db')
+    assert migrate(source_url, postgres_url)
+    
+    source = create_db_engine(source_url)
+    target = create_db_engine(postgres_url)
+    try:
+        copied = [table for table in Base.metadata.sorted_tables if inspect(source).has_table(table.name)]
+        assert {'ideas', 'idea_skills', 'claims', 'bounties', 'email_outbox'} <= {table.name for table in copied}
+        for table in copied:
+            assert table_rows(source, table) == table_rows(target, table), table.name
+        
+        # Integer id sequences continue after the copied rows
+        db = sessionmaker(bind=target)()
+        message = EmailOutbox(to_email='next@migrate.test', subject='Next', body='Body')
+        db.add(message)
+        db.commit()
+        assert message.id > 5
+        db.close()
+    finally:
+        source.dispose()
+        target.dispose()
+    
+    # A second run must refuse to write into a populated database
+    assert not migrate(source_url, postgres_url)
@@ -0,0 +1,93 @@
+"""Unread counters must follow every ORM change, and reconcile must repair the rest."""
+
+import pytest
+from database import get_session
+from models import Notification, NotificationCounter
+from notification_counters import reconcile_unread_counters
+
+EMAIL = 'reader@counters.test'
+
+def add_notifications(count, email=EMAIL):
+    db = get_session()
+    try:
+        notifications = [Notification(user_email=email, type='status_change', title=f'Update {n}', message='Counter fixture')
+                         for n in range(count)]
+        db.add_all(notifications)
+        db.commit()
+        return [notification.uuid for notification in notifications]
+    finally:
+        db.close()
+
+def stored_count(email=EMAIL):
+    db = get_session()
+    try:
+        return db.query(NotificationCounter.unread_count).filter_by(user_email=email).scalar()
+    finally:
+        db.close()
+
+def reconcile():
+    db = get_session()
+    try:
+        return reconcile_unread_counters(db)
+    finally:
+        db.close()
+
+@pytest.fixture
+def reader(client):
+    with client.session_transaction() as flask_session:
+        flask_session['user_email'] = EMAIL
+        flask_session['user_verified'] = True
+    # Clean start whatever earlier tests left behind
+    db = get_session()
+    try:
+        db.query(Notification).filter_by(user_email=EMAIL).delete()
+        db.query(NotificationCounter).filter_by(user_email=EMAIL).delete()
+        db.commit()
+    finally:
+        db.close()
+    return client
+
+def badge(client):
+    response = client.get('/api/user/notifications/count')
+    assert response.status_code == 200
+    return response.get_json()['unread_count']
+
+def test_counter_follows_api_changes(reader):
+    first, second, _ = add_notifications(3)
+    assert badge(reader) == 3
+    
+    assert reader.post(f'/api/user/notifications/{first}/read').status_code == 200
+    assert badge(reader) == 2
+    # Deleting a read notification leaves the count alone; an unread one lowers it
+    assert reader.delete(f'/api/user/notifications/{first}').status_code == 200
+    assert reader.delete(f'/api/user/notifications/{second}').status_code == 200
+    assert badge(reader) == 1
+    assert reconcile() == 0
+
+def test_reconcile_repairs_changes_made_outside_the_orm(reader):
+    add_notifications(4)
+    db = get_session()
+    try:
+        # Bulk updates skip the flush hook
+        db.query(Notification).filter_by(user_email=EMAIL).update({Notification.is_read: True})
+        db.commit()
+    finally:
+        db.close()
+    assert stored_count() == 4
+    
+    assert reconcile() >= 1
+    assert stored_count() == 0 and badge(reader) == 0
+    assert reconcile() == 0
+
+def test_reconcile_creates_missing_counters(app):
+    email = 'new@counters.test'
+    add_notifications(2, email)
+    db = get_session()
+    try:
+        db.query(NotificationCounter).filter_by(user_email=email).delete()
+        db.commit()
+    finally:
+        db.close()
+    
+    assert reconcile() >= 1
+    assert stored_count(email) == 2
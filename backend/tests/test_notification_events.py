@@ -0,0 +1,89 @@
+"""The notification broker must deliver each committed event once, whatever order ids commit in."""
+
+from uuid import uuid4
+import pytest
+from sqlalchemy import func, text
+from config import Config
+from database import get_session
+from models import NotificationEvent
+from notification_events import NotificationBroker
+
+EMAIL = 'stream@events.test'
+
+def reserve_ids(count):
+    """Event ids as concurrent transactions would be handed them."""
+    db = get_session()
+    try:
+        if db.get_bind().dialect.name == 'postgresql':
+            return [db.execute(text("SELECT nextval(pg_get_serial_sequence('notification_events', 'id'))")).scalar()
+                    for _ in range(count)]
+        newest = db.query(func.max(NotificationEvent.id)).scalar() or 0
+        return list(range(newest + 1, newest + 1 + count))
+    finally:
+        db.close()
+
+def commit_event(event_id):
+    db = get_session()
+    try:
+        uuid = str(uuid4())
+        db.add(NotificationEvent(id=event_id, user_email=EMAIL, notification_uuid=uuid, kind='read'))
+        db.commit()
+        return uuid
+    finally:
+        db.close()
+
+def delivered(subscription):
+    events = []
+    while not subscription.events.empty():
+        events.append(subscription.events.get_nowait()['notification_uuid'])
+    return events
+
+@pytest.fixture
+def broker(app):
+    # Polled by hand; the background poller never wakes during a test
+    broker = NotificationBroker(poll_interval=3600)
+    subscription = broker.subscribe([EMAIL])
+    yield broker, subscription
+    broker.unsubscribe(subscription)
+
+def test_lower_id_committed_later_is_delivered(broker):
+    broker, subscription = broker
+    lower, higher = reserve_ids(2)
+    later = commit_event(higher)
+    broker.poll()
+    assert delivered(subscription) == [later]
+    
+    earlier = commit_event(lower)
+    broker.poll()
+    assert delivered(subscription) == [earlier]
+    broker.poll()
+    assert delivered(subscription) == []
+
+def test_gap_is_given_up_after_timeout(broker, monkeypatch):
+    broker, subscription = broker
+    lower, higher = reserve_ids(2)
+    commit_event(higher)
+    broker.poll()
+    assert lower in broker._gaps
+    
+    monkeypatch.setattr(Config, 'NOTIFICATION_EVENT_GAP_TIMEOUT', 0)
+    broker.poll()
+    assert not broker._gaps
+
+def test_new_subscriber_after_idle_gets_no_replay(app):
+    broker = NotificationBroker(poll_interval=3600)
+    first = broker.subscribe([EMAIL])
+    broker.unsubscribe(first)
+    
+    # Committed while the worker had no streams, so nobody polled for it
+    commit_event(reserve_ids(1)[0])
+    
+    subscription = broker.subscribe([EMAIL])
+    try:
+        broker.poll()
+        assert delivered(subscription) == []
+        fresh = commit_event(reserve_ids(1)[0])
+        broker.poll()
+        assert delivered(subscription) == [fresh]
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,112 @@
+"""The spending rollup must match a full rebuild after every write path that moves a bounty."""
+
+import pytest
+from database import get_session
+from models import Idea, SpendingRollup
+from spending_rollup import KEY_COLUMNS, check_spending_rollup, rebuild_spending_rollup, get_team_spending
+
+TEAM = 'Rollup Team'
+
+def rollup_rows():
+    db = get_session()
+    try:
+        return {
+            tuple(getattr(row, column) for column in KEY_COLUMNS): (round(row.amount, 2), row.bounty_count)
+            for row in db.query(SpendingRollup).all()
+        }
+    finally:
+        db.close()
+
+def assert_no_drift():
+    db = get_session()
+    try:
+        assert check_spending_rollup(db) == []
+    finally:
+        db.close()
+    
+    # Incremental rows must be exactly what a rebuild produces, with no empty leftovers
+    maintained = rollup_rows()
+    db = get_session()
+    try:
+        rebuild_spending_rollup(db)
+    finally:
+        db.close()
+    assert maintained == rollup_rows()
+
+def team_spending():
+    db = get_session()
+    try:
+        return get_team_spending(db, TEAM)
+    finally:
+        db.close()
+
+def submit(client, title, amount):
+    response = client.post('/submit', data={
+        'title': title,
+        'description': 'Rollup fixture',
+        'team': TEAM,
+        'priority': 'high',
+        'size': 'medium',
+        'needed_by': '2027-01-31',
+        'is_monetary': 'on',
+        'is_expensed': 'on',
+        'amount': str(amount)
+    })
+    assert response.status_code == 302
+    db = get_session()
+    try:
+        return db.query(Idea.uuid).filter_by(title=title).scalar()
+    finally:
+        db.close()
+
+def ok(response):
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['success']
+
+@pytest.fixture
+def admin(client, login, app):
+    login('admin@rollup.test', is_admin=True)
+    # Start from a consistent table whatever earlier tests wrote directly
+    db = get_session()
+    try:
+        rebuild_spending_rollup(db)
+    finally:
+        db.close()
+    return client
+
+def test_api_mutations_leave_no_drift(admin):
+    large = submit(admin, 'Rollup large bounty', 200)
+    small = submit(admin, 'Rollup small bounty', 30)
+    assert_no_drift()
+    assert team_spending()['pending_approval_spend'] == 200
+    
+    ok(admin.post(f'/api/ideas/{large}/approve-bounty'))
+    assert_no_drift()
+    assert team_spending()['total_approved_spend'] == 200
+    
+    # Moves the bounty to another key and changes its amount
+    ok(admin.put(f'/api/ideas/{large}', json={
+        'priority': 'low', 'size': 'large', 'status': 'claimed',
+        'is_monetary': True, 'is_expensed': True, 'amount': 300
+    }))
+    assert_no_drift()
+    spending = team_spending()
+    assert spending['committed_spend'] == 300 and spending['spending_by_priority'] == {'low': 300}
+    
+    # Small amounts are approved on edit
+    ok(admin.put(f'/api/ideas/{small}', json={'is_monetary': True, 'is_expensed': False, 'amount': 40}))
+    assert_no_drift()
+    
+    ok(admin.post(f'/api/ideas/{large}/unclaim'))
+    assert_no_drift()
+    assert team_spending()['committed_spend'] == 0
+    
+    # Moving to another team empties this team's rows
+    ok(admin.put(f'/api/ideas/{small}', json={'team': 'Other Rollup Team'}))
+    ok(admin.put(f'/api/ideas/{large}', json={'is_monetary': False}))
+    assert_no_drift()
+    assert team_spending()['total_approved_spend'] == 0
+    
+    ok(admin.delete(f'/api/ideas/{small}'))
+    assert_no_drift()
+    assert not [key for key in rollup_rows() if key[0] in (TEAM, 'Other Rollup Team')]
@@ -0,0 +1,77 @@
+"""Cached dashboard stats must be reused until a write lands, and never outlive their bounds."""
+
+import json
+import pytest
+import stats_cache
+from database import get_session
+from models import Skill, StatsCacheEntry
+from stats_cache import StatsCache
+
+def get(cache):
+    db = get_session()
+    try:
+        return cache.get(db)
+    finally:
+        db.close()
+
+def add_skill(name):
+    db = get_session()
+    try:
+        db.add(Skill(name=name))
+        db.commit()
+    finally:
+        db.close()
+
+def total_skills(entry):
+    return json.loads(entry.payload)['total_skills']
+
+@pytest.fixture
+def fresh(app):
+    # No shared entry from earlier tests
+    db = get_session()
+    try:
+        db.query(StatsCacheEntry).delete()
+        db.commit()
+    finally:
+        db.close()
+
+def test_entry_is_reused_until_a_write_lands(fresh):
+    cache = StatsCache(max_staleness=0, max_age=3600)
+    first = get(cache)
+    assert get(cache) is first
+    
+    add_skill('Stats skill')
+    second = get(cache)
+    assert second is not first and total_skills(second) == total_skills(first) + 1
+
+def test_stale_entry_is_served_within_staleness_window(fresh):
+    cache = StatsCache(max_staleness=3600, max_age=3600)
+    first = get(cache)
+    add_skill('Stats burst skill')
+    assert get(cache) is first
+    
+    cache.max_staleness = 0
+    assert total_skills(get(cache)) == total_skills(first) + 1
+
+def test_entry_is_recomputed_after_max_age(fresh):
+    cache = StatsCache(max_staleness=3600, max_age=0)
+    assert get(cache) is not get(cache)
+
+def test_other_workers_reuse_the_stored_entry(fresh, monkeypatch):
+    first = get(StatsCache(max_staleness=0, max_age=3600))
+    
+    def compute_stats(db):
+        raise AssertionError('stats recomputed despite a current shared entry')
+    monkeypatch.setattr(stats_cache, 'compute_stats', compute_stats)
+    other = get(StatsCache(max_staleness=0, max_age=3600))
+    assert (other.payload, other.etag) == (first.payload, first.etag)
+
+def test_stats_endpoint_revalidates(client, fresh, monkeypatch):
+    monkeypatch.setattr(stats_cache.stats_cache, 'max_staleness', 0)
+    response = client.get('/api/stats')
+    assert response.status_code == 200
+    tag = response.headers['ETag']
+    assert client.get('/api/stats', headers={'If-None-Match': tag}).status_code == 304
+    
+    add_skill('Stats endpoint skill')
+    assert client.get('/api/stats', headers={'If-None-Match': tag}).status_code == 200
@@ -0,0 +1,108 @@
+"""
+Request-scoped user context.
+
+The signed-in user's profile (role, verification, team, managed team and
+skills) is loaded once per request with a single query and kept on flask.g,
+so the decorators, blueprints and access checks share it instead of each
+querying UserProfile again. The context is a plain snapshot, independent of
+any DB session, so it can also be cached across requests for
+USER_CONTEXT_CACHE_TTL seconds (0 disables). Committed changes to a
+UserProfile drop that user's cached context in this process; other worker
+processes see the change once their entry expires.
+"""
+
+import threading
+import time
+from flask import g, has_app_context, session
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+from config import Config
+from database import SessionLocal, get_session
+from models import UserProfile
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+class UserContext:
+    """Snapshot of a user's profile for authorization and display."""
+    
+    def __init__(self, user):
+        self.email = user.email
+        self.name = user.name
+        self.role = user.role
+        self.is_verified = bool(user.is_verified)
+        self.team_uuid = user.team_uuid
+        self.team_name = user.team.name if user.team else None
+        self.managed_team_uuid = user.managed_team_uuid
+        self.managed_team_name = user.managed_team.name if user.managed_team else None
+        self.skills = [skill.name for skill in user.skills]
+    
+    @property
+    def is_manager(self):
+        return self.role == 'manager'
+
+def load_user_context(db, email):
+    """Load a UserContext from the database, or None if there is no profile."""
+    user = db.query(UserProfile).options(
+        joinedload(UserProfile.team),
+        joinedload(UserProfile.managed_team),
+        joinedload(UserProfile.skills)
+    ).filter(UserProfile.email == email).first()
+    return UserContext(user) if user else None
+
+def get_user_context(email=None):
+    """Return the UserContext for `email` (default: the signed-in user), or None.
+    
+    Loaded at most once per request; profiles that don't exist are not cached.
+    """
+    email = email or session.get('user_email')
+    if not email:
+        return None
+    
+    contexts = g.setdefault('user_contexts', {})
+    if email in contexts:
+        return contexts[email]
+    
+    context = None
+    ttl = Config.USER_CONTEXT_CACHE_TTL
+    if ttl:
+        with _cache_lock:
+            cached = _cache.get(email)
+        if cached and cached[0] > time.monotonic():
+            context = cached[1]
+    
+    if context is None:
+        db = get_session()
+        try:
+            context = load_user_context(db, email)
+        finally:
+            db.close()
+        if context is not None and ttl:
+            with _cache_lock:
+                _cache[email] = (time.monotonic() + ttl, context)
+    
+    contexts[email] = context
+    return context
+
+def invalidate_user_context(email):
+    """Forget any cached context for `email` in this process and request."""
+    with _cache_lock:
+        _cache.pop(email, None)
+    if has_app_context():
+        g.get('user_contexts', {}).pop(email, None)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _collect_profile_changes(db, flush_context):
+    changed = db.info.setdefault('changed_user_emails', set())
+    for instance in list(db.new) + list(db.dirty) + list(db.deleted):
+        if isinstance(instance, UserProfile):
+            changed.add(instance.email)
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _invalidate_changed_profiles(db):
+    for email in db.info.pop('changed_user_emails', ()):
+        invalidate_user_context(email)
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _discard_profile_changes(db):
+    db.info.pop('changed_user_emails', None)
@@ -19,7 +19,7 @@ APP_NAME="postingboard-flask"
 PID_FILE="$SCRIPT_DIR/flask-app.pid"
 LOG_FILE="$SCRIPT_DIR/flask-health.log"
 LOCK_FILE="$SCRIPT_DIR/flask-health.lock"
-HEALTH_URL="http://localhost:$PORT/api/health"
+HEALTH_URL="http://localhost:$PORT/api/health"  # Latency and throughput are at /metrics
 HEALTH_TIMEOUT=10
 MAX_LOG_SIZE=10485760  # 10MB
 PYTHON_CMD=""